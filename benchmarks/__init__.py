@@ -0,0 +1,19 @@
+"""
+Benchmarks for the data-access hot paths. These generate their own throwaway SQLite databases with
+`scripts.generate_data` and are not run by pytest.
+"""
+
+import time
+from collections.abc import Callable
+
+
+def timed(func: Callable[[], object], repeat: int = 5) -> float:
+    """
+    Best wall time of `repeat` calls, in milliseconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
@@ -0,0 +1,49 @@
+"""
+Export throughput and peak memory per format and compression, at a couple of database sizes.
+
+    python -m benchmarks.export --concerts 100k 400k
+
+Peak memory (Python allocations, via tracemalloc) should stay flat as the database grows.
+"""
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from concert_db.exporter import open_output, stream_concerts, write_concerts
+from concert_db.settings import DatabaseConfig
+from scripts.generate_data import generate, scale
+
+OUTPUTS = ("concerts.csv", "concerts.jsonl", "concerts.csv.gz", "concerts.csv.bz2", "concerts.csv.xz")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the streaming export.")
+    parser.add_argument("--concerts", type=scale, nargs="+", default=[100_000, 400_000])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'concerts':>10}  {'output':<18}{'rows/s':>12}{'MB':>8}{'peak KiB':>10}")
+    for concerts in args.concerts:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_config = DatabaseConfig(f"sqlite:///{Path(tmp) / 'bench.sqlite'}")
+            generate(db_config, concerts, args.seed)
+            for name in OUTPUTS:
+                path = Path(tmp) / name
+                tracemalloc.start()
+                start = time.perf_counter()
+                file, fmt = open_output(path)
+                with file, db_config.engine.connect() as connection:
+                    count = write_concerts(stream_concerts(connection), file, fmt)
+                seconds = time.perf_counter() - start
+                _current, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                size = path.stat().st_size / 1_000_000
+                print(f"{concerts:>10,}  {name:<18}{count / seconds:>12,.0f}{size:>8.1f}{peak / 1024:>10,.0f}")
+            db_config.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Compare the concert filter through the FTS5 index against the `ilike` fallback.
+
+Years and date ranges use the date index either way, so their two timings should match.
+
+    python -m benchmarks.filter --concerts 1M
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from concert_db.settings import DatabaseConfig
+from concert_db.ui.concert import Concerts
+from concert_db.ui.sorting import Sorting
+from scripts.generate_data import generate, scale
+
+from . import timed
+
+# a headliner, a genre, a kind of venue, then dates
+TERMS = ("Velvet Owls", "Southern", "Music Hall", "1999-12", "1999", "1995..1999", "zzz-no-match")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the concert filter with and without the FTS5 index.")
+    parser.add_argument("--concerts", type=scale, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_config = DatabaseConfig(f"sqlite:///{Path(tmp) / 'bench.sqlite'}")
+        start = time.perf_counter()
+        generate(db_config, args.concerts, args.seed)
+        print(f"generated {args.concerts:,} concerts in {time.perf_counter() - start:.1f}s")
+
+        session = db_config.get_session()
+        concerts = Concerts(session)
+        sorting = Sorting(2, "Date", True)
+        print(f"{'term':<16}{'rows':>10}{'fts5 ms':>12}{'ilike ms':>12}")
+        for term in TERMS:
+            concerts.search_index = True
+            rows = len(concerts.fetch_concerts(sorting, term))
+            fts = timed(lambda: concerts.fetch_concerts(sorting, term), args.repeat)
+            concerts.search_index = False
+            ilike = timed(lambda: concerts.fetch_concerts(sorting, term), args.repeat)
+            print(f"{term:<16}{rows:>10,}{fts:>12.1f}{ilike:>12.1f}")
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Compare read and write throughput of the concerts database under each SQLite profile.
+
+    python -m benchmarks.pragmas --concerts 200k
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import delete, insert
+
+from concert_db.models import Concert
+from concert_db.settings import SQLITE_PROFILES, DatabaseConfig
+from concert_db.ui.concert import Concerts
+from concert_db.ui.sorting import Sorting
+from scripts.generate_data import generate, scale
+
+from . import timed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark read & write throughput per SQLite profile.")
+    parser.add_argument("--concerts", type=scale, default=200_000)
+    parser.add_argument("--writes", type=int, default=500, help="single-row commits per profile")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{Path(tmp) / 'bench.sqlite'}"
+        start = time.perf_counter()
+        db_config = DatabaseConfig(url)
+        inserted = generate(db_config, args.concerts, args.seed)
+        # the journal mode can only change while no other connection has the database open
+        db_config.engine.dispose()
+        print(f"generated {args.concerts:,} concerts in {time.perf_counter() - start:.1f}s")
+
+        print(f"{'profile':<12}{'sorted load ms':>16}{'filter ms':>12}{'commits/s':>12}")
+        for name in SQLITE_PROFILES:
+            db_config = DatabaseConfig(url, profile=name)
+            session = db_config.get_session()
+            concerts = Concerts(session)
+            # best of --repeat, so these are warm-cache reads
+            load = timed(lambda: concerts.fetch_concerts(Sorting(0, "Artist", True)), args.repeat)
+            search = timed(lambda: concerts.fetch_concerts(Sorting(2, "Date", True), "1995..1999"), args.repeat)
+            session.close()
+
+            # one commit per concert, like saving from the add/edit screens
+            rng = random.Random(0)
+            start = time.perf_counter()
+            with db_config.engine.connect() as connection:
+                for _ in range(args.writes):
+                    connection.execute(
+                        insert(Concert).prefix_with("OR IGNORE"),
+                        {"artist_id": rng.randint(1, 10), "venue_id": rng.randint(1, 10), "date": None},
+                    )
+                    connection.commit()
+            commits = args.writes / (time.perf_counter() - start)
+            with db_config.engine.begin() as connection:
+                connection.execute(delete(Concert).where(Concert.id > inserted))
+            db_config.engine.dispose()
+
+            print(f"{name:<12}{load:>16.1f}{search:>12.1f}{commits:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Compare re-sorting the loaded concerts in SQL against re-sorting them in memory, as a header click does.
+
+    python -m benchmarks.sort --concerts 100k
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from concert_db.settings import DatabaseConfig
+from concert_db.ui.concert import Concerts, reversed_concerts, sorted_concerts
+from concert_db.ui.sorting import Sorting
+from scripts.generate_data import generate, scale
+
+from . import timed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark re-sorting the concerts table in SQL and in memory.")
+    parser.add_argument("--concerts", type=scale, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_config = DatabaseConfig(f"sqlite:///{Path(tmp) / 'bench.sqlite'}")
+        start = time.perf_counter()
+        generate(db_config, args.concerts, args.seed)
+        print(f"generated {args.concerts:,} concerts in {time.perf_counter() - start:.1f}s")
+
+        session = db_config.get_session()
+        concerts = Concerts(session)
+        print(f"{'sort':<12}{'sql ms':>10}{'sorted ms':>12}{'reversed ms':>14}")
+        for column, name in enumerate(("Artist", "Venue", "Date")):
+            ascending, descending = Sorting(column, name, True), Sorting(column, name, False)
+            rows = concerts.fetch_concerts(ascending)
+            sql = timed(lambda: concerts.fetch_concerts(descending), args.repeat)
+            in_memory = timed(lambda: sorted_concerts(rows, descending), args.repeat)
+            reverse = timed(lambda: reversed_concerts(rows, descending), args.repeat)
+            print(f"{name:<12}{sql:>10.1f}{in_memory:>12.1f}{reverse:>14.1f}")
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
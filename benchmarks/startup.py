@@ -0,0 +1,51 @@
+"""
+Time from starting the app to its first paint and to each panel being populated, on a large database.
+
+    python -m benchmarks.startup --concerts 500k
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from concert_db.app import ConcertDbApp
+from concert_db.settings import DatabaseConfig
+from scripts.generate_data import generate, scale
+
+
+async def start_app(app: ConcertDbApp) -> None:
+    async with app.run_test():
+        await app.workers.wait_for_complete()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark how soon the app is painted and interactive.")
+    parser.add_argument("--concerts", type=scale, default=500_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_config = DatabaseConfig(f"sqlite:///{Path(tmp) / 'bench.sqlite'}")
+        start = time.perf_counter()
+        generate(db_config, args.concerts, args.seed)
+        print(f"generated {args.concerts:,} concerts in {time.perf_counter() - start:.1f}s")
+
+        print(f"{'run':<6}{'first paint ms':>16}{'concerts ms':>14}{'artists ms':>13}{'venues ms':>12}")
+        for run in range(args.repeat):
+            session = db_config.get_session()
+            app = ConcertDbApp(session)
+            asyncio.run(start_app(app))
+            session.close()
+            timings = app.timings
+            elapsed = [
+                (timings[name] - timings["start"]) * 1000
+                for name in ("first paint", "Concerts", "ArtistScreen", "VenueScreen")
+            ]
+            print(f"{run + 1:<6}" + "".join(f"{ms:>{width}.1f}" for ms, width in zip(elapsed, (16, 14, 13, 12))))
+
+
+if __name__ == "__main__":
+    main()
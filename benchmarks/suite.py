@@ -0,0 +1,169 @@
+"""
+Time the data-access hot paths at several database sizes, save the timings as JSON and flag regressions.
+
+    python -m benchmarks.suite --sizes 1k,10k,100k --output bench.json
+    python -m benchmarks.suite --output new.json --baseline bench.json --threshold 0.2
+
+Each database is generated with `scripts.generate_data`, so the same sizes & seed always time the same data. Every case
+runs inside a headless app, with its table emptied before each run, so the timings include filling the table the way
+the app does on first load. With --baseline, a case more than --threshold (a fraction) slower than in the baseline is
+reported and the exit status is 1.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import date, timedelta
+from pathlib import Path
+
+from concert_db.app import ConcertDbApp
+from concert_db.models import Artist, Concert, Venue, reference_data, save_object
+from concert_db.settings import DatabaseConfig
+from concert_db.ui import ArtistScreen, VenueScreen
+from concert_db.ui.concert import Concerts
+from concert_db.ui.sorting import Sorting
+from concert_db.ui.table import SyncedDataTable
+from scripts.generate_data import generate, scale
+
+SORTINGS = [
+    Sorting(column, name, ascending)
+    for column, name in enumerate(("Artist", "Venue", "Date"))
+    for ascending in (True, False)
+]
+# an artist word (full-text index), too short for the index (ilike), a year and a range (date index)
+FILTERS = ("Velvet", "zz", "1999", "1995..1999")
+
+
+def best_of(repeat: int, run: Callable[[], object], setup: Callable[[], object] = lambda: None) -> float:
+    """
+    Best wall time of `repeat` calls of `run`, in milliseconds, calling `setup` untimed before each.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        setup()
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+async def time_cases(db_config: DatabaseConfig, repeat: int) -> dict[str, float]:
+    session = db_config.get_session()
+    app = ConcertDbApp(session)
+    timings: dict[str, float] = {}
+    async with app.run_test() as pilot:
+        await app.workers.wait_for_complete()
+        concerts = app.query_one(Concerts)
+        artists = app.query_one(ArtistScreen)
+        venues = app.query_one(VenueScreen)
+
+        def empty_tables() -> None:
+            # the paged table shows a new pager every time, so only the in-memory tables keep rows between runs
+            for table in app.query(SyncedDataTable):
+                table.clear()
+
+        for sorting in SORTINGS:
+            name = f"load_concerts[{sorting.name} {'asc' if sorting.ascending else 'desc'}]"
+            timings[name] = best_of(repeat, lambda: concerts.load_concerts(sorting), empty_tables)
+        for term in FILTERS:
+            timings[f"load_concerts[filter {term}]"] = best_of(
+                repeat, lambda: concerts.load_concerts(SORTINGS[4], term), empty_tables
+            )
+        timings["load_artists"] = best_of(repeat, artists.load_artists, empty_tables)
+        timings["load_venues"] = best_of(repeat, venues.load_venues, empty_tables)
+
+        # the artist & venue choices of the concert screens, read from the database every time here
+        def choices() -> None:
+            data = reference_data(session)
+            data.invalidate(Artist)
+            data.invalidate(Venue)
+            assert data.artists.names and data.venues.names
+
+        timings["reference_data"] = best_of(repeat, choices)
+
+        concerts.load_concerts(SORTINGS[4])
+        concerts.active_table.focus()
+
+        def close_editor() -> None:
+            if app.screen is not app.screen_stack[0]:
+                app.pop_screen()
+            # look the concert up in the database, not the identity map
+            session.expire_all()
+
+        timings["action_edit_concert"] = best_of(repeat, concerts.action_edit_concert, close_editor)
+        await pilot.pause()
+
+        days = iter(range(repeat))
+        artist, venue = session.get_one(Concert, 1).artist, session.get_one(Concert, 1).venue
+
+        def save() -> None:
+            concert = Concert(artist=artist, venue=venue, date=date(2100, 1, 1) + timedelta(days=next(days)))
+            save_object(concert, session)
+
+        timings["save_object"] = best_of(repeat, save)
+    session.close()
+    return timings
+
+
+def compare(results: dict[str, float], baseline: dict[str, float], threshold: float, min_ms: float) -> list[str]:
+    """
+    Describe each case more than `threshold` (a fraction) and `min_ms` milliseconds slower than in `baseline`.
+    """
+    regressions = []
+    for case, ms in results.items():
+        before = baseline.get(case)
+        if before is not None and ms > before * (1 + threshold) and ms - before > min_ms:
+            regressions.append(f"{case}: {before:.1f}ms -> {ms:.1f}ms (+{(ms / before - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the data-access hot paths at several database sizes.")
+    parser.add_argument("--sizes", default="1k,10k,100k", help="comma-separated concert counts")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="write the results to this JSON file")
+    parser.add_argument("--baseline", type=Path, help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="slowdown that counts as a regression")
+    parser.add_argument("--min-ms", type=float, default=1.0, help="ignore slowdowns smaller than this")
+    args = parser.parse_args()
+
+    results: dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in (scale(value) for value in args.sizes.split(",")):
+            db_config = DatabaseConfig(f"sqlite:///{Path(tmp) / f'bench_{size}.sqlite'}")
+            start = time.perf_counter()
+            generate(db_config, size, args.seed)
+            print(f"generated {size:,} concerts in {time.perf_counter() - start:.1f}s")
+            for case, ms in asyncio.run(time_cases(db_config, args.repeat)).items():
+                results[f"{case}@{size}"] = ms
+                print(f"  {case:<36}{ms:>10.2f} ms")
+            db_config.engine.dispose()
+
+    if args.output:
+        run = {
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "results": results,
+        }
+        args.output.write_text(json.dumps(run, indent=2) + "\n")
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())["results"]
+        regressions = compare(results, baseline, args.threshold, args.min_ms)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        print(f"{len(regressions)} regressions against {args.baseline}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""
+Time user interactions end to end in a headless app driven by Textual's Pilot, including table rebuilds and repaints.
+
+    python -m benchmarks.ui --concerts 100000 --runs 20
+
+Interactions are timed from the first key press or click until the app is idle again with the result on screen, and
+reported as the median (p50) and 95th percentile (p95) of --runs repetitions. Pilot waits for the app to be idle
+after every key press, so typed text is timed at the fastest pace the app can keep up with rather than a human's; the
+filter timings also include the FILTER_DEBOUNCE_MS pause after the last keystroke.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from datetime import date, timedelta
+from pathlib import Path
+
+from concert_db.app import ConcertDbApp
+from concert_db.settings import DatabaseConfig
+from concert_db.ui.concert import AddConcertScreen, Concerts
+from concert_db.ui.table import PagedTable
+from scripts.generate_data import generate, scale
+
+SIZE = (160, 50)
+FILTER = "velvet"
+
+
+def percentiles(samples: list[float]) -> tuple[float, float]:
+    """
+    The p50 and p95 of `samples`.
+    """
+    if len(samples) == 1:
+        return samples[0], samples[0]
+    cuts = statistics.quantiles(samples, n=20, method="inclusive")
+    return statistics.median(samples), cuts[18]
+
+
+async def timed(run: Callable[[], Awaitable[object]]) -> float:
+    start = time.perf_counter()
+    await run()
+    return (time.perf_counter() - start) * 1000
+
+
+def header_offsets(concerts: Concerts) -> list[tuple[int, int]]:
+    """
+    Where to click, relative to the active concerts table, for each column header.
+    """
+    table = concerts.active_table
+    if isinstance(table, PagedTable):
+        widths = table.column_widths
+    else:
+        widths = [column.get_render_width(table) for column in table.ordered_columns]
+    x, y = table.content_region.x - table.region.x, table.content_region.y - table.region.y
+    offsets = []
+    for width in widths:
+        offsets.append((x + width // 2, y))
+        x += width
+    return offsets
+
+
+async def time_startup(db_config: DatabaseConfig, runs: int) -> dict[str, list[float]]:
+    samples: dict[str, list[float]] = {"startup (first paint)": [], "startup (concerts shown)": []}
+    for _ in range(runs):
+        session = db_config.get_session()
+        app = ConcertDbApp(session)
+        async with app.run_test(size=SIZE):
+            await app.workers.wait_for_complete()
+        session.close()
+        start = app.timings["start"]
+        samples["startup (first paint)"].append((app.timings["first paint"] - start) * 1000)
+        samples["startup (concerts shown)"].append((app.timings["Concerts"] - start) * 1000)
+    return samples
+
+
+async def time_interactions(db_config: DatabaseConfig, runs: int) -> dict[str, list[float]]:
+    samples: dict[str, list[float]] = {}
+    session = db_config.get_session()
+    app = ConcertDbApp(session)
+    async with app.run_test(size=SIZE) as pilot:
+        await app.workers.wait_for_complete()
+        concerts = app.query_one(Concerts)
+
+        async def settle() -> None:
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+
+        async def type_filter() -> None:
+            await pilot.press("f", *FILTER)
+            await settle()
+
+        samples[f"filter {FILTER!r}"] = []
+        for _ in range(runs):
+            samples[f"filter {FILTER!r}"].append(await timed(type_filter))
+            await pilot.press("escape")
+            await settle()
+
+        for index, name in enumerate(concerts.columns.values):
+            key = f"click {name.name} header"
+            samples[key] = []
+            for _ in range(runs):
+                table = concerts.active_table
+                offset = header_offsets(concerts)[index]
+                samples[key].append(await timed(lambda: pilot.click(table, offset=offset)))
+                await settle()
+
+        days = iter(range(runs))
+
+        async def add_concert() -> None:
+            await pilot.press("c")
+            await pilot.pause()
+            assert isinstance(app.screen, AddConcertScreen)
+            await pilot.click("#concert_date")
+            await pilot.press(*(date(2100, 1, 1) + timedelta(days=next(days))).isoformat())
+            await pilot.click("#save")
+            await settle()
+            assert not isinstance(app.screen, AddConcertScreen)
+
+        samples["add concert"] = [await timed(add_concert) for _ in range(runs)]
+    session.close()
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark UI interactions in a headless app.")
+    parser.add_argument("--concerts", type=scale, default=100_000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--startup-runs", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="also write the p50/p95 timings to this JSON file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_config = DatabaseConfig(f"sqlite:///{Path(tmp) / 'bench.sqlite'}")
+        start = time.perf_counter()
+        generate(db_config, args.concerts, args.seed)
+        print(f"generated {args.concerts:,} concerts in {time.perf_counter() - start:.1f}s")
+
+        samples = asyncio.run(time_startup(db_config, args.startup_runs))
+        samples |= asyncio.run(time_interactions(db_config, args.runs))
+        db_config.engine.dispose()
+
+    results = {}
+    print(f"{'interaction':<28}{'runs':>6}{'p50 ms':>10}{'p95 ms':>10}")
+    for interaction, times in samples.items():
+        p50, p95 = percentiles(times)
+        results[interaction] = {"p50": p50, "p95": p95, "runs": len(times)}
+        print(f"{interaction:<28}{len(times):>6}{p50:>10.1f}{p95:>10.1f}")
+    if args.output:
+        args.output.write_text(json.dumps({"concerts": args.concerts, "results": results}, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,34 @@
+import logging
 import os
+import threading
+import time
+from typing import ClassVar
 
 from sqlalchemy.orm import Session
+from textual import work
 from textual.app import App, ComposeResult
+from textual.binding import Binding
 from textual.containers import Horizontal
 from textual.widgets import Footer, Rule
+from textual.worker import get_current_worker
 
+from concert_db.instrumentation import sql_stats
 from concert_db.settings import get_db_config
 from concert_db.ui import ArtistScreen, VenueScreen
 from concert_db.ui.concert import Concerts
+from concert_db.ui.sql_stats import SqlStatsPanel
+
+logger = logging.getLogger(__name__)
 
 
 class ConcertDbApp(App):
     CSS_PATH = "app.tcss"
+    BINDINGS: ClassVar = [Binding("f2", "toggle_sql_stats", "SQL Stats")]
 
     def __init__(self, db_session: Session):
         self.db_session = db_session
+        # perf_counter() when the app was created, first painted, and when each panel was populated
+        self.timings: dict[str, float] = {"start": time.perf_counter()}
         super().__init__()
 
     def compose(self) -> ComposeResult:
@@ -25,17 +39,68 @@ class ConcertDbApp(App):
             yield ArtistScreen(self.db_session)
             yield Rule(line_style="dashed", orientation="vertical")
             yield VenueScreen(self.db_session)
+        yield SqlStatsPanel(self.db_session)
         yield Footer()
 
     def on_mount(self) -> None:
         self.theme = "dracula"
+        self.populate_panels()
+
+    def on_unmount(self) -> None:
+        if stats := sql_stats(self.db_session):
+            stats.log_report()
+            stats.close_log()
+
+    def action_toggle_sql_stats(self) -> None:
+        self.query_one(SqlStatsPanel).toggle()
+
+    @work(thread=True, exclusive=True, group="populate")
+    def populate_panels(self) -> None:
+        """
+        Fill the panels after the first paint, most important first, repainting as each one is filled.
+
+        The panels mount with a loading indicator so the app appears straight away, however big the database. Each
+        panel is queried in this worker thread on a session of its own, since the app's isn't thread-safe, and only
+        the table update runs on the event loop, so the app stays responsive while the panels load.
+        """
+        worker = get_current_worker()
+        self.wait_for_frame()
+        self.timings["first paint"] = time.perf_counter()
+        for panel in (self.query_one(Concerts), self.query_one(ArtistScreen), self.query_one(VenueScreen)):
+            if worker.is_cancelled:
+                return
+            with Session(self.db_session.get_bind()) as session:
+                panel.populate(session)
+            self.wait_for_frame()
+            self.timings[type(panel).__name__] = time.perf_counter()
+
+    def wait_for_frame(self) -> None:
+        """
+        Wait, in a worker thread, for the screen to be refreshed, or for the worker to be cancelled as the app exits.
+        """
+        refreshed = threading.Event()
+        self.call_from_thread(self.call_after_refresh, refreshed.set)
+        while not refreshed.wait(0.1):
+            if get_current_worker().is_cancelled:
+                return
 
 
 if __name__ == "__main__":
     if os.getenv("ENVIRONMENT", None) is None:
         raise RuntimeError("ENVIRONMENT variable not set - required for running application")
+    # the app owns the terminal, so log to a file
+    logging.basicConfig(
+        filename=os.getenv("LOG_FILE", "concert_db.log"),
+        level=os.getenv("LOG_LEVEL", "INFO").upper(),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    if os.getenv("SQL_STATS", "false").lower() == "true":
+        # log every statement and the summary on exit, not just the suspected N+1 patterns
+        logging.getLogger("concert_db.instrumentation").setLevel(logging.DEBUG)
     db_config = get_db_config()
     db_config.create_tables()
+    settings = " ".join(f"{pragma}={value}" for pragma, value in db_config.pragma_settings().items())
+    logger.info("SQLite profile %r: %s", db_config.profile_name, settings)
 
     session = db_config.get_session()
     try:
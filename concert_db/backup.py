@@ -0,0 +1,231 @@
+"""
+Backups of the SQLite database to Google Drive.
+
+This imports the Google client libraries, which are slow to load, so nothing on the app's startup path should import it.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+from contextlib import closing
+from io import BufferedIOBase, FileIO
+from pathlib import Path
+from typing import Any, ClassVar
+
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from google_auth_oauthlib.flow import InstalledAppFlow  # type: ignore[import-untyped]
+from googleapiclient.discovery import build  # type: ignore[import-untyped]
+from googleapiclient.errors import HttpError  # type: ignore[import-untyped]
+from googleapiclient.http import MediaFileUpload, MediaIoBaseDownload  # type: ignore[import-untyped]
+
+try:
+    from compression import zstd  # type: ignore[import-not-found, unused-ignore]
+except ImportError:  # before Python 3.14
+    zstd = None
+
+# pages copied per step of a backup snapshot, and seconds to wait when a step finds the database locked
+SNAPSHOT_PAGES = int(os.getenv("BACKUP_SNAPSHOT_PAGES", "1024"))
+SNAPSHOT_SLEEP = 0.05
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+COMPRESSED_SUFFIX = ".zst" if zstd is not None else ".gz"
+
+logger = logging.getLogger(__name__)
+
+
+class DatabaseBackupConfig:
+    """
+    Back the database file up to Google Drive, updating one Drive file in place rather than adding a copy each time.
+
+    The Drive id of the backup is remembered in `backup_state_file`, keyed by database file name. A backup whose
+    content hasn't changed (same MD5 as Drive's `md5Checksum`) isn't uploaded at all; otherwise the new content is sent
+    with a resumable upload in `chunk_size` pieces, so an interrupted chunk can be retried on its own.
+    """
+
+    oauth_scopes: ClassVar = ["https://www.googleapis.com/auth/drive.file"]
+    oauth_token_file = "google_oauth_token.json"
+    oauth_credentials_file = "google_oauth_credentials.json"
+    backup_state_file = "google_drive_backup.json"
+    # Drive wants resumable chunks in multiples of 256 KiB
+    chunk_multiple = 256 * 1024
+    default_chunk_size: ClassVar[int] = int(os.getenv("BACKUP_CHUNK_KB", "8192")) * 1024
+
+    def __init__(self, filename: str, service: Any = None, chunk_size: int | None = None) -> None:
+        """
+        :param service: a Drive v3 client; if None, one is built with the user's OAuth credentials
+        :param chunk_size: bytes per upload request, a multiple of 256 KiB. If None, uses $BACKUP_CHUNK_KB or 8 MiB.
+        """
+        self.filename = filename
+        self.chunk_size = chunk_size or self.default_chunk_size
+        if self.chunk_size % self.chunk_multiple:
+            raise ValueError(f"Backup chunk size must be a multiple of 256 KiB, not {self.chunk_size} bytes")
+        self.service = service if service is not None else build("drive", "v3", credentials=self._credentials())
+
+    def _credentials(self) -> Any:
+        creds = None
+        if os.path.exists(self.oauth_token_file):
+            creds = Credentials.from_authorized_user_file(self.oauth_token_file, self.oauth_scopes)
+        if not creds or not creds.valid:
+            if creds and creds.expired and creds.refresh_token:
+                creds.refresh(Request())
+            else:
+                flow = InstalledAppFlow.from_client_secrets_file(self.oauth_credentials_file, self.oauth_scopes)
+                creds = flow.run_local_server(port=0)
+            with open(self.oauth_token_file, "w") as token:
+                token.write(creds.to_json())
+        return creds
+
+    @property
+    def file_id(self) -> str | None:
+        """
+        Drive id of this database's backup, if it has been backed up before.
+        """
+        return self._backups().get(self.filename)
+
+    @file_id.setter
+    def file_id(self, file_id: str) -> None:
+        backups = self._backups()
+        backups[self.filename] = file_id
+        with open(self.backup_state_file, "w") as state:
+            json.dump(backups, state, indent=2)
+
+    def _backups(self) -> dict[str, str]:
+        if not os.path.exists(self.backup_state_file):
+            return {}
+        with open(self.backup_state_file) as state:
+            backups: dict[str, str] = json.load(state)
+        return backups
+
+    def get_file(self, file_id: str) -> None:
+        """
+        Fetch the backup specified by `file_id` from Google Drive and restore it into file `self.filename`.
+        """
+        with tempfile.TemporaryDirectory() as tmp:
+            archive = os.path.join(tmp, "backup")
+            request = self.service.files().get_media(fileId=file_id)
+            with FileIO(archive, "wb") as fh:
+                downloader = MediaIoBaseDownload(fh, request, chunksize=self.chunk_size)
+                done = False
+                while not done:
+                    status, done = downloader.next_chunk()
+                    logger.info("Download %d%%.", int(status.progress() * 100))
+            copy = os.path.join(tmp, "restore.db")
+            decompress(archive, copy)
+            snapshot(copy, self.filename)
+        self.file_id = file_id
+
+    def save_file(self) -> str:
+        """
+        Save a snapshot of the database file specified by `self.filename` to Google Drive. Returns the Drive file id.
+
+        The app can keep running: the snapshot is a consistent copy even if it's writing to the database meanwhile.
+        """
+        with tempfile.TemporaryDirectory() as tmp:
+            copy = os.path.join(tmp, "snapshot.db")
+            snapshot(self.filename, copy)
+            archive = os.path.join(tmp, os.path.basename(self.filename) + COMPRESSED_SUFFIX)
+            compress(copy, archive)
+            return self._upload(archive)
+
+    def _upload(self, path: str) -> str:
+        file_id = self.file_id
+        remote = self._remote_file(file_id) if file_id else None
+        if remote is None:
+            file_id = None
+        elif remote.get("md5Checksum") == file_md5(path):
+            logger.info("%s is unchanged since the last backup.", self.filename)
+            return remote["id"]  # type: ignore[no-any-return]
+
+        media = MediaFileUpload(path, resumable=True, chunksize=self.chunk_size)
+        body = {"name": os.path.basename(path)}
+        if file_id:
+            request = self.service.files().update(fileId=file_id, body=body, media_body=media, fields="id, md5Checksum")
+        else:
+            request = self.service.files().create(body=body, media_body=media, fields="id, md5Checksum")
+        response = None
+        while response is None:
+            status, response = request.next_chunk()
+            if status:
+                logger.info("Upload %d%%.", int(status.progress() * 100))
+
+        self.file_id = response["id"]
+        return response["id"]  # type: ignore[no-any-return]
+
+    def _remote_file(self, file_id: str) -> dict[str, Any] | None:
+        """
+        The backup's Drive metadata, or None if it has been deleted from Drive.
+        """
+        try:
+            remote: dict[str, Any] = self.service.files().get(fileId=file_id, fields="id, md5Checksum").execute()
+        except HttpError as exc:
+            if exc.resp.status == 404:
+                return None
+            raise
+        return remote
+
+
+def snapshot(source: str, target: str, pages: int = SNAPSHOT_PAGES) -> None:
+    """
+    Copy the SQLite database `source` into `target` with SQLite's online backup API.
+
+    The copy is made `pages` pages at a time, so other connections are only locked out of `source` for one step at a
+    time. If one of them writes to it meanwhile SQLite starts the copy over, so `target` is always a consistent copy.
+    `source` is opened read-only, so a missing database raises rather than being created empty and copied.
+    """
+    with (
+        closing(sqlite3.connect(f"{Path(source).absolute().as_uri()}?mode=ro", uri=True)) as src,
+        closing(sqlite3.connect(target)) as dst,
+    ):
+        src.backup(dst, pages=pages, sleep=SNAPSHOT_SLEEP)
+
+
+def compress(source: str, target: str) -> None:
+    """
+    Stream `source` into `target`, compressed with zstd where the standard library has it and gzip otherwise.
+
+    The output only depends on the content of `source` (no timestamp or file name), so an unchanged database always
+    compresses to the same bytes and the backup's MD5 can tell whether it has changed.
+    """
+    with open(source, "rb") as src, open(target, "wb") as raw:
+        if zstd is not None:
+            with zstd.ZstdFile(raw, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+        else:
+            with gzip.GzipFile(fileobj=raw, mode="wb", filename="", mtime=0) as dst:
+                shutil.copyfileobj(src, dst)
+
+
+def decompress(source: str, target: str) -> None:
+    """
+    Stream `source`, compressed with zstd or gzip, into `target` uncompressed.
+    """
+    with open(source, "rb") as raw, open(target, "wb") as dst:
+        magic = raw.read(4)
+        raw.seek(0)
+        if magic == ZSTD_MAGIC:
+            if zstd is None:
+                raise ValueError(f"{source} is compressed with zstd, which needs Python 3.14 or later")
+            src: BufferedIOBase = zstd.ZstdFile(raw, "rb")
+        elif magic[:2] == GZIP_MAGIC:
+            src = gzip.GzipFile(fileobj=raw, mode="rb")
+        else:
+            raise ValueError(f"{source} isn't a zstd or gzip backup")
+        with src:
+            shutil.copyfileobj(src, dst)
+
+
+def file_md5(path: str) -> str:
+    """
+    Hex MD5 of a file, read a block at a time; the same as Drive's `md5Checksum` for an identical upload.
+    """
+    digest = hashlib.md5()
+    with open(path, "rb") as file:
+        while block := file.read(1024 * 1024):
+            digest.update(block)
+    return digest.hexdigest()
@@ -0,0 +1,115 @@
+"""
+Streaming export of concerts to CSV or JSONL, optionally compressed.
+
+    python -m concert_db.exporter concerts.csv.gz [--database sqlite:///concerts.sqlite]
+
+The format comes from the file extension (.csv or .jsonl), optionally followed by .gz, .bz2 or .xz to compress the
+output as it's written. The columns match what `concert_db.importer` reads, so an uncompressed export can be imported
+again. Without --database the $ENVIRONMENT database is exported, which must be set.
+"""
+
+import argparse
+import bz2
+import csv
+import gzip
+import json
+import lzma
+import os
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import TextIO
+
+from sqlalchemy import Connection, Row, select
+
+from concert_db.models import Artist, Concert, Venue
+from concert_db.settings import DatabaseConfig, get_db_config
+
+FIELDS = ("artist", "genre", "venue", "location", "date")
+FORMATS = (".csv", ".jsonl")
+COMPRESSORS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+
+
+def stream_concerts(connection: Connection, batch_size: int = 10_000) -> Iterator[Row]:
+    """
+    Every concert joined with its artist and venue, in id order, fetched `batch_size` rows at a time.
+
+    Rows are plain Core tuples read straight off the cursor, so memory use doesn't grow with the number of concerts.
+    """
+    query = (
+        select(
+            Artist.name.label("artist"),
+            Artist.genre,
+            Venue.name.label("venue"),
+            Venue.location,
+            Concert.date,
+        )
+        .select_from(Concert)
+        .join(Concert.artist)
+        .join(Concert.venue)
+        .order_by(Concert.id)
+    )
+    result = connection.execution_options(stream_results=True, yield_per=batch_size).execute(query)
+    for partition in result.partitions():
+        yield from partition
+
+
+def write_concerts(rows: Iterator[Row], file: TextIO, fmt: str) -> int:
+    """
+    Write `rows` to `file` as "csv" or "jsonl". Returns the number written.
+    """
+    if fmt not in ("csv", "jsonl"):
+        raise ValueError(f"Unsupported format {fmt!r}; expected csv or jsonl")
+    writer = csv.writer(file)
+    if fmt == "csv":
+        writer.writerow(FIELDS)
+    count = 0
+    for artist, genre, venue, location, date in rows:
+        if fmt == "csv":
+            writer.writerow((artist, genre, venue, location, date.isoformat() if date else ""))
+        else:
+            record = {"artist": artist, "genre": genre, "venue": venue, "location": location}
+            file.write(json.dumps({**record, "date": date.isoformat() if date else None}) + "\n")
+        count += 1
+    return count
+
+
+def open_output(path: Path) -> tuple[TextIO, str]:
+    """
+    Open `path` for writing, compressed according to its extension. Returns the file and its format.
+    """
+    suffixes = path.suffixes
+    compressor = COMPRESSORS.get(suffixes[-1]) if suffixes else None
+    fmt_suffix = suffixes[-2] if compressor and len(suffixes) > 1 else (suffixes[-1] if suffixes else "")
+    if fmt_suffix not in FORMATS:
+        raise ValueError(f"Can't tell the format of {path.name!r}; use a .csv or .jsonl extension")
+    if compressor:
+        file: TextIO = compressor(path, "wt", encoding="utf-8", newline="")  # type: ignore[operator]
+    else:
+        file = path.open("w", encoding="utf-8", newline="")
+    return file, fmt_suffix.lstrip(".")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export every concert to a CSV or JSONL file.")
+    parser.add_argument("output", type=Path, help="e.g. concerts.csv, concerts.jsonl.gz")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--database", help="SQLAlchemy URL; defaults to the $ENVIRONMENT database")
+    args = parser.parse_args()
+
+    if not args.database and os.getenv("ENVIRONMENT") is None:
+        # the default would be an empty in-memory database
+        parser.error("ENVIRONMENT variable not set; set it or pass --database")
+    db_config = DatabaseConfig(args.database) if args.database else get_db_config()
+    # an older database's dates only read back as dates once migrated
+    db_config.create_tables()
+    start = time.perf_counter()
+    file, fmt = open_output(args.output)
+    with file, db_config.engine.connect() as connection:
+        count = write_concerts(stream_concerts(connection, args.batch_size), file, fmt)
+    seconds = time.perf_counter() - start
+    print(f"Exported {count:,} concerts to {args.output} in {seconds:.1f}s ({count / seconds:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
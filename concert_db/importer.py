@@ -0,0 +1,271 @@
+"""
+Bulk import of concerts from CSV or JSONL files.
+
+    python -m concert_db.importer concerts.csv [more.jsonl ...] [--database sqlite:///concerts.sqlite]
+
+Without --database the concerts go into the $ENVIRONMENT database, which must be set.
+
+Each record has `artist`, `genre`, `venue`, `location` and an optional `date` (YYYY-MM-DD). CSV files need a header
+row with those names; JSONL files have one object per line.
+"""
+
+import argparse
+import csv
+import datetime
+import json
+import os
+import sys
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import Connection, Engine, Integer, bindparam, exists, func, inspect, select, tuple_
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import InstrumentedAttribute
+
+from concert_db.models import CONCERT_SEARCH_INSERT_TRIGGER, Artist, Concert, Venue, index_new_concerts, parse_date
+from concert_db.settings import DatabaseConfig, get_db_config
+
+FIELDS = ("artist", "genre", "venue", "location", "date")
+
+# insert an undated concert unless the artist already has one at the venue, which the unique constraint can't catch
+_ARTIST_ID = bindparam("artist_id", type_=Integer)
+_VENUE_ID = bindparam("venue_id", type_=Integer)
+UNDATED_INSERT = insert(Concert).from_select(
+    ["artist_id", "venue_id"],
+    select(_ARTIST_ID, _VENUE_ID).where(
+        ~exists().where(Concert.artist_id == _ARTIST_ID, Concert.venue_id == _VENUE_ID, Concert.date.is_(None))
+    ),
+)
+
+
+@dataclass
+class ConcertRecord:
+    line: int
+    artist: str
+    genre: str
+    venue: str
+    location: str
+    date: datetime.date | None
+
+
+@dataclass
+class Reject:
+    line: int
+    reason: str
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0
+    inserted: int = 0
+    # concerts already in the database (or repeated in the input)
+    duplicates: int = 0
+    rejects: list[Reject] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def read_records(path: Path) -> Iterator[dict[str, Any] | Reject]:
+    """
+    Stream the raw records of a .csv or .jsonl file, with their line number under "line".
+    """
+    with path.open(newline="", encoding="utf-8") as file:
+        if path.suffix == ".csv":
+            reader = csv.DictReader(file)
+            for row in reader:
+                yield {**row, "line": reader.line_num}
+        elif path.suffix in (".jsonl", ".ndjson"):
+            for line_number, line in enumerate(file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as exc:
+                    yield Reject(line_number, f"invalid JSON: {exc.msg}")
+                    continue
+                if not isinstance(record, dict):
+                    yield Reject(line_number, "not a JSON object")
+                    continue
+                yield {**record, "line": line_number}
+        else:
+            raise ValueError(f"Unsupported file type {path.suffix!r}; expected .csv or .jsonl")
+
+
+def validate(record: dict[str, Any]) -> ConcertRecord | Reject:
+    """
+    Turn a raw record into a ConcertRecord, or say why it can't be imported.
+    """
+    line = record["line"]
+    values = {name: str(record.get(name) or "").strip() for name in FIELDS}
+    missing = [name for name in FIELDS[:4] if not values[name]]
+    if missing:
+        return Reject(line, f"missing {', '.join(missing)}")
+    date = None
+    if values["date"]:
+        date = parse_date(values["date"])
+        if date is None:
+            return Reject(line, f"invalid date {values['date']!r}")
+    return ConcertRecord(line, values["artist"], values["genre"], values["venue"], values["location"], date)
+
+
+class ConcertImporter:
+    """
+    Inserts concerts in large batches, creating artists and venues as they're first seen.
+
+    Artists and venues are resolved through in-memory name -> id maps loaded once up front, so a batch costs a
+    handful of statements however many rows it has. Dated concerts are inserted `ON CONFLICT DO NOTHING` against the
+    unique constraints; SQLite treats NULLs as distinct there, so undated concerts are only inserted if the artist has
+    no undated concert at that venue yet. Either way, re-importing a file (or importing overlapping files) is safe.
+    """
+
+    def __init__(self, engine: Engine, batch_size: int = 20_000) -> None:
+        self.engine = engine
+        self.batch_size = batch_size
+        with engine.connect() as connection:
+            self.search_index = inspect(connection).has_table("concerts_fts")
+        self._load_ids()
+
+    def _load_ids(self) -> None:
+        with self.engine.connect() as connection:
+            self.artist_ids: dict[tuple[str, str], int] = {
+                (name, genre): id_
+                for id_, name, genre in connection.execute(select(Artist.id, Artist.name, Artist.genre))
+            }
+            self.venue_ids: dict[tuple[str, str], int] = {
+                (name, location): id_
+                for id_, name, location in connection.execute(select(Venue.id, Venue.name, Venue.location))
+            }
+
+    def run(self, records: Iterable[dict[str, Any] | Reject]) -> ImportResult:
+        """
+        Import `records` in a single transaction, inserting them a batch at a time.
+
+        If anything fails the whole import is rolled back, so a file is never left half imported.
+        """
+        result = ImportResult()
+        start = time.perf_counter()
+        try:
+            with self.engine.begin() as connection:
+                # pysqlite only opens a transaction at the first INSERT, so it would commit the DROP TRIGGER below
+                # straight away
+                connection.exec_driver_sql("BEGIN")
+                if self.search_index:
+                    # indexing each row from its trigger is most of the cost of the insert, so index the new rows at
+                    # once at the end instead; it's all one transaction, so no other writer can slip a concert past
+                    # the missing trigger, and a failed import rolls back to the trigger being there
+                    last_id = connection.execute(select(func.max(Concert.id))).scalar() or 0
+                    connection.exec_driver_sql("DROP TRIGGER IF EXISTS concerts_fts_insert")
+                batch: list[ConcertRecord] = []
+                for record in records:
+                    result.rows += 1
+                    checked = record if isinstance(record, Reject) else validate(record)
+                    if isinstance(checked, Reject):
+                        result.rejects.append(checked)
+                        continue
+                    batch.append(checked)
+                    if len(batch) >= self.batch_size:
+                        self._insert(connection, batch, result)
+                        batch = []
+                if batch:
+                    self._insert(connection, batch, result)
+                if self.search_index:
+                    index_new_concerts(connection, last_id)
+                    connection.exec_driver_sql(CONCERT_SEARCH_INSERT_TRIGGER)
+        except Exception:
+            # the artists & venues the import added were rolled back with it
+            self._load_ids()
+            raise
+        result.seconds = time.perf_counter() - start
+        return result
+
+    def _insert(self, connection: Connection, batch: list[ConcertRecord], result: ImportResult) -> None:
+        self._add_missing(
+            connection, Artist, Artist.genre, self.artist_ids, {(record.artist, record.genre) for record in batch}
+        )
+        self._add_missing(
+            connection, Venue, Venue.location, self.venue_ids, {(record.venue, record.location) for record in batch}
+        )
+
+        rows = [
+            {
+                "artist_id": self.artist_ids[(record.artist, record.genre)],
+                "venue_id": self.venue_ids[(record.venue, record.location)],
+                "date": record.date,
+            }
+            for record in batch
+        ]
+        dated = [row for row in rows if row["date"] is not None]
+        undated = [row for row in rows if row["date"] is None]
+        inserted = 0
+        if dated:
+            inserted += connection.execute(insert(Concert).on_conflict_do_nothing(), dated).rowcount
+        if undated:
+            # executed row by row, so a concert repeated within the batch sees the copy inserted before it
+            inserted += connection.execute(UNDATED_INSERT, undated).rowcount
+        result.inserted += inserted
+        result.duplicates += len(batch) - inserted
+
+    @staticmethod
+    def _add_missing(
+        connection: Connection,
+        model: type[Artist] | type[Venue],
+        qualifier: InstrumentedAttribute[str],
+        ids: dict[tuple[str, str], int],
+        wanted: set[tuple[str, str]],
+    ) -> None:
+        """
+        Insert the (name, qualifier) pairs of `wanted` that aren't in `ids` yet, and add their ids to it.
+        """
+        missing = wanted - ids.keys()
+        if not missing:
+            return
+        inserted = connection.execute(
+            insert(model).on_conflict_do_nothing().returning(model.id, model.name, qualifier),
+            [{"name": name, qualifier.key: other} for name, other in missing],
+        )
+        ids.update({(name, other): id_ for id_, name, other in inserted})
+        # rows that conflicted were added by another writer since the maps were loaded
+        if conflicted := missing - ids.keys():
+            query = select(model.id, model.name, qualifier).where(tuple_(model.name, qualifier).in_(conflicted))
+            ids.update({(name, other): id_ for id_, name, other in connection.execute(query)})
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Import concerts from CSV or JSONL files.")
+    parser.add_argument("files", nargs="+", type=Path)
+    parser.add_argument("--batch-size", type=int, default=20_000)
+    parser.add_argument("--show-rejects", type=int, default=20, help="how many rejected lines to list")
+    parser.add_argument("--database", help="SQLAlchemy URL; defaults to the $ENVIRONMENT database")
+    args = parser.parse_args()
+
+    if not args.database and os.getenv("ENVIRONMENT") is None:
+        # the default would be an in-memory database, thrown away on exit along with everything imported
+        parser.error("ENVIRONMENT variable not set; set it or pass --database")
+    db_config = DatabaseConfig(args.database) if args.database else get_db_config()
+    db_config.create_tables()
+    importer = ConcertImporter(db_config.engine, args.batch_size)
+
+    rejected = 0
+    for path in args.files:
+        result = importer.run(read_records(path))
+        rejected += len(result.rejects)
+        print(
+            f"{path}: {result.rows:,} rows in {result.seconds:.1f}s ({result.rows_per_second:,.0f} rows/s), "
+            f"{result.inserted:,} concerts added, {result.duplicates:,} already present, "
+            f"{len(result.rejects):,} rejected"
+        )
+        for reject in result.rejects[: args.show_rejects]:
+            print(f"  line {reject.line}: {reject.reason}", file=sys.stderr)
+        if len(result.rejects) > args.show_rejects:
+            print(f"  ... and {len(result.rejects) - args.show_rejects:,} more", file=sys.stderr)
+    return 1 if rejected else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""
+Per-action SQL statistics: how many statements each UI action or handler issues, how long they take, and which
+statement shapes it repeats (a likely N+1 pattern).
+
+Enabled with SQL_STATS=true; every statement and each suspected N+1 pattern is logged to $SQL_STATS_LOG
+(sql_stats.log by default), and the app's SQL panel shows the running totals. Statements are logged at DEBUG level and
+the summary at INFO, so they're only written if the application lets this module's logger through at those levels.
+"""
+
+import logging
+import os
+import re
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from types import FrameType
+from typing import Any
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import Connection, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# statements not issued from inside concert_db, e.g. from a test or a shell
+OTHER = "(other)"
+
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_NUMBER = re.compile(r"\b\d+\b")
+_SPACE = re.compile(r"\s+")
+
+_installed: "WeakKeyDictionary[Engine, SqlStats]" = WeakKeyDictionary()
+
+
+def log_to_file(path: str) -> logging.FileHandler:
+    """
+    Write this module's log records to `path`, reusing the handler already writing to that file if there is one.
+    """
+    filename = os.path.abspath(path)
+    for handler in logger.handlers:
+        if isinstance(handler, logging.FileHandler) and handler.baseFilename == filename:
+            return handler
+    handler = logging.FileHandler(filename)
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+    logger.addHandler(handler)
+    return handler
+
+
+def close_log(handler: logging.Handler) -> None:
+    """
+    Stop writing this module's log records to `handler`'s file, and close it.
+    """
+    logger.removeHandler(handler)
+    handler.close()
+
+
+def statement_shape(statement: str) -> str:
+    """
+    `statement` with literals & IN lists collapsed, so statements that differ only in their values compare equal.
+    """
+    shape = _SPACE.sub(" ", statement).strip()
+    shape = _IN_LIST.sub("(?, ...)", shape)
+    return _NUMBER.sub("?", shape)
+
+
+@dataclass
+class ActionStats:
+    """
+    Statements issued by one action or handler, over all the times it ran.
+    """
+
+    action: str
+    calls: int = 0
+    statements: int = 0
+    seconds: float = 0.0
+    # statement shape -> most times it was issued in a single call, for shapes repeated often enough to suspect N+1
+    suspects: dict[str, int] = field(default_factory=dict)
+
+
+class SqlStats:
+    """
+    Collects `ActionStats` from an engine's cursor events.
+
+    Each statement is attributed to the outermost `concert_db.ui` method on the stack, which is the Textual action or
+    handler that triggered it (e.g. `Concerts.header_selected`, `Concerts.action_edit_concert`), or failing that the
+    outermost `concert_db` function. A call of an action lasts as long as that method's frame, and a statement shape
+    issued `repeat_threshold` times within one call is flagged as a likely N+1 pattern.
+    """
+
+    def __init__(self, log_path: str | None = None, repeat_threshold: int = 5) -> None:
+        self.repeat_threshold = repeat_threshold
+        self.actions: dict[str, ActionStats] = {}
+        # the action & frame of the call the last statement was issued in; the frame is held rather than its id, which
+        # the next call of the same method would likely reuse
+        self._call: tuple[str, FrameType | None] | None = None
+        self._shapes: Counter[str] = Counter()
+        self._handler = log_to_file(log_path) if log_path else None
+
+    def install(self, engine: Engine) -> "SqlStats":
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+        _installed[engine] = self
+        return self
+
+    def remove(self, engine: Engine) -> None:
+        event.remove(engine, "before_cursor_execute", self._before)
+        event.remove(engine, "after_cursor_execute", self._after)
+        _installed.pop(engine, None)
+        self.close_log()
+
+    def close_log(self) -> None:
+        """
+        Stop writing to the log file given at construction, e.g. once the report has been logged on exit.
+        """
+        if self._handler:
+            close_log(self._handler)
+            self._handler = None
+
+    def _before(self, conn: Connection, *_args: Any) -> None:
+        conn.info.setdefault("sql_stats_start", []).append(time.perf_counter())
+
+    def _after(self, conn: Connection, _cursor: Any, statement: str, *_args: Any) -> None:
+        seconds = time.perf_counter() - conn.info["sql_stats_start"].pop()
+        frame = action_frame(sys._getframe(1))
+        action = OTHER if frame is None else frame.f_code.co_qualname
+        stats = self.actions.setdefault(action, ActionStats(action))
+        call = (action, frame)
+        if self._call is None or call[0] != self._call[0] or call[1] is not self._call[1]:
+            self._call = call
+            self._shapes.clear()
+            stats.calls += 1
+        stats.statements += 1
+        stats.seconds += seconds
+        logger.debug("%s %.2fms %s", action, seconds * 1000, _SPACE.sub(" ", statement).strip())
+
+        shape = statement_shape(statement)
+        self._shapes[shape] += 1
+        repeats = self._shapes[shape]
+        if repeats >= self.repeat_threshold and repeats > stats.suspects.get(shape, 0):
+            if shape not in stats.suspects:
+                logger.warning("possible N+1 in %s: %s repeated %d+ times in one call", action, shape, repeats)
+            stats.suspects[shape] = repeats
+
+    def report(self) -> list[str]:
+        """
+        One line per action, most statements first, each followed by its suspected N+1 statements.
+        """
+        lines = []
+        for stats in sorted(self.actions.values(), key=lambda stats: stats.statements, reverse=True):
+            lines.append(
+                f"{stats.action}: {stats.calls} calls, {stats.statements} statements, {stats.seconds * 1000:.1f}ms"
+            )
+            lines += [f"  N+1? x{count}: {shape}" for shape, count in stats.suspects.items()]
+        return lines
+
+    def log_report(self) -> None:
+        for line in self.report():
+            logger.info(line)
+
+
+def action_frame(frame: FrameType | None) -> FrameType | None:
+    """
+    The frame of the outermost `concert_db.ui` method on the stack from `frame`, or else the outermost `concert_db`
+    function outside this module.
+    """
+    ui = package = None
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("concert_db.ui."):
+            ui = frame
+        elif module.startswith("concert_db.") and module != __name__:
+            package = frame
+        frame = frame.f_back
+    return ui or package
+
+
+def sql_stats(db_session: Session) -> SqlStats | None:
+    """
+    The statistics being collected for the session's engine, if any.
+    """
+    bind = db_session.get_bind()
+    return _installed.get(bind) if isinstance(bind, Engine) else None
@@ -1,7 +1,35 @@
-from typing import Optional
+import datetime
+import re
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Optional
 
-from sqlalchemy import ForeignKey, UniqueConstraint
+from sqlalchemy import (
+    DDL,
+    ColumnElement,
+    Connection,
+    Date,
+    ForeignKey,
+    Index,
+    Row,
+    UniqueConstraint,
+    and_,
+    column,
+    event,
+    func,
+    literal,
+    literal_column,
+    select,
+    table,
+    text,
+    update,
+)
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column, relationship
+from sqlalchemy.sql.compiler import SQLCompiler
+from sqlalchemy.sql.selectable import Join
 
 from concert_db.types import Notification
 
@@ -12,12 +40,18 @@ class Base(DeclarativeBase):
 
 class Concert(Base):
     __tablename__ = "concerts"
-    __table_args__ = (UniqueConstraint("artist_id", "venue_id", "date", name="unique_concert"),)
+    __table_args__ = (
+        UniqueConstraint("artist_id", "venue_id", "date", name="unique_concert"),
+        # serve Artist/Venue then Date sorts in index order (see concert_db.ui.concert.sort_terms)
+        Index("ix_concerts_artist_id_date", "artist_id", "date"),
+        Index("ix_concerts_venue_id_date", "venue_id", "date"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     artist_id: Mapped[int] = mapped_column(ForeignKey("artists.id"))
     venue_id: Mapped[int] = mapped_column(ForeignKey("venues.id"))
-    date: Mapped[Optional[str]]
+    # stored by SQLite as ISO-8601 text, so it sorts and range-scans the ix_concerts_date index in date order
+    date: Mapped[Optional[datetime.date]] = mapped_column(Date, index=True)
     artist: Mapped["Artist"] = relationship(back_populates="concerts")
     venue: Mapped["Venue"] = relationship(back_populates="concerts")
 
@@ -30,8 +64,9 @@ class Artist(Base):
     __table_args__ = (UniqueConstraint("name", "genre", name="unique_name_genre"),)
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    name: Mapped[str]
+    name: Mapped[str] = mapped_column(index=True)
     genre: Mapped[str]
+    concert_count: Mapped[int] = mapped_column(default=0, server_default="0")
     concerts: Mapped[list["Concert"]] = relationship(back_populates="artist", cascade="all, delete-orphan")
 
 
@@ -40,14 +75,363 @@ class Venue(Base):
     __table_args__ = (UniqueConstraint("name", "location", name="unique_name_location"),)
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    name: Mapped[str]
+    name: Mapped[str] = mapped_column(index=True)
     location: Mapped[str]
+    concert_count: Mapped[int] = mapped_column(default=0, server_default="0")
     concerts: Mapped[list["Concert"]] = relationship(back_populates="venue")
 
 
-def save_object(obj: Base, db_session: Session, notify_callback: Notification | None = None) -> None:
+# Artist.concert_count and Venue.concert_count are denormalized; these triggers keep them in step with every
+# insert, delete or reassignment of a concert, whether it goes through the ORM, Core or a raw SQL shell.
+CONCERT_COUNT_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS concerts_count_insert AFTER INSERT ON concerts
+    BEGIN
+        UPDATE artists SET concert_count = concert_count + 1 WHERE id = NEW.artist_id;
+        UPDATE venues SET concert_count = concert_count + 1 WHERE id = NEW.venue_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS concerts_count_delete AFTER DELETE ON concerts
+    BEGIN
+        UPDATE artists SET concert_count = concert_count - 1 WHERE id = OLD.artist_id;
+        UPDATE venues SET concert_count = concert_count - 1 WHERE id = OLD.venue_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS concerts_count_update AFTER UPDATE OF artist_id, venue_id ON concerts
+    BEGIN
+        UPDATE artists SET concert_count = concert_count - 1 WHERE id = OLD.artist_id;
+        UPDATE artists SET concert_count = concert_count + 1 WHERE id = NEW.artist_id;
+        UPDATE venues SET concert_count = concert_count - 1 WHERE id = OLD.venue_id;
+        UPDATE venues SET concert_count = concert_count + 1 WHERE id = NEW.venue_id;
+    END
+    """,
+)
+
+# SQLite stores Concert.date as text and would take any string, e.g. '31/12/1999' from a shell, which the Date type
+# then fails to read back. These reject anything that isn't a valid YYYY-MM-DD date: date() returns NULL for other
+# formats, and with a '+0 days' modifier it rolls an impossible day over (1999-02-30 -> 1999-03-02), so only a real
+# date already in that form comes back unchanged.
+CONCERT_DATE_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS concerts_date_insert BEFORE INSERT ON concerts
+    WHEN NEW.date IS NOT NULL AND NEW.date IS NOT date(NEW.date, '+0 days')
+    BEGIN
+        SELECT RAISE(ABORT, 'concerts.date must be a valid YYYY-MM-DD date');
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS concerts_date_update BEFORE UPDATE OF date ON concerts
+    WHEN NEW.date IS NOT NULL AND NEW.date IS NOT date(NEW.date, '+0 days')
+    BEGIN
+        SELECT RAISE(ABORT, 'concerts.date must be a valid YYYY-MM-DD date');
+    END
+    """,
+)
+
+for _trigger in (*CONCERT_COUNT_TRIGGERS, *CONCERT_DATE_TRIGGERS):
+    event.listen(Concert.__table__, "after_create", DDL(_trigger).execute_if(dialect="sqlite"))
+
+
+# Full-text index over the searchable text of each concert (rowid = concerts.id) for the concert filter. The trigram
+# tokenizer matches any substring of 3+ characters, case-insensitively, which keeps the semantics of the old
+# `ilike('%term%')` filter while letting SQLite answer it from the index instead of scanning the three-way join.
+CONCERT_SEARCH_INSERT_TRIGGER = """
+    CREATE TRIGGER IF NOT EXISTS concerts_fts_insert AFTER INSERT ON concerts
+    BEGIN
+        INSERT INTO concerts_fts (rowid, artist, genre, venue, location, date)
+        SELECT NEW.id, artists.name, artists.genre, venues.name, venues.location, NEW.date
+        FROM artists, venues WHERE artists.id = NEW.artist_id AND venues.id = NEW.venue_id;
+    END
+    """
+CONCERT_SEARCH_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS concerts_fts USING fts5(artist, genre, venue, location, date, tokenize='trigram')
+    """,
+    CONCERT_SEARCH_INSERT_TRIGGER,
+    """
+    CREATE TRIGGER IF NOT EXISTS concerts_fts_delete AFTER DELETE ON concerts
+    BEGIN
+        DELETE FROM concerts_fts WHERE rowid = OLD.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS concerts_fts_update AFTER UPDATE ON concerts
+    BEGIN
+        DELETE FROM concerts_fts WHERE rowid = OLD.id;
+        INSERT INTO concerts_fts (rowid, artist, genre, venue, location, date)
+        SELECT NEW.id, artists.name, artists.genre, venues.name, venues.location, NEW.date
+        FROM artists, venues WHERE artists.id = NEW.artist_id AND venues.id = NEW.venue_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS artists_fts_update AFTER UPDATE OF name, genre ON artists
+    BEGIN
+        UPDATE concerts_fts SET artist = NEW.name, genre = NEW.genre
+        WHERE rowid IN (SELECT id FROM concerts WHERE artist_id = NEW.id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS venues_fts_update AFTER UPDATE OF name, location ON venues
+    BEGIN
+        UPDATE concerts_fts SET venue = NEW.name, location = NEW.location
+        WHERE rowid IN (SELECT id FROM concerts WHERE venue_id = NEW.id);
+    END
+    """,
+)
+# the trigram tokenizer can't match anything shorter than this
+SEARCH_MIN_LENGTH = 3
+
+concerts_fts = table("concerts_fts", column("rowid"))
+
+
+def search_supported(connection: Connection) -> bool:
+    """
+    Whether this SQLite build has FTS5 with the trigram tokenizer (3.34+).
+    """
+    if connection.dialect.name != "sqlite":
+        return False
+    compile_options = {row[0] for row in connection.exec_driver_sql("PRAGMA compile_options")}
+    return "ENABLE_FTS5" in compile_options and connection.dialect.dbapi.sqlite_version_info >= (3, 34)  # type: ignore[union-attr]
+
+
+def _create_search_index(_target: object, connection: Connection, **_kwargs: object) -> None:
+    if search_supported(connection):
+        for ddl in CONCERT_SEARCH_DDL:
+            connection.exec_driver_sql(ddl)
+
+
+def _drop_search_index(_target: object, connection: Connection, **_kwargs: object) -> None:
+    # virtual tables aren't part of the metadata, so drop_all() doesn't know about it
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql("DROP TABLE IF EXISTS concerts_fts")
+
+
+event.listen(Concert.__table__, "after_create", _create_search_index)
+event.listen(Concert.__table__, "after_drop", _drop_search_index)
+
+
+def has_search_index(db_session: Session) -> bool:
+    """
+    Whether the database has the concert full-text index (older databases or SQLite builds may not).
+    """
+    query = text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'concerts_fts'")
+    return db_session.get_bind().dialect.name == "sqlite" and db_session.execute(query).first() is not None
+
+
+def search_concerts(term: str) -> ColumnElement[bool]:
+    """
+    Filter matching concerts whose artist, genre, venue, location or date contains `term` (case-insensitive).
+
+    Requires the full-text index and a term of at least SEARCH_MIN_LENGTH characters.
+    """
+    # a quoted FTS5 string is a literal substring for the trigram tokenizer; embedded quotes are doubled
+    phrase = '"{}"'.format(term.replace('"', '""'))
+    return Concert.id.in_(select(concerts_fts.c.rowid).where(literal_column("concerts_fts").match(phrase)))
+
+
+class CrossJoin(Join):
+    """
+    An inner join whose left side SQLite always makes the outer loop.
+
+    SQLite's planner never reorders the tables of a CROSS JOIN, which is its documented way to pick a join order
+    regardless of table statistics. Other databases get a plain JOIN.
+    """
+
+    inherit_cache = True
+
+
+@compiles(CrossJoin, "sqlite")
+def _compile_cross_join(element: CrossJoin, compiler: SQLCompiler, **kwargs: Any) -> str:
+    kwargs["asfrom"] = True
+    left = compiler.process(element.left, **kwargs)
+    right = compiler.process(element.right, **kwargs)
+    # never None: Join works the ON clause out from the foreign keys when it isn't given one
+    onclause = compiler.process(element.onclause, **kwargs)  # type: ignore[arg-type]
+    return f"{left} CROSS JOIN {right} ON {onclause}"
+
+
+def parse_date(value: str) -> datetime.date | None:
+    """
+    The date in a YYYY-MM-DD string, or None if it isn't one (including impossible dates like 2023-02-30).
+    """
+    if not re.search(r"^\d{4}-\d{2}-\d{2}$", value):
+        return None
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+# a year or YYYY-MM-DD date, or an inclusive range of them with either end optional: 2019, 2019..2023, ..2005
+_DATE_BOUND = r"\d{4}(?:-\d{2}-\d{2})?"
+DATE_FILTER = re.compile(rf"^(?P<start>{_DATE_BOUND})?(?:(?P<range>\.\.)(?P<end>{_DATE_BOUND})?)?$")
+
+
+def _date_bound(value: str | None, first: bool) -> datetime.date | None:
+    if value is None:
+        return None
+    if len(value) == 4:
+        return datetime.date(int(value), 1, 1) if first else datetime.date(int(value), 12, 31)
+    return datetime.date.fromisoformat(value)
+
+
+def date_filter(term: str) -> ColumnElement[bool] | None:
+    """
+    Filter matching concerts in the year or date range written in `term`, or None if `term` isn't one.
+
+    Both ends compare against the indexed date column, so SQLite answers it with a range scan of ix_concerts_date.
+    """
+    match = DATE_FILTER.match(term.strip())
+    if not match or not (match["start"] or match["end"]):
+        return None
     try:
-        db_session.add(obj)
+        start = _date_bound(match["start"], first=True)
+        end = _date_bound(match["end"] if match["range"] else match["start"], first=False)
+    except ValueError:
+        # e.g. 2019-02-30
+        return None
+    conditions = []
+    if start is not None:
+        conditions.append(Concert.date >= start)
+    if end is not None:
+        conditions.append(Concert.date <= end)
+    return and_(*conditions)
+
+
+_INDEX_CONCERTS = (
+    "INSERT INTO concerts_fts (rowid, artist, genre, venue, location, date) "
+    "SELECT concerts.id, artists.name, artists.genre, venues.name, venues.location, concerts.date "
+    "FROM concerts JOIN artists ON artists.id = concerts.artist_id JOIN venues ON venues.id = concerts.venue_id "
+    "WHERE concerts.id > :after_id"
+)
+
+
+def rebuild_search_index(db_session: Session) -> None:
+    """
+    Repopulate the concert full-text index from the concerts, artists and venues tables.
+    """
+    db_session.execute(text("DELETE FROM concerts_fts"))
+    db_session.execute(text(_INDEX_CONCERTS), {"after_id": 0})
+    db_session.commit()
+
+
+def index_new_concerts(connection: Connection, after_id: int) -> None:
+    """
+    Add the concerts with an id above `after_id` to the full-text index in one statement.
+
+    For bulk inserts made with the per-row `concerts_fts_insert` trigger dropped, which is several times faster.
+    """
+    connection.execute(text(_INDEX_CONCERTS), {"after_id": after_id})
+
+
+def backfill_concert_counts(db_session: Session) -> None:
+    """
+    Recompute the denormalized concert counts for every artist and venue from the concerts table.
+    """
+    for model, foreign_key in ((Artist, Concert.artist_id), (Venue, Concert.venue_id)):
+        actual = select(func.count(Concert.id)).where(foreign_key == model.id).scalar_subquery()
+        db_session.execute(update(model).values(concert_count=actual))
+    db_session.commit()
+
+
+def check_concert_counts(db_session: Session) -> list[Row]:
+    """
+    Find artists and venues whose stored concert count disagrees with the concerts table.
+
+    Returns rows of (table, id, name, stored, actual); an empty list means the counts are consistent.
+    """
+    mismatches: list[Row] = []
+    for model, foreign_key in ((Artist, Concert.artist_id), (Venue, Concert.venue_id)):
+        actual = select(func.count(Concert.id)).where(foreign_key == model.id).scalar_subquery()
+        query = select(
+            literal(model.__tablename__).label("table"),
+            model.id,
+            model.name,
+            model.concert_count.label("stored"),
+            actual.label("actual"),
+        ).where(model.concert_count != actual)
+        mismatches.extend(db_session.execute(query).all())
+    return mismatches
+
+
+@dataclass
+class Choices:
+    """
+    The distinct names of an artist or venue table in display order, and the id each name selects.
+    """
+
+    ids: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def names(self) -> list[str]:
+        return list(self.ids)
+
+
+class ReferenceData:
+    """
+    Artist & venue choices for the concert screens, loaded once per session rather than every time a screen opens.
+
+    A choice list is dropped as soon as an artist or venue is flushed through the session, and reloaded the next time
+    it's asked for. Changes written outside the session (e.g. by the importer) aren't seen until then.
+    """
+
+    def __init__(self, db_session: Session) -> None:
+        self.db_session = db_session
+        self._choices: dict[type[Artist] | type[Venue], Choices] = {}
+
+    @property
+    def artists(self) -> Choices:
+        return self._load(Artist)
+
+    @property
+    def venues(self) -> Choices:
+        return self._load(Venue)
+
+    def invalidate(self, model: type[Artist] | type[Venue]) -> None:
+        self._choices.pop(model, None)
+
+    def _load(self, model: type[Artist] | type[Venue]) -> Choices:
+        if model not in self._choices:
+            choices = Choices()
+            # a name shared by several rows (e.g. one artist in two genres) selects the first of them
+            for id_, name in self.db_session.execute(select(model.id, model.name).order_by(model.name, model.id)):
+                choices.ids.setdefault(name, id_)
+            self._choices[model] = choices
+        return self._choices[model]
+
+
+def reference_data(db_session: Session) -> ReferenceData:
+    """
+    The session's cached artist & venue choices.
+    """
+    cache = db_session.info.get("reference_data")
+    if not isinstance(cache, ReferenceData):
+        cache = db_session.info["reference_data"] = ReferenceData(db_session)
+    return cache
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_reference_data(db_session: Session, _flush_context: object) -> None:
+    cache = db_session.info.get("reference_data")
+    if cache is None:
+        return
+    for obj in (*db_session.new, *db_session.dirty, *db_session.deleted):
+        if isinstance(obj, (Artist, Venue)):
+            cache.invalidate(type(obj))
+
+
+@contextmanager
+def unit_of_work(db_session: Session, notify_callback: Notification | None = None) -> Iterator[Session]:
+    """
+    Group the adds & updates made inside the block into one transaction, committed once when the block exits.
+
+    If anything fails the whole transaction is rolled back and the error re-raised; either way the outcome is reported
+    to `notify_callback`.
+    """
+    try:
+        yield db_session
         db_session.commit()
         if callable(notify_callback):
             notify_callback("Saved successfully!", severity="information")
@@ -55,3 +439,69 @@ def save_object(obj: Base, db_session: Session, notify_callback: Notification |
         db_session.rollback()
         if callable(notify_callback):
             notify_callback(f"Error saving object: {exc}", severity="error")
+        raise
+
+
+def save_object(obj: Base, db_session: Session, notify_callback: Notification | None = None) -> bool:
+    """
+    Add & commit `obj`. Returns whether it was saved.
+
+    A database error (e.g. a duplicate) is only reported to `notify_callback`; anything else is a bug and is raised.
+    """
+    try:
+        with unit_of_work(db_session, notify_callback):
+            db_session.add(obj)
+    except SQLAlchemyError:
+        return False
+    return True
+
+
+def save_objects(
+    objs: Iterable[Base],
+    db_session: Session,
+    notify_callback: Notification | None = None,
+    savepoints: bool = False,
+) -> list[Base]:
+    """
+    Save `objs` with a single commit. Returns the objects that couldn't be saved.
+
+    By default it's all or nothing. With `savepoints`, each object is flushed inside its own SAVEPOINT so one that
+    fails (e.g. a duplicate) is rolled back and reported on its own while the rest are still committed together.
+    Errors other than the database's are rolled back and raised.
+    """
+    objs = list(objs)
+    failed: list[Base] = []
+    try:
+        if savepoints:
+            _begin_sqlite_transaction(db_session)
+            for obj in objs:
+                try:
+                    with db_session.begin_nested():
+                        db_session.add(obj)
+                except SQLAlchemyError as exc:
+                    failed.append(obj)
+                    if callable(notify_callback):
+                        notify_callback(f"Error saving {type(obj).__name__.lower()}: {exc}", severity="error")
+        else:
+            db_session.add_all(objs)
+        db_session.commit()
+    except Exception as exc:
+        db_session.rollback()
+        if not isinstance(exc, SQLAlchemyError):
+            raise
+        if callable(notify_callback):
+            notify_callback(f"Error saving objects: {exc}", severity="error")
+        return objs
+
+    if callable(notify_callback) and not failed:
+        notify_callback(f"Saved {len(objs)} successfully!", severity="information")
+    return failed
+
+
+def _begin_sqlite_transaction(db_session: Session) -> None:
+    # pysqlite only opens a transaction at the first INSERT/UPDATE, so a SAVEPOINT issued before then becomes the
+    # transaction itself and releasing it commits; open one explicitly so the savepoints nest inside a single commit
+    connection = db_session.connection()
+    dbapi_connection = connection.connection.dbapi_connection
+    if connection.dialect.name == "sqlite" and not getattr(dbapi_connection, "in_transaction", True):
+        connection.exec_driver_sql("BEGIN")
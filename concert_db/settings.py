@@ -1,18 +1,272 @@
+import datetime
+import logging
 import os
 import os.path
-from io import FileIO
-from typing import ClassVar
-
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow  # type: ignore[import-untyped]
-from googleapiclient.discovery import build  # type: ignore[import-untyped]
-from googleapiclient.http import MediaFileUpload, MediaIoBaseDownload  # type: ignore[import-untyped]
-from sqlalchemy import create_engine
+import re
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import (
+    Column,
+    Connection,
+    DateTime,
+    Integer,
+    String,
+    Table,
+    bindparam,
+    column,
+    create_engine,
+    event,
+    func,
+    inspect,
+    select,
+    table,
+)
 from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from concert_db.instrumentation import SqlStats
+from concert_db.models import (
+    CONCERT_COUNT_TRIGGERS,
+    CONCERT_DATE_TRIGGERS,
+    CONCERT_SEARCH_DDL,
+    Base,
+    backfill_concert_counts,
+    rebuild_search_index,
+    search_supported,
+)
+
+logger = logging.getLogger(__name__)
+
+# one row per migration applied to the database
+schema_version = Table(
+    "schema_version",
+    Base.metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False, server_default=func.current_timestamp()),
+)
+
+# concert dates the date conversion couldn't make sense of, kept so they can be fixed by hand
+concert_date_rejects = Table(
+    "concert_date_rejects",
+    Base.metadata,
+    Column("concert_id", Integer, primary_key=True),
+    Column("value", String, nullable=False),
+    Column("reason", String, nullable=False),
+    Column("rejected_at", DateTime, nullable=False, server_default=func.current_timestamp()),
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    """
+    A numbered schema change, applied once to databases created before it existed.
+    """
+
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+def _create_index(name: str, table: str, column: str) -> Callable[[Connection], None]:
+    def upgrade(connection: Connection) -> None:
+        connection.exec_driver_sql(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({column})")
+
+    return upgrade
+
+
+def _add_sort_indexes(connection: Connection) -> None:
+    connection.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_concerts_artist_id_date ON concerts (artist_id, date)")
+    connection.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_concerts_venue_id_date ON concerts (venue_id, date)")
+    # (venue_id, date) serves everything the single-column index did
+    connection.exec_driver_sql("DROP INDEX IF EXISTS ix_concerts_venue_id")
+    # without statistics the planner sorts name-then-date orders in a temp B-tree rather than walking these indexes
+    connection.exec_driver_sql("ANALYZE")
+
+
+def _add_concert_counts(connection: Connection) -> None:
+    for table_name in ("artists", "venues"):
+        columns = {info["name"] for info in inspect(connection).get_columns(table_name)}
+        if "concert_count" not in columns:
+            connection.exec_driver_sql(f"ALTER TABLE {table_name} ADD COLUMN concert_count INTEGER NOT NULL DEFAULT 0")
+    for trigger in CONCERT_COUNT_TRIGGERS:
+        connection.exec_driver_sql(trigger)
+    with Session(bind=connection) as session:
+        backfill_concert_counts(session)
+
+
+def _add_search_index(connection: Connection) -> None:
+    if not search_supported(connection):
+        # the concert filter falls back to LIKE without the index
+        return
+    for ddl in CONCERT_SEARCH_DDL:
+        connection.exec_driver_sql(ddl)
+    with Session(bind=connection) as session:
+        rebuild_search_index(session)
+
+
+# year first, with any separator and optionally unpadded or followed by a time: 2019-06-01, 2019/6/1, 2019-06-01 20:00
+LEGACY_DATE = re.compile(r"^(\d{4})[-/.](\d{1,2})[-/.](\d{1,2})(?:[ T].*)?$")
+
+
+def _convert_concert_dates(connection: Connection) -> None:
+    # untyped columns, so the stored strings come back as they are rather than through the Date type
+    concerts = table("concerts", column("id"), column("artist_id"), column("venue_id"), column("date"))
+    rows = connection.execute(
+        select(concerts.c.id, concerts.c.artist_id, concerts.c.venue_id, concerts.c.date)
+        .where(concerts.c.date.is_not(None))
+        .order_by(concerts.c.id)
+    ).all()
+
+    seen: set[tuple[int, int, str]] = set()
+    converted: list[dict[str, object]] = []
+    rejects: list[dict[str, object]] = []
+    for concert_id, artist_id, venue_id, value in rows:
+        match = LEGACY_DATE.match(str(value).strip())
+        try:
+            iso = datetime.date(*(int(part) for part in match.groups())).isoformat() if match else None
+        except ValueError:
+            iso = None
+        if iso is None:
+            rejects.append({"concert_id": concert_id, "value": str(value), "reason": "not a valid date"})
+        elif (artist_id, venue_id, iso) in seen:
+            # e.g. "2019-6-1" next to "2019-06-01"; keeping both would break the unique constraint
+            rejects.append({"concert_id": concert_id, "value": str(value), "reason": f"duplicate of {iso}"})
+        else:
+            seen.add((artist_id, venue_id, iso))
+            if iso != value:
+                converted.append({"concert_id": concert_id, "iso": iso})
+
+    # clear rejects first, so a converted value can't collide with one that's about to be cleared
+    if rejects:
+        connection.execute(concert_date_rejects.insert(), rejects)
+        connection.execute(
+            concerts.update().where(concerts.c.id == bindparam("concert_id")).values(date=None),
+            [{"concert_id": reject["concert_id"]} for reject in rejects],
+        )
+        logger.warning(
+            "%d concert dates couldn't be converted and were cleared; see concert_date_rejects.", len(rejects)
+        )
+    if converted:
+        connection.execute(
+            concerts.update().where(concerts.c.id == bindparam("concert_id")).values(date=bindparam("iso")),
+            converted,
+        )
+
+
+def _check_concert_dates(connection: Connection) -> None:
+    # dates written through a shell or script since they were converted are converted (or cleared) the same way first,
+    # as the triggers only check new writes
+    _convert_concert_dates(connection)
+    for trigger in CONCERT_DATE_TRIGGERS:
+        connection.exec_driver_sql(trigger)
+
+
+# Ordered schema changes. Every step must be safe to re-run against a database that already has the change, since
+# databases from before versioning may have picked some of them up from create_all() or a script.
+MIGRATIONS: tuple[Migration, ...] = (
+    # indexes behind the concert sorting (artist/venue name, date) and the concerts -> venues join
+    Migration(1, "index concerts.date", _create_index("ix_concerts_date", "concerts", "date")),
+    Migration(2, "index concerts.venue_id", _create_index("ix_concerts_venue_id", "concerts", "venue_id")),
+    Migration(3, "index artists.name", _create_index("ix_artists_name", "artists", "name")),
+    Migration(4, "index venues.name", _create_index("ix_venues_name", "venues", "name")),
+    Migration(5, "denormalized concert counts", _add_concert_counts),
+    Migration(6, "concert full-text search index", _add_search_index),
+    Migration(7, "concert dates as ISO-8601 dates", _convert_concert_dates),
+    Migration(8, "composite indexes for multi-column sorting", _add_sort_indexes),
+    Migration(9, "reject invalid concert dates", _check_concert_dates),
+)
+
+
+def get_schema_version(connection: Connection) -> int | None:
+    """
+    The latest migration applied to the database, or None if it isn't versioned yet.
+    """
+    if not inspect(connection).has_table(schema_version.name):
+        return None
+    return connection.execute(select(func.max(schema_version.c.version))).scalar()
+
+
+def migrate(connection: Connection, migrations: tuple[Migration, ...] = MIGRATIONS) -> list[Migration]:
+    """
+    Apply the migrations newer than the database's schema version, recording each one. Returns those applied.
+
+    Tables missing from the database are created first; a database with no tables at all already matches the models,
+    so it is stamped with the latest version instead of being migrated.
+    """
+    fresh = not inspect(connection).has_table("concerts")
+    current = get_schema_version(connection)
+    Base.metadata.create_all(connection, checkfirst=True)
+
+    pending = [migration for migration in migrations if migration.version > (current or 0)]
+    if fresh:
+        if pending:
+            connection.execute(
+                schema_version.insert(),
+                [{"version": migration.version, "description": migration.description} for migration in pending],
+            )
+        # gather planner statistics, as a migrated database gets after its sort indexes are added
+        connection.exec_driver_sql("ANALYZE")
+        return []
+
+    for migration in pending:
+        migration.upgrade(connection)
+        connection.execute(schema_version.insert().values(version=migration.version, description=migration.description))
+    return pending
+
+
+@dataclass(frozen=True)
+class SqliteProfile:
+    """
+    PRAGMAs applied to every new SQLite connection.
+    """
 
-from concert_db.models import Base
+    journal_mode: str
+    synchronous: str
+    # pages, or KiB when negative
+    cache_size: int
+    # bytes of the database file to memory-map; 0 disables mmap
+    mmap_size: int
+    temp_store: str
+    # milliseconds to wait for a lock held by another connection before failing with "database is locked"
+    busy_timeout: int
+
+    def pragmas(self) -> dict[str, object]:
+        return {
+            # first, so switching the journal mode waits for other connections instead of failing
+            "busy_timeout": self.busy_timeout,
+            "journal_mode": self.journal_mode,
+            "synchronous": self.synchronous,
+            "cache_size": self.cache_size,
+            "mmap_size": self.mmap_size,
+            "temp_store": self.temp_store,
+        }
+
+    def apply(self, dbapi_connection: Any, _connection_record: object = None) -> None:
+        """
+        Set the PRAGMAs on a raw DBAPI connection; used as an engine "connect" listener.
+        """
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma, value in self.pragmas().items():
+                cursor.execute(f"PRAGMA {pragma} = {value}")
+        finally:
+            cursor.close()
+
+
+SQLITE_PROFILES = {
+    # SQLite's own defaults: rollback journal, fsync on every commit, ~2 MiB page cache
+    "baseline": SqliteProfile("DELETE", "FULL", -2_000, 0, "DEFAULT", 0),
+    # WAL lets the UI read while a write commits, and only fsyncs at checkpoints; a power cut can lose the last
+    # commits but never corrupts the database
+    "balanced": SqliteProfile("WAL", "NORMAL", -64_000, 256 * 1024 * 1024, "MEMORY", 5_000),
+    # WAL with an fsync on every commit, for when a just-saved concert must survive a power cut
+    "durable": SqliteProfile("WAL", "FULL", -64_000, 0, "DEFAULT", 5_000),
+}
+DEFAULT_SQLITE_PROFILE = "balanced"
 
 
 class DatabaseConfig:
@@ -20,13 +274,17 @@ class DatabaseConfig:
     Database configuration for different environments.
     """
 
-    def __init__(self, database_url: str | None = None):
+    def __init__(self, database_url: str | None = None, profile: str | None = None):
         """
         Initialize database configuration.
 
         :param database_url: SQLAlchemy database URL. If None, uses in-memory SQLite.
+        :param profile: name of the SQLite performance profile. If None, uses $SQLITE_PROFILE or "balanced".
         """
         self.database_url: str = database_url or "sqlite:///:memory:"
+        self.profile_name: str = profile or os.getenv("SQLITE_PROFILE") or DEFAULT_SQLITE_PROFILE
+        if self.profile_name not in SQLITE_PROFILES:
+            raise ValueError(f"Unknown SQLite profile {self.profile_name!r}; choose from {', '.join(SQLITE_PROFILES)}")
         self._engine: Engine | None = None
         self._sessionmaker: sessionmaker | None = None
 
@@ -36,9 +294,31 @@ class DatabaseConfig:
         Get or create the SQLAlchemy engine.
         """
         if self._engine is None:
-            self._engine = create_engine(self.database_url, echo=os.getenv("SQL_ECHO", "false").lower() == "true")
+            options: dict[str, Any] = {}
+            if self.database_url == "sqlite:///:memory:":
+                # every new connection would be a new, empty database, so share one with every thread (e.g. the
+                # concert filter's worker)
+                options = {"poolclass": StaticPool, "connect_args": {"check_same_thread": False}}
+            self._engine = create_engine(
+                self.database_url, echo=os.getenv("SQL_ECHO", "false").lower() == "true", **options
+            )
+            if self._engine.dialect.name == "sqlite":
+                event.listen(self._engine, "connect", SQLITE_PROFILES[self.profile_name].apply)
+            if os.getenv("SQL_STATS", "false").lower() == "true":
+                SqlStats(os.getenv("SQL_STATS_LOG", "sql_stats.log")).install(self._engine)
         return self._engine
 
+    def pragma_settings(self) -> dict[str, object]:
+        """
+        The PRAGMA values actually in effect on a connection, which can differ from the profile's (e.g. an in-memory
+        database can't use WAL).
+        """
+        with self.engine.connect() as connection:
+            return {
+                pragma: connection.exec_driver_sql(f"PRAGMA {pragma}").scalar()
+                for pragma in SQLITE_PROFILES[self.profile_name].pragmas()
+            }
+
     @property
     def sessionmaker(self) -> sessionmaker:
         """
@@ -50,9 +330,11 @@ class DatabaseConfig:
 
     def create_tables(self) -> None:
         """
-        Create all database tables.
+        Create all database tables and bring an existing database up to the latest schema version.
         """
-        Base.metadata.create_all(self.engine, checkfirst=True)
+        with self.engine.begin() as connection:
+            for migration in migrate(connection):
+                logger.info("Applied migration %d: %s", migration.version, migration.description)
 
     def drop_tables(self) -> None:
         """
@@ -67,54 +349,6 @@ class DatabaseConfig:
         return self.sessionmaker()  # type: ignore
 
 
-class DatabaseBackupConfig:
-    oauth_scopes: ClassVar = ["https://www.googleapis.com/auth/drive.file"]
-    oauth_token_file = "google_oauth_token.json"
-    oauth_credentials_file = "google_oauth_credentials.json"
-
-    def __init__(self, filename: str) -> None:
-        self.filename = filename
-        creds = None
-        if os.path.exists(self.oauth_token_file):
-            creds = Credentials.from_authorized_user_file(self.oauth_token_file, self.oauth_scopes)
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
-                creds.refresh(Request())
-            else:
-                flow = InstalledAppFlow.from_client_secrets_file(self.oauth_credentials_file, self.oauth_scopes)
-                creds = flow.run_local_server(port=0)
-            with open(self.oauth_token_file, "w") as token:
-                token.write(creds.to_json())
-
-        self.service = build("drive", "v3", credentials=creds)
-
-    def get_file(self, file_id: str) -> None:
-        """
-        Fetch the database file specified by `file_id` from Google Drive and store it in file `self.filename`.
-        """
-        request = self.service.files().get_media(fileId=file_id)
-        fh = FileIO(self.filename, "wb")
-        downloader = MediaIoBaseDownload(fh, request)
-        done = False
-        while not done:
-            status, done = downloader.next_chunk()
-            print(f"Download {int(status.progress() * 100)}%.")
-
-    def save_file(self) -> str:
-        """
-        Save the database file specified by `self.filename` to Google Drive.
-        """
-        file_metadata = {"name": self.filename}
-        media = MediaFileUpload(self.filename, resumable=True)
-
-        # TODO: this needs to be update() not create()
-        # ???:  or, just make an update_file() method?
-        file = self.service.files().create(body=file_metadata, media_body=media, fields="id").execute()
-
-        # this is a string, trust.
-        return file.get("id")  # type: ignore[no-any-return]
-
-
 def get_db_config() -> DatabaseConfig:
     """
     Get database configuration based on environment.
@@ -124,3 +358,15 @@ def get_db_config() -> DatabaseConfig:
         return DatabaseConfig("sqlite:///:memory:")
     else:
         return DatabaseConfig(f"sqlite:///concert_db_{env}.sqlite")
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Backups used to live here; they're imported from `concert_db.backup` on first use so startup doesn't pay for
+    loading the Google client libraries.
+    """
+    if name == "DatabaseBackupConfig":
+        from concert_db.backup import DatabaseBackupConfig
+
+        return DatabaseBackupConfig
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,5 +1,6 @@
 from typing import ClassVar
 
+from sqlalchemy import Row
 from sqlalchemy.orm import Session
 from textual.app import ComposeResult
 from textual.binding import Binding
@@ -9,6 +10,8 @@ from textual.widgets import Button, DataTable, Input, Label
 
 from concert_db.models import Artist, save_object
 
+from .table import SyncedDataTable
+
 
 class ArtistScreen(Vertical):
     BINDINGS: ClassVar = [
@@ -18,23 +21,44 @@ class ArtistScreen(Vertical):
 
     def __init__(self, db_session: Session) -> None:
         self.db_session = db_session
-        self._artists: list[Artist] = []
         super().__init__()
 
     def compose(self) -> ComposeResult:
-        yield DataTable(id="artists_table", zebra_stripes=True, cursor_type="row", classes="section")
+        yield SyncedDataTable(id="artists_table", zebra_stripes=True, cursor_type="row", classes="section")
 
     def on_mount(self) -> None:
         table = self.query_one("#artists_table", DataTable)
         table.border_title = "Artists"
-        self.load_artists()
+        # filled in by the app once the concerts are shown (see `ConcertDbApp.populate_panels()`)
+        table.loading = True
+
+    def populate(self, session: Session) -> None:
+        """
+        Query the artists on `session` in the app's populate worker, and show them on the event loop.
+        """
+        self.app.call_from_thread(self.show_populated, self.query_artists(session))
+
+    def show_populated(self, artists: list[Row]) -> None:
+        self.show_artists(artists)
+        self.query_one("#artists_table", SyncedDataTable).loading = False
 
     def load_artists(self) -> None:
-        table = self.query_one("#artists_table", DataTable)
-        table.clear(columns=True)
-        table.add_columns("Name", "Genre", "Concerts")
-        self._artists = self.db_session.query(Artist).order_by(Artist.name).all()
-        table.add_rows([(artist.name, artist.genre, len(artist.concerts)) for artist in self._artists])
+        self.show_artists(self.query_artists())
+
+    def query_artists(self, session: Session | None = None) -> list[Row]:
+        return (
+            (session or self.db_session)
+            .query(Artist.id, Artist.name, Artist.genre, Artist.concert_count)
+            .order_by(Artist.name)
+            .all()
+        )
+
+    def show_artists(self, artists: list[Row]) -> None:
+        table = self.query_one("#artists_table", SyncedDataTable)
+        table.sync(
+            {"Name": "Name", "Genre": "Genre", "Concerts": "Concerts"},
+            [(artist.id, (artist.name, artist.genre, artist.concert_count)) for artist in artists],
+        )
 
     def handle_modal_result(self, artist: Artist | None) -> None:
         if artist:
@@ -45,14 +69,17 @@ class ArtistScreen(Vertical):
         self.app.push_screen(AddArtistScreen(), self.handle_modal_result)
 
     def action_edit_artist(self) -> None:
-        table = self.query_one("#artists_table", DataTable)
+        table = self.query_one("#artists_table", SyncedDataTable)
 
-        # Get the artist from our stored list using the cursor row index
-        row_index = table.cursor_row
-        if row_index >= len(self._artists):
+        # rows are keyed by id, so the artist comes straight from the session's identity map when it's loaded
+        key = table.cursor_key
+        if key is None:
             self.app.notify("Invalid row selection", severity="error")
             return
-        artist = self._artists[row_index]
+        artist = self.db_session.get(Artist, int(key))
+        if artist is None:
+            self.app.notify("Artist no longer exists", severity="error")
+            return
 
         self.app.push_screen(EditArtistScreen(artist), self.handle_modal_result)
 
@@ -1,17 +1,52 @@
-import re
+import os
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
 from typing import ClassVar
 
-from sqlalchemy.orm import Session
-from textual import on
+from sqlalchemy import Join, Row, String, cast, func, join
+from sqlalchemy.orm import Query, Session
+from textual import on, work
 from textual.app import ComposeResult
 from textual.binding import Binding
 from textual.containers import Horizontal, Vertical
 from textual.screen import ModalScreen
+from textual.widget import Widget
 from textual.widgets import Button, DataTable, Input, Label, Select
+from textual.worker import Worker, get_current_worker
+
+from concert_db.models import (
+    SEARCH_MIN_LENGTH,
+    Artist,
+    Concert,
+    CrossJoin,
+    Venue,
+    date_filter,
+    has_search_index,
+    parse_date,
+    reference_data,
+    save_object,
+    search_concerts,
+)
+
+from .paging import KeysetPager, SortTerm
+from .sorting import SortableColumns, Sorting
+from .table import PagedTable, SyncedDataTable
 
-from concert_db.models import Artist, Concert, Venue, save_object
+# selected alongside the names they identify, so name sorts can break ties by them (see `sort_terms()`)
+ARTIST_ID = Artist.id.label("artist_id")
+VENUE_ID = Venue.id.label("venue_id")
 
-from .sorting import SortableColumns, Sorting
+
+@dataclass
+class LoadedConcerts:
+    """
+    The concert rows shown in the in-memory table, and the filter & (column, ascending) order they were loaded with.
+    """
+
+    filter_by: str | None
+    order: list[tuple[str, bool]]
+    rows: list[Row]
 
 
 class Concerts(Horizontal):
@@ -23,15 +58,24 @@ class Concerts(Horizontal):
     ]
 
     columns: ClassVar = SortableColumns(["Artist", "Venue", "Date"])
+    # seconds to wait after the last keystroke before filtering
+    filter_debounce: ClassVar[float] = int(os.getenv("FILTER_DEBOUNCE_MS", "250")) / 1000
+    # results with more rows than this are paged from the database instead of loaded whole
+    paging_threshold: ClassVar[int] = int(os.getenv("CONCERTS_PAGING_THRESHOLD", "5000"))
 
     def __init__(self, db_session: Session) -> None:
         self.db_session = db_session
         self._filter_visible = False
+        # detected on first filter; set False to force the `ilike` fallback
+        self.search_index: bool | None = None
+        # kept so header clicks can re-sort without a query; None while paging
+        self.loaded: LoadedConcerts | None = None
         super().__init__()
 
     def compose(self) -> ComposeResult:
         with Horizontal():
-            yield DataTable(id="concerts_table", zebra_stripes=True, cell_padding=6)
+            yield SyncedDataTable(id="concerts_table", zebra_stripes=True, cell_padding=6)
+            yield PagedTable(id="concerts_pages", cell_padding=6)
             with Vertical(id="filter_container"):
                 yield Label("Filter:", classes="filter-label")
                 yield Input(placeholder="Type to filter concerts...", id="filter_input", classes="filter-input")
@@ -39,79 +83,248 @@ class Concerts(Horizontal):
     def on_mount(self) -> None:
         # initial state: filter hidden and sorted by date
         self.query_one("#filter_container").display = False
-        self.load_concerts(sorting=self.columns[2])
+        self.query_one("#concerts_pages").display = False
+        # filled in by the app after the first paint (see `ConcertDbApp.populate_panels()`)
+        self.query_one("#concerts_table").loading = True
 
-    def load_concerts(self, sorting: Sorting, filter_by: str | None = None) -> None:
+    def populate(self, session: Session) -> None:
+        """
+        Query the concerts, sorted by date, on `session` in the app's populate worker, and show them on the event loop.
+        """
+        self.app.call_from_thread(self.show_populated, self.query_result(self.columns[2], session=session))
+
+    def show_populated(self, result: list[Row] | int) -> None:
+        self.show_result(self.columns[2], None, result)
+        self.query_one("#concerts_table").loading = False
+
+    def load_concerts(self, sorting: Sorting | Sequence[Sorting], filter_by: str | None = None) -> None:
         """
         Load and display concerts in the table.
+
+        Results up to `paging_threshold` rows are loaded whole into the table; anything bigger is shown page by page.
         """
-        table = self.query_one("#concerts_table", DataTable)
-        table.clear(columns=True)
-        table.add_columns(*self.columns.titles())
+        self.show_result(sorting, filter_by, self.query_result(sorting, filter_by))
 
-        match sorting.name:
-            case "Artist":
-                column_name = Artist.name
-            case "Venue":
-                column_name = Venue.name
-            case "Date":
-                column_name = Concert.date  # type: ignore[assignment]
+    def query_result(
+        self, sorting: Sorting | Sequence[Sorting], filter_by: str | None = None, session: Session | None = None
+    ) -> list[Row] | int:
+        """
+        The concert rows to display, or just how many there are when that's more than `paging_threshold`.
 
-        ordering = column_name.asc() if sorting.ascending else column_name.desc()
-        filtering = None
-        query = self.db_session.query(Concert).join(Artist).join(Venue).order_by(ordering.nulls_last())
-        if filter_by:
+        The concerts are counted first, so a result too big to load whole is never fetched; the pager reads it a page
+        at a time instead.
+        """
+        total = self.count_concerts(filter_by, session)
+        if total > self.paging_threshold:
+            return total
+        return self.fetch_concerts(sorting, filter_by, session=session)
+
+    def show_result(self, sorting: Sorting | Sequence[Sorting], filter_by: str | None, result: list[Row] | int) -> None:
+        """
+        Show a `query_result()`: the rows themselves, or pages of the concerts it counted.
+        """
+        if isinstance(result, int):
+            self.loaded = None
+            self.show_pages(self.page_concerts(sorting, filter_by, total=result))
+        else:
+            self.loaded = LoadedConcerts(filter_by, sort_order(sorting), result)
+            self.show_concerts(result)
+
+    def sort_concerts(self, sorting: Sorting | Sequence[Sorting], filter_by: str | None = None) -> None:
+        """
+        Re-sort the displayed concerts, in memory when they're all loaded and in SQL when they're paged.
+
+        The in-memory order is the same as `fetch_concerts()` would return: nulls last, ties broken by concert id.
+        """
+        loaded = self.loaded
+        if loaded is None or loaded.filter_by != filter_by:
+            self.load_concerts(sorting, filter_by)
+            return
+        order = sort_order(sorting)
+        if len(order) == len(loaded.order) == 1 and order[0][0] == loaded.order[0][0]:
+            if order != loaded.order:
+                loaded.rows = reversed_concerts(loaded.rows, sorting)
+        elif order != loaded.order:
+            loaded.rows = sorted_concerts(loaded.rows, sorting)
+        loaded.order = order
+
+        table = self.query_one("#concerts_table", SyncedDataTable)
+        table.sync_columns(self.column_labels())
+        table.reorder([concert.id for concert in loaded.rows])
+
+    def concerts_query(
+        self,
+        filter_by: str | None = None,
+        session: Session | None = None,
+        sorting: Sorting | Sequence[Sorting] | None = None,
+    ) -> Query:
+        """
+        The unordered (id, artist, venue, date, artist_id, venue_id) query, filtered by `filter_by`.
+
+        The query runs on `session`, or the panel's own session if None. Pass the `sorting` it will be ordered by to
+        join the tables in the order that reads it straight off the indexes (see `concert_joins()`).
+        """
+        session = session or self.db_session
+        # select only the displayed columns so rows are plain tuples, not ORM objects with lazy relationships
+        query = session.query(Concert.id, Artist.name, Venue.name, Concert.date, ARTIST_ID, VENUE_ID).select_from(
+            concert_joins(None if filter_by else sorting)
+        )
+        if filter_by and (dates := date_filter(filter_by)) is not None:
+            # years & date ranges (2019, 2019..2023) are range scans on the date index
+            query = query.filter(dates)
+        elif filter_by and len(filter_by) >= SEARCH_MIN_LENGTH and self.use_search_index(session):
+            query = query.filter(search_concerts(filter_by))
+        elif filter_by:
             filtering = f"%{filter_by}%"
             query = query.filter(
-                (Artist.name.ilike(filtering)) | (Venue.name.ilike(filtering)) | (Concert.date.ilike(filtering))
+                (Artist.name.ilike(filtering))
+                | (Venue.name.ilike(filtering))
+                | (cast(Concert.date, String).ilike(filtering))
             )
-        concerts: list[Concert] = query.all()
-
-        table.add_rows(
-            [
-                (
-                    concert.artist.name,
-                    concert.venue.name,
-                    concert.date or "n/a",
-                )
-                for concert in concerts
-            ]
-        )
+        return query
+
+    def fetch_concerts(
+        self,
+        sorting: Sorting | Sequence[Sorting],
+        filter_by: str | None = None,
+        limit: int | None = None,
+        session: Session | None = None,
+    ) -> list[Row]:
+        """
+        Query the concert rows to display, in display order.
+        """
+        ordering = [term.order_by() for term in sort_terms(sorting)]
+        return self.concerts_query(filter_by, session, sorting).order_by(*ordering).limit(limit).all()
+
+    def count_concerts(self, filter_by: str | None = None, session: Session | None = None) -> int:
+        """
+        How many concerts match `filter_by`.
+        """
+        if filter_by:
+            total = self.concerts_query(filter_by, session).with_entities(func.count(Concert.id)).scalar()
+        else:
+            # every concert has an artist & venue, so there's no need to join just to count them
+            total = (session or self.db_session).query(func.count(Concert.id)).scalar()
+        return total or 0
+
+    def page_concerts(
+        self, sorting: Sorting | Sequence[Sorting], filter_by: str | None = None, total: int | None = None
+    ) -> KeysetPager:
+        """
+        A pager over the concerts to display, sized with a COUNT (unless `total` is already known) so the scrollbar is
+        accurate.
+        """
+        if total is None:
+            total = self.count_concerts(filter_by)
+        return KeysetPager(self.concerts_query(filter_by, sorting=sorting), sort_terms(sorting), total)
+
+    def current_sorting(self) -> list[Sorting]:
+        """
+        The sort keys picked by clicking headers, or the default date order.
+        """
+        return self.columns.sort_keys() or [self.columns[2]]
+
+    def use_search_index(self, session: Session) -> bool:
+        """
+        Filter through the full-text index when the database has one; otherwise fall back to `ilike` scans.
+        """
+        if self.search_index is None:
+            self.search_index = has_search_index(session)
+        return self.search_index
+
+    def column_labels(self) -> dict[str, str]:
+        return {column.name: title for column, title in zip(self.columns.values, self.columns.titles(), strict=True)}
+
+    def show_concerts(self, concerts: list[Row]) -> None:
+        """
+        Show already-fetched concert rows, changing only the table rows that differ from what's displayed.
+        """
+        table = self.query_one("#concerts_table", SyncedDataTable)
+        self._switch_view(table, self.query_one("#concerts_pages", PagedTable))
+        table.sync(self.column_labels(), [(concert.id, concert_cells(concert)) for concert in concerts])
+
+    def show_pages(self, pager: KeysetPager) -> None:
+        """
+        Show concerts page by page, fetching pages from `pager` as the user scrolls.
+        """
+        table = self.query_one("#concerts_table", SyncedDataTable)
+        pages = self.query_one("#concerts_pages", PagedTable)
+        self._switch_view(pages, table)
+        # the in-memory table isn't needed while paging; don't hold on to its rows
+        table.clear()
+        pages.show(self.column_labels(), pager, concert_cells)
+
+    def _switch_view(self, show: Widget, hide: Widget) -> None:
+        if hide.display:
+            hide.display = False
+            show.display = True
+            if hide.has_focus:
+                show.focus()
+
+    @property
+    def active_table(self) -> SyncedDataTable | PagedTable:
+        pages = self.query_one("#concerts_pages", PagedTable)
+        return pages if pages.display else self.query_one("#concerts_table", SyncedDataTable)
+
+    @work(thread=True, exclusive=True, group="filter")
+    def filter_concerts(self, sorting: Sequence[Sorting], filter_by: str | None) -> None:
+        """
+        Filter the table in a worker thread once typing pauses for `filter_debounce` seconds.
+
+        Each keystroke starts a new exclusive worker, which cancels the previous one: a worker cancelled while waiting
+        never queries, and one cancelled while querying drops its result, so only the latest filter text is applied to
+        the table. The query runs on a session of its own, since the panel's isn't thread-safe, and only the table
+        update runs on the event loop.
+        """
+        worker = get_current_worker()
+        time.sleep(self.filter_debounce)
+        if worker.is_cancelled:
+            return
+        with Session(self.db_session.get_bind()) as session:
+            result = self.query_result(sorting, filter_by, session)
+        if not worker.is_cancelled:
+            self.app.call_from_thread(self._apply_filter, worker, sorting, filter_by, result)
+
+    def _apply_filter(
+        self, worker: Worker, sorting: Sequence[Sorting], filter_by: str | None, result: list[Row] | int
+    ) -> None:
+        # a save or header click may have cancelled the filter while its result was on the way
+        if not worker.is_cancelled:
+            self.show_result(sorting, filter_by, result)
+
+    def cancel_filtering(self) -> None:
+        """
+        Drop any pending filter so it can't overwrite a reload triggered by something else.
+        """
+        self.workers.cancel_group(self, "filter")
 
     def handle_modal_result(self, concert: Concert | None) -> None:
         if concert:
             save_object(concert, self.db_session, self.app.notify)
+            self.cancel_filtering()
             # Preserve current filter when refreshing
             current_filter = None
             if self._filter_visible:
                 filter_input = self.query_one("#filter_input", Input)
                 current_filter = filter_input.value.strip() if filter_input.value.strip() else None
-            current_sorting = next((col for col in self.columns.values if col.ascending is not None), self.columns[2])
-            self.load_concerts(sorting=current_sorting, filter_by=current_filter)
+            self.load_concerts(sorting=self.current_sorting(), filter_by=current_filter)
 
     def action_add_concert(self) -> None:
         self.app.push_screen(AddConcertScreen(self.db_session), self.handle_modal_result)
 
     def action_edit_concert(self) -> None:
-        table = self.query_one("#concerts_table", DataTable)
-        try:
-            row = table.get_row_at(table.cursor_row)
-            artist, venue, date = row
-        except Exception as exc:
-            raise RuntimeError(f"Error fetching row to edit! {exc}")
-
-        if date == "n/a":
-            date = None
-        concert = (
-            self.db_session.query(Concert)
-            .join(Artist)
-            .join(Venue)
-            .filter(Artist.name == artist, Venue.name == venue, Concert.date == date)
-            .first()
-        )
-        if not concert:
-            # shouldn't get here; for safety...
-            raise ValueError("Could not find concert to edit")
+        # rows are keyed by concert id, so there's no need to look the concert up by its displayed values
+        table = self.active_table
+        if isinstance(table, PagedTable):
+            row = table.cursor_source_row
+            concert_id = None if row is None else row.id
+        else:
+            key = table.cursor_key
+            concert_id = None if key is None else int(key)
+        concert = None if concert_id is None else self.db_session.get(Concert, concert_id)
+        if concert is None:
+            self.app.notify("Invalid row selection", severity="error")
+            return
 
         self.app.push_screen(EditConcertScreen(concert, self.db_session), self.handle_modal_result)
 
@@ -124,6 +337,7 @@ class Concerts(Horizontal):
             filter_container.display = False
             filter_input.value = ""
             self._filter_visible = False
+            self.cancel_filtering()
             self.load_concerts(sorting=self.columns[2], filter_by=None)
         else:
             # Show filter and focus it
@@ -138,40 +352,121 @@ class Concerts(Horizontal):
             filter_container.display = False
             filter_input.value = ""
             self._filter_visible = False
+            self.cancel_filtering()
             self.load_concerts(sorting=self.columns[2], filter_by=None)
-            table = self.query_one("#concerts_table", DataTable)
-            table.focus()
+            self.active_table.focus()
 
     @on(Input.Changed, "#filter_input")
     def filter_changed(self, event: Input.Changed) -> None:
         filter_text = event.value.strip() or None
-        current_sorting = next(
-            (col for col in self.columns.values if col.ascending is not None),
-            self.columns[2],  # or, use date
-        )
-        self.load_concerts(sorting=current_sorting, filter_by=filter_text)
+        self.filter_concerts(self.current_sorting(), filter_text)
 
     @on(DataTable.HeaderSelected, "#concerts_table")
-    def header_selected(self, event: DataTable.HeaderSelected) -> None:
+    @on(PagedTable.HeaderSelected, "#concerts_pages")
+    def header_selected(self, event: DataTable.HeaderSelected | PagedTable.HeaderSelected) -> None:
         filter_container = self.query_one("#filter_container")
         filter_input = self.query_one("#filter_input", Input)
         filter_text = None
         if self._filter_visible is True and filter_container.display is True:
             filter_text = filter_input.value.strip() or None
-        for idx, column in enumerate(self.columns.values):
-            if idx != event.column_index:
-                column.ascending = None  # reset sort on other columns
-            if idx == event.column_index:
-                _column = self.columns[event.column_index]
-                _column.ascending = not _column.ascending
+        sorting = self.columns.sort_by(event.column_index)
+        self.cancel_filtering()
+        self.sort_concerts(sorting=sorting, filter_by=filter_text)
 
-        self.load_concerts(sorting=_column, filter_by=filter_text)
 
+def sort_keys(sorting: Sorting | Sequence[Sorting]) -> list[Sorting]:
+    return [sorting] if isinstance(sorting, Sorting) else list(sorting)
 
-def fetch_data(db_session: Session) -> tuple[list[Artist], list[Venue]]:
-    artists = db_session.query(Artist).order_by(Artist.name).all()
-    venues = db_session.query(Venue).order_by(Venue.name).all()
-    return artists, venues
+
+def sort_order(sorting: Sorting | Sequence[Sorting]) -> list[tuple[str, bool]]:
+    return [(key.name, bool(key.ascending)) for key in sort_keys(sorting)]
+
+
+def concert_joins(sorting: Sorting | Sequence[Sorting] | None = None) -> Join:
+    """
+    Concerts joined to their artists & venues, led by the table of the first of `sorting`'s keys.
+
+    Walking ix_artists_name and looking each artist's concerts up in ix_concerts_artist_id_date gives Artist then Date
+    order without sorting, but SQLite's planner only picks that when its statistics say there are far fewer artists
+    than concerts. Without them (a fresh database, or one that has grown a lot since its last ANALYZE) it scans the
+    concerts and sorts the lot. Joining the artists first with a CROSS JOIN fixes them as the outer loop whatever the
+    statistics say; likewise the venues for a Venue sort. Filtered queries are left to the planner, as a filter that
+    matches a few concerts is better read from its own index and sorted.
+    """
+    keys = sort_keys(sorting) if sorting else []
+    match keys[0].name if keys else None:
+        case "Artist":
+            return CrossJoin(Artist, Concert, Artist.id == Concert.artist_id).join(Venue, Venue.id == Concert.venue_id)
+        case "Venue":
+            return CrossJoin(Venue, Concert, Venue.id == Concert.venue_id).join(Artist, Artist.id == Concert.artist_id)
+        case _:
+            return join(Concert, Artist, Artist.id == Concert.artist_id).join(Venue, Venue.id == Concert.venue_id)
+
+
+def sort_terms(sorting: Sorting | Sequence[Sorting]) -> list[SortTerm]:
+    """
+    The ORDER BY terms for `sorting`'s keys, ending with the concert id so every row has a unique position.
+
+    Each name is followed by its artist or venue id. That keeps the rows of two artists who share a name apart, so
+    SQLite can walk ix_artists_name and then a concerts index on (artist_id, date) to produce e.g. Artist then Date
+    order straight from the indexes, without sorting (see `concert_joins()`).
+    """
+    terms = []
+    for key in sort_keys(sorting):
+        ascending = bool(key.ascending)
+        match key.name:
+            case "Artist":
+                terms += [SortTerm(Artist.name, ascending), SortTerm(ARTIST_ID, ascending)]
+            case "Venue":
+                terms += [SortTerm(Venue.name, ascending), SortTerm(VENUE_ID, ascending)]
+            case "Date":
+                terms.append(SortTerm(Concert.date, ascending, nullable=True))
+            case _:
+                raise ValueError(f"Unknown sort column {key.name!r}")
+    # the id follows the direction of the term before it, so an index ending in that column can supply it in order
+    terms.append(SortTerm(Concert.id, terms[-1].ascending))
+    return terms
+
+
+# positions within a concert row of the values each column is sorted by
+SORT_VALUES = {"Artist": (1, 4), "Venue": (2, 5), "Date": (3,)}
+
+
+def sorted_concerts(concerts: list[Row], sorting: Sorting | Sequence[Sorting]) -> list[Row]:
+    """
+    Concert rows in the order `Concerts.fetch_concerts()` sorts them for `sorting`.
+    """
+    keys = sort_keys(sorting)
+    # sorts are stable, so sort by the least significant term first
+    rows = sorted(concerts, key=lambda row: row[0], reverse=not keys[-1].ascending)
+    for key in reversed(keys):
+        index = SORT_VALUES[key.name]
+        if key.ascending:
+            rows.sort(key=lambda row: (row[index[-1]] is None, *(row[idx] for idx in index)))
+        else:
+            # reversed, so nulls (False) still sort last
+            rows.sort(key=lambda row: (row[index[-1]] is not None, *(row[idx] for idx in index)), reverse=True)
+    return rows
+
+
+def reversed_concerts(concerts: list[Row], sorting: Sorting | Sequence[Sorting]) -> list[Row]:
+    """
+    Rows already sorted on a single column, in the opposite direction.
+    """
+    # nulls sort last both ways, so reverse the rows with a value and the rows without one separately
+    index = SORT_VALUES[sort_keys(sorting)[0].name][-1]
+    split = len(concerts)
+    while split and concerts[split - 1][index] is None:
+        split -= 1
+    return concerts[:split][::-1] + concerts[split:][::-1]
+
+
+def concert_cells(concert: Row) -> tuple[str, str, str]:
+    """
+    Displayed cells of a concert row.
+    """
+    _id, artist, venue, date = concert[:4]
+    return artist, venue, date.isoformat() if date else "n/a"
 
 
 class AddConcertScreen(ModalScreen[Concert | None]):
@@ -181,7 +476,8 @@ class AddConcertScreen(ModalScreen[Concert | None]):
 
     def __init__(self, db_session: Session) -> None:
         self.db_session = db_session
-        self.artists, self.venues = fetch_data(db_session)
+        self.artists = reference_data(db_session).artists
+        self.venues = reference_data(db_session).venues
         super().__init__()
 
     def compose(self) -> ComposeResult:
@@ -189,7 +485,7 @@ class AddConcertScreen(ModalScreen[Concert | None]):
             yield Label("Add New Concert", classes="title")
             yield Label("Artist:")
             yield Select.from_values(
-                [a.name for a in self.artists],
+                self.artists.names,
                 type_to_search=True,
                 allow_blank=False,
                 prompt="Select an artist",
@@ -198,7 +494,7 @@ class AddConcertScreen(ModalScreen[Concert | None]):
             )
             yield Label("Venue:")
             yield Select.from_values(
-                [v.name for v in self.venues],
+                self.venues.names,
                 type_to_search=True,
                 allow_blank=False,
                 prompt="Select a venue",
@@ -223,15 +519,15 @@ class AddConcertScreen(ModalScreen[Concert | None]):
             date = date_input.value.strip()
 
             if artist and venue and date:
-                pattern = re.compile(r"^\d{4}-\d{2}-\d{2}$")
-                if not pattern.search(date):
+                concert_date = parse_date(date)
+                if concert_date is None:
                     self.app.notify("Date must be in format YYYY-MM-DD", severity="error")
                     self.dismiss(None)
                     return
-                # selected values are raw strings because of Select.from_values(), so match objs from class variables
-                _artist = next(filter(lambda a: a.name == artist, self.artists))
-                _venue = next(filter(lambda v: v.name == venue, self.venues))
-                concert = Concert(artist=_artist, venue=_venue, date=date)
+                # selected values are raw strings because of Select.from_values(), so look up their ids by name
+                _artist = self.db_session.get_one(Artist, self.artists.ids[str(artist)])
+                _venue = self.db_session.get_one(Venue, self.venues.ids[str(venue)])
+                concert = Concert(artist=_artist, venue=_venue, date=concert_date)
                 self.dismiss(concert)
             else:
                 self.dismiss(None)
@@ -247,7 +543,9 @@ class EditConcertScreen(ModalScreen[Concert | None]):
 
     def __init__(self, concert: Concert, db_session: Session) -> None:
         self.concert = concert
-        self.artists, self.venues = fetch_data(db_session)
+        self.db_session = db_session
+        self.artists = reference_data(db_session).artists
+        self.venues = reference_data(db_session).venues
         super().__init__()
 
     def compose(self) -> ComposeResult:
@@ -255,7 +553,7 @@ class EditConcertScreen(ModalScreen[Concert | None]):
             yield Label("Edit Concert", classes="title")
             yield Label("Artist:")
             yield Select.from_values(
-                [a.name for a in self.artists],
+                self.artists.names,
                 value=self.concert.artist.name,
                 type_to_search=True,
                 allow_blank=False,
@@ -265,7 +563,7 @@ class EditConcertScreen(ModalScreen[Concert | None]):
             )
             yield Label("Venue:")
             yield Select.from_values(
-                [v.name for v in self.venues],
+                self.venues.names,
                 value=self.concert.venue.name,
                 type_to_search=True,
                 allow_blank=False,
@@ -274,7 +572,11 @@ class EditConcertScreen(ModalScreen[Concert | None]):
                 compact=False,
             )
             yield Label("Date (YYYY-MM-DD):")
-            yield Input(placeholder="Date", value=self.concert.date, id="concert_date")
+            yield Input(
+                placeholder="Date",
+                value=self.concert.date.isoformat() if self.concert.date else "",
+                id="concert_date",
+            )
             with Horizontal():
                 yield Button("Save", variant="primary", id="save")
                 yield Button("Cancel", variant="default", id="cancel")
@@ -291,17 +593,17 @@ class EditConcertScreen(ModalScreen[Concert | None]):
             date = date_input.value.strip()
 
             if artist and venue and date:
-                pattern = re.compile(r"^\d{4}-\d{2}-\d{2}$")
-                if not pattern.search(date):
+                concert_date = parse_date(date)
+                if concert_date is None:
                     self.app.notify("Date must be in format YYYY-MM-DD", severity="error")
                     self.dismiss(None)
                     return
-                # selected values are raw strings because of Select.from_values(), so match objs from class variables
-                _artist = next(filter(lambda a: a.name == artist, self.artists))
-                _venue = next(filter(lambda v: v.name == venue, self.venues))
+                # selected values are raw strings because of Select.from_values(), so look up their ids by name
+                _artist = self.db_session.get_one(Artist, self.artists.ids[str(artist)])
+                _venue = self.db_session.get_one(Venue, self.venues.ids[str(venue)])
                 self.concert.artist = _artist
                 self.concert.venue = _venue
-                self.concert.date = date
+                self.concert.date = concert_date
                 self.dismiss(self.concert)
             else:
                 self.dismiss(None)
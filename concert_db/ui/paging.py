@@ -0,0 +1,135 @@
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import ColumnElement, Row, and_, or_
+from sqlalchemy.orm import InstrumentedAttribute, Query
+
+
+@dataclass(frozen=True)
+class SortTerm:
+    """
+    One term of an ORDER BY. Nulls of a `nullable` column always come last in display order.
+    """
+
+    column: InstrumentedAttribute[Any] | ColumnElement[Any]
+    ascending: bool
+    nullable: bool = False
+
+    def order_by(self, reverse: bool = False) -> ColumnElement[Any]:
+        """
+        The ORDER BY clause for this term; reversed, the direction flips and nulls come first.
+        """
+        clause = self.column.asc() if self.ascending != reverse else self.column.desc()
+        if self.nullable:
+            return clause.nulls_first() if reverse else clause.nulls_last()
+        return clause
+
+
+class KeysetPager:
+    """
+    Fixed-size pages of an ordered query, fetched on demand and kept in a bounded LRU cache.
+
+    Rows are ordered by `order`, whose last term must be unique (e.g. the primary key) so every row has a unique
+    position. A page next to one already cached is fetched with keyset pagination (`WHERE (a, b, key) > last_seen`),
+    which stays cheap however deep into the result it is; only a jump to a page with no cached neighbour (e.g. dragging
+    the scrollbar) falls back to OFFSET.
+    """
+
+    def __init__(
+        self,
+        query: Query,
+        order: Sequence[SortTerm],
+        total: int,
+        page_size: int = 200,
+        max_pages: int = 10,
+    ) -> None:
+        """
+        :param query: unordered query whose rows include every column of `order`
+        :param total: number of rows in the query, from a COUNT
+        """
+        self.query = query
+        self.order = tuple(order)
+        self.total = total
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self._pages: OrderedDict[int, list[Row]] = OrderedDict()
+        # index of each order column within each row, for building keyset bounds
+        expressions = [column["expr"] for column in query.column_descriptions]
+        self._indexes = [
+            next(idx for idx, expr in enumerate(expressions) if expr is term.column) for term in self.order
+        ]
+
+    def row(self, index: int) -> Row | None:
+        """
+        The row at absolute position `index`, or None when out of range.
+        """
+        if not 0 <= index < self.total:
+            return None
+        page = self.page(index // self.page_size)
+        offset = index % self.page_size
+        return page[offset] if offset < len(page) else None
+
+    def page(self, number: int) -> list[Row]:
+        """
+        Rows of page `number`, from the cache when possible.
+        """
+        if number in self._pages:
+            self._pages.move_to_end(number)
+            return self._pages[number]
+
+        if number - 1 in self._pages and self._pages[number - 1]:
+            rows = self._after(self._pages[number - 1][-1])
+        elif number + 1 in self._pages and self._pages[number + 1]:
+            rows = self._before(self._pages[number + 1][0])
+        else:
+            rows = self._ordered().offset(number * self.page_size).limit(self.page_size).all()
+
+        self._pages[number] = rows
+        while len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+        return rows
+
+    @property
+    def cached_pages(self) -> list[int]:
+        return list(self._pages)
+
+    def _ordered(self, reverse: bool = False) -> Query:
+        return self.query.order_by(*(term.order_by(reverse) for term in self.order))
+
+    def _after(self, last: Row) -> list[Row]:
+        return self._ordered().filter(self._beyond(last, forward=True)).limit(self.page_size).all()
+
+    def _before(self, first: Row) -> list[Row]:
+        rows = self._ordered(reverse=True).filter(self._beyond(first, forward=False)).limit(self.page_size).all()
+        return rows[::-1]
+
+    def _beyond(self, row: Row, forward: bool) -> ColumnElement[bool]:
+        """
+        Rows strictly after (forward) or before `row` in display order.
+
+        For terms a, b, key that's `a past row.a OR (a = row.a AND b past row.b) OR (a = row.a AND b = row.b AND ...)`.
+        """
+        conditions = []
+        same: list[ColumnElement[bool]] = []
+        for term, index in zip(self.order, self._indexes, strict=True):
+            value: Any = row[index]
+            if (past := self._past(term, value, forward)) is not None:
+                conditions.append(and_(*same, past))
+            same.append(term.column.is_(None) if value is None else term.column == value)
+        return or_(*conditions)
+
+    @staticmethod
+    def _past(term: SortTerm, value: Any, forward: bool) -> ColumnElement[bool] | None:
+        """
+        Values of `term` strictly after (forward) or before `value` in display order, or None if there are none.
+        """
+        if value is None:
+            # nulls come last, so nothing is after one and every value is before it
+            return None if forward else term.column.is_not(None)
+        increasing = term.ascending == forward
+        past: ColumnElement[bool] = term.column > value if increasing else term.column < value
+        if forward and term.nullable:
+            return or_(past, term.column.is_(None))
+        return past
@@ -11,23 +11,54 @@ class Sorting:
 class SortableColumns:
     sort_asc = "↑"
     sort_desc = "↓"
+    # shown after the arrow of each sorted column when more than one is sorted
+    priority_marks = "¹²³⁴⁵⁶⁷⁸⁹"
+    # the clicked column plus this many - 1 previously sorted columns, as tie-breaks
+    max_keys = 2
 
     def __init__(self, column_names: list[str]) -> None:
         self.values: list[Sorting] = []
+        # indexes of the sorted columns, primary key first
+        self.priority: list[int] = []
         for idx, name in enumerate(column_names):
             self.values.append(Sorting(idx, name=name, ascending=None))
 
     def __getitem__(self, index: int) -> Sorting:
         return self.values[index]
 
+    def sort_by(self, index: int) -> list[Sorting]:
+        """
+        Make column `index` the primary sort key and return the sort keys.
+
+        Clicking the primary column again flips its direction; any other column starts ascending, and the previous
+        primary is kept after it so rows it tied on stay in their old order (e.g. Artist ↑ then Date ↓).
+        """
+        column = self.values[index]
+        column.ascending = not column.ascending if self.priority[:1] == [index] else True
+        self.priority = [index, *(idx for idx in self.priority if idx != index)][: self.max_keys]
+        for idx, other in enumerate(self.values):
+            if idx not in self.priority:
+                other.ascending = None
+        return self.sort_keys()
+
+    def sort_keys(self) -> list[Sorting]:
+        """
+        The sorted columns, primary key first.
+        """
+        ranked = [idx for idx in self.priority if self.values[idx].ascending is not None]
+        ranked += [
+            column.column for column in self.values if column.ascending is not None and column.column not in ranked
+        ]
+        return [self.values[idx] for idx in ranked]
+
     def titles(self) -> list[str]:
+        ranks = {column.column: rank for rank, column in enumerate(self.sort_keys())}
         _titles = []
         for column in self.values:
             if column.ascending is not None:
-                if bool(column.ascending):
-                    _titles.append(f"{column.name} {self.sort_asc}")
-                else:
-                    _titles.append(f"{column.name} {self.sort_desc}")
+                arrow = self.sort_asc if bool(column.ascending) else self.sort_desc
+                mark = self.priority_marks[ranks[column.column]] if len(ranks) > 1 else ""
+                _titles.append(f"{column.name} {arrow}{mark}")
             else:
                 _titles.append(column.name)
         return _titles
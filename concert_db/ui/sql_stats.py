@@ -0,0 +1,60 @@
+from sqlalchemy.orm import Session
+from textual.app import ComposeResult
+from textual.containers import Vertical
+from textual.widgets import Label
+
+from concert_db.instrumentation import sql_stats
+
+from .table import SyncedDataTable
+
+
+class SqlStatsPanel(Vertical):
+    """
+    Running per-action SQL statistics, refreshed every `refresh_interval` seconds while the panel is shown.
+    """
+
+    refresh_interval = 1.0
+
+    def __init__(self, db_session: Session) -> None:
+        self.db_session = db_session
+        super().__init__()
+
+    def compose(self) -> ComposeResult:
+        yield Label("SQL statistics are off; start the app with SQL_STATS=true to collect them.", id="sql_stats_off")
+        yield SyncedDataTable(id="sql_stats_table", zebra_stripes=True, cursor_type="row")
+
+    def on_mount(self) -> None:
+        self.border_title = "SQL"
+        self.set_interval(self.refresh_interval, self.load_stats)
+
+    def toggle(self) -> None:
+        self.display = not self.display
+        if self.display:
+            self.load_stats()
+
+    def load_stats(self) -> None:
+        if not self.display:
+            return
+        stats = sql_stats(self.db_session)
+        self.query_one("#sql_stats_off").display = stats is None
+        table = self.query_one("#sql_stats_table", SyncedDataTable)
+        table.display = stats is not None
+        if stats is None:
+            return
+        actions = sorted(stats.actions.values(), key=lambda action: action.seconds, reverse=True)
+        table.sync(
+            {"Action": "Action", "Calls": "Calls", "Statements": "Statements", "Time": "Time (ms)", "N+1": "N+1?"},
+            [
+                (
+                    action.action,
+                    (
+                        action.action,
+                        action.calls,
+                        action.statements,
+                        round(action.seconds * 1000, 1),
+                        ", ".join(f"x{count} {shape[:60]}" for shape, count in action.suspects.items()),
+                    ),
+                )
+                for action in actions
+            ],
+        )
@@ -0,0 +1,345 @@
+from collections.abc import Callable, Hashable, Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import Any, ClassVar, Protocol
+
+from rich.segment import Segment
+from rich.style import Style
+from rich.text import Text
+from textual import events
+from textual.binding import Binding
+from textual.geometry import Size
+from textual.message import Message
+from textual.reactive import reactive
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+from textual.widgets import DataTable
+from textual.widgets.data_table import CellType, ColumnKey
+
+
+@dataclass
+class TableDiff:
+    """
+    Row keys touched by a `SyncedDataTable.sync()`.
+    """
+
+    inserted: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    updated: list[str] = field(default_factory=list)
+    moved: list[str] = field(default_factory=list)
+    refilled: bool = False
+
+
+class SyncedDataTable(DataTable):
+    """
+    A DataTable whose rows are keyed by primary key and updated in place.
+
+    `sync()` compares the wanted rows with what's already displayed and only inserts, removes, updates or reorders the
+    rows that differ, so the cursor and scroll position survive a reload and the work done is proportional to the
+    number of changed rows rather than the size of the table.
+    """
+
+    # when more than this fraction of the rows change, clearing and re-adding them is cheaper than patching
+    refill_ratio = 0.5
+
+    def sync(self, columns: Mapping[str, str], rows: Sequence[tuple[Hashable, Sequence[CellType]]]) -> TableDiff:
+        """
+        Make the table show `rows` (pairs of primary key & cells) in order, under `columns` (key -> label).
+        """
+        self.sync_columns(columns)
+        diff = TableDiff()
+        wanted = {str(key): cells for key, cells in rows}
+        cursor_key = self.cursor_key
+
+        diff.removed = [str(row_key.value) for row_key in self.rows if row_key.value not in wanted]
+        diff.inserted = [key for key in wanted if key not in self.rows]
+        if not self.rows or len(diff.removed) + len(diff.inserted) > len(wanted) * self.refill_ratio:
+            self.clear()
+            for key, cells in wanted.items():
+                self.add_row(*cells, key=key)
+            diff.refilled = True
+            self._restore_cursor(cursor_key)
+            return diff
+
+        for key in diff.removed:
+            self.remove_row(key)
+
+        column_keys = [column.key for column in self.ordered_columns]
+        for key, cells in wanted.items():
+            if key not in self.rows:
+                self.add_row(*cells, key=key)
+                continue
+            changed = False
+            for column_key, old, new in zip(column_keys, self.get_row(key), cells, strict=True):
+                if old != new:
+                    self.update_cell(key, column_key, new, update_width=True)
+                    changed = True
+            if changed:
+                diff.updated.append(key)
+
+        # rows were appended at the bottom, so put everything in the wanted order in one pass
+        order = list(wanted)
+        current = [row.key.value for row in self.ordered_rows]
+        if current != order:
+            diff.moved = [key for key, old in zip(order, current, strict=True) if key != old]
+            self._set_order(order)
+
+        self._restore_cursor(cursor_key)
+        return diff
+
+    def reorder(self, keys: Sequence[Hashable]) -> None:
+        """
+        Show the rows already in the table in the order of `keys`, e.g. after re-sorting them in memory.
+
+        Nothing is compared or re-rendered up front, so this costs the same whatever the cells hold.
+        """
+        if len(keys) != self.row_count:
+            raise ValueError(f"Expected {self.row_count} row keys, got {len(keys)}")
+        cursor_key = self.cursor_key
+        self._set_order([str(key) for key in keys])
+        self._restore_cursor(cursor_key)
+
+    def _set_order(self, order: list[str]) -> None:
+        # `sort()` hands its key function the cells but not the row key, and computes one key per row in the order the
+        # rows were added (that of `self.rows`), so hand out each row's wanted position in that same order. That order
+        # isn't documented, so textual is pinned to the versions test_reorder_rows_added_out_of_order has passed on.
+        # Clearing and re-adding the rows would need nothing undocumented but is over ten times slower, as add_row()
+        # measures every cell.
+        position = {key: index for index, key in enumerate(order)}
+        positions = iter([position[str(row_key.value)] for row_key in self.rows])
+        self.sort(key=lambda _cells: next(positions))
+
+    def sync_columns(self, columns: Mapping[str, str]) -> None:
+        """
+        Make the table have `columns` (key -> label), relabelling existing columns without touching their rows.
+        """
+        if [column.key.value for column in self.ordered_columns] != list(columns) or not self.row_count:
+            # with no rows to keep, rebuilding the columns is as cheap as relabelling them
+            self.clear(columns=True)
+            for key, label in columns.items():
+                self.add_column(label, key=key)
+            return
+
+        first_row = self.ordered_rows[0].key
+        for key, label in columns.items():
+            column = self.columns[ColumnKey(key)]
+            if column.label.plain != label:
+                column.label = Text(label)
+                # rewriting a cell is the public way to redraw the header, and to re-measure the column if the new
+                # label no longer fits (which measures every cell in it, so only then)
+                self.update_cell(
+                    first_row,
+                    column.key,
+                    self.get_cell(first_row, column.key),
+                    update_width=column.label.cell_len > column.content_width,
+                )
+
+    @property
+    def cursor_key(self) -> str | None:
+        """
+        Key (the primary key, as a string) of the row under the cursor.
+        """
+        if not self.is_valid_row_index(self.cursor_row):
+            return None
+        return self.coordinate_to_cell_key(self.cursor_coordinate).row_key.value
+
+    def _restore_cursor(self, row_key: str | None) -> None:
+        # keep the cursor on the row it was on, wherever that row ended up
+        if row_key is not None and row_key in self.rows:
+            self.move_cursor(row=self.get_row_index(row_key), scroll=False)
+
+
+class RowSource(Protocol):
+    """
+    Rows for a `PagedTable`, fetched by absolute position.
+    """
+
+    total: int
+
+    def row(self, index: int) -> Any | None: ...
+
+
+class PagedTable(ScrollView, can_focus=True):
+    """
+    A read-only table that only renders the rows in view, fetching them from a `RowSource` as the user scrolls.
+
+    The scrollbar is sized from the source's total row count, so a table over millions of rows costs no more memory or
+    time to show than one screenful.
+    """
+
+    BINDINGS: ClassVar = [
+        Binding("up", "cursor_up", "Cursor Up", show=False),
+        Binding("down", "cursor_down", "Cursor Down", show=False),
+        Binding("pageup", "page_up", "Page Up", show=False),
+        Binding("pagedown", "page_down", "Page Down", show=False),
+        Binding("home", "scroll_home", "Home", show=False),
+        Binding("end", "scroll_end", "End", show=False),
+    ]
+
+    COMPONENT_CLASSES: ClassVar = {"paged-table--header", "paged-table--cursor", "paged-table--even-row"}
+
+    DEFAULT_CSS = """
+    PagedTable {
+        background: $surface;
+        color: $foreground;
+        height: 100%;
+        width: 1fr;
+
+        & > .paged-table--header {
+            text-style: bold;
+            background: $panel;
+            color: $foreground;
+        }
+        & > .paged-table--even-row {
+            background: $surface-lighten-1 50%;
+        }
+        & > .paged-table--cursor {
+            background: $block-cursor-blurred-background;
+            color: $block-cursor-blurred-foreground;
+        }
+        &:focus > .paged-table--cursor {
+            background: $block-cursor-background;
+            color: $block-cursor-foreground;
+            text-style: $block-cursor-text-style;
+        }
+    }
+    """
+
+    cursor_row: reactive[int] = reactive(0)
+
+    class HeaderSelected(Message):
+        """
+        Posted when a column header is clicked.
+        """
+
+        def __init__(self, paged_table: "PagedTable", column_index: int) -> None:
+            self.paged_table = paged_table
+            self.column_index = column_index
+            super().__init__()
+
+        @property
+        def control(self) -> "PagedTable":
+            return self.paged_table
+
+    def __init__(self, *, cell_padding: int = 1, max_column_width: int = 40, **kwargs: Any) -> None:
+        self.cell_padding = cell_padding
+        self.max_column_width = max_column_width
+        self.labels: list[str] = []
+        self.source: RowSource | None = None
+        self._cells: Callable[[Any], Sequence[object]] = tuple
+        self._widths: list[int] = []
+        super().__init__(**kwargs)
+
+    def show(self, columns: Mapping[str, str], source: RowSource, cells: Callable[[Any], Sequence[object]]) -> None:
+        """
+        Display `source`, turning each of its rows into the cells under `columns` (key -> label) with `cells`.
+        """
+        self.labels = list(columns.values())
+        self.source = source
+        self._cells = cells
+        # size columns from the labels and the first screenful of rows; later rows are truncated to fit
+        sample = [cells(row) for index in range(min(source.total, 100)) if (row := source.row(index)) is not None]
+        self._widths = [
+            min(max([len(label), *(len(str(row[idx])) for row in sample)]), self.max_column_width)
+            + 2 * self.cell_padding
+            for idx, label in enumerate(self.labels)
+        ]
+        self.virtual_size = Size(sum(self._widths), source.total + 1)
+        self.cursor_row = min(self.cursor_row, max(source.total - 1, 0))
+        self.refresh()
+
+    @property
+    def row_count(self) -> int:
+        return self.source.total if self.source else 0
+
+    @property
+    def column_widths(self) -> list[int]:
+        """
+        Rendered width of each column, padding included.
+        """
+        return list(self._widths)
+
+    @property
+    def cursor_cells(self) -> Sequence[object] | None:
+        """
+        Cells of the row under the cursor.
+        """
+        row = self.source.row(self.cursor_row) if self.source else None
+        return None if row is None else self._cells(row)
+
+    @property
+    def cursor_source_row(self) -> Any | None:
+        """
+        The source row under the cursor.
+        """
+        return self.source.row(self.cursor_row) if self.source else None
+
+    def render_line(self, y: int) -> Strip:
+        scroll_x, scroll_y = self.scroll_offset
+        if y == 0:
+            strip = self._render_cells(self.labels, self.get_component_rich_style("paged-table--header"))
+        else:
+            index = scroll_y + y - 1
+            row = self.source.row(index) if self.source else None
+            if row is None:
+                return Strip.blank(self.size.width, self.rich_style)
+            if index == self.cursor_row:
+                style = self.get_component_rich_style("paged-table--cursor")
+            elif index % 2:
+                style = self.get_component_rich_style("paged-table--even-row")
+            else:
+                style = self.rich_style
+            strip = self._render_cells([str(cell) for cell in self._cells(row)], style)
+        return strip.crop(scroll_x, scroll_x + self.size.width).extend_cell_length(self.size.width, self.rich_style)
+
+    def _render_cells(self, cells: Sequence[str], style: Style) -> Strip:
+        padding = " " * self.cell_padding
+        segments = []
+        for cell, width in zip(cells, self._widths, strict=False):
+            content = width - 2 * self.cell_padding
+            text = cell if len(cell) <= content else cell[: content - 1] + "…"
+            segments.append(Segment(f"{padding}{text.ljust(content)}{padding}", style))
+        return Strip(segments)
+
+    def watch_cursor_row(self, old_row: int, new_row: int) -> None:
+        if old_row != new_row:
+            self._scroll_cursor_into_view()
+            self.refresh()
+
+    def _scroll_cursor_into_view(self) -> None:
+        visible_rows = max(self.size.height - 1, 1)
+        if self.cursor_row < self.scroll_offset.y:
+            self.scroll_to(y=self.cursor_row, animate=False)
+        elif self.cursor_row >= self.scroll_offset.y + visible_rows:
+            self.scroll_to(y=self.cursor_row - visible_rows + 1, animate=False)
+
+    def move_cursor(self, row: int) -> None:
+        self.cursor_row = max(0, min(row, self.row_count - 1))
+
+    def action_cursor_up(self) -> None:
+        self.move_cursor(self.cursor_row - 1)
+
+    def action_cursor_down(self) -> None:
+        self.move_cursor(self.cursor_row + 1)
+
+    def action_page_up(self) -> None:
+        self.move_cursor(self.cursor_row - max(self.size.height - 1, 1))
+
+    def action_page_down(self) -> None:
+        self.move_cursor(self.cursor_row + max(self.size.height - 1, 1))
+
+    def action_scroll_home(self) -> None:
+        self.move_cursor(0)
+
+    def action_scroll_end(self) -> None:
+        self.move_cursor(self.row_count - 1)
+
+    def on_click(self, event: events.Click) -> None:
+        if event.y == 0:
+            x = event.x + self.scroll_offset.x
+            for index, width in enumerate(self._widths):
+                if x < width:
+                    self.post_message(self.HeaderSelected(self, index))
+                    return
+                x -= width
+        else:
+            self.move_cursor(self.scroll_offset.y + event.y - 1)
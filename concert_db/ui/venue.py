@@ -1,6 +1,7 @@
 import re
 from typing import ClassVar
 
+from sqlalchemy import Row
 from sqlalchemy.orm import Session
 from textual.app import ComposeResult
 from textual.binding import Binding
@@ -10,6 +11,8 @@ from textual.widgets import Button, DataTable, Input, Label
 
 from concert_db.models import Venue, save_object
 
+from .table import SyncedDataTable
+
 
 class VenueScreen(Vertical):
     BINDINGS: ClassVar = [
@@ -19,23 +22,44 @@ class VenueScreen(Vertical):
 
     def __init__(self, db_session: Session) -> None:
         self.db_session = db_session
-        self._venues: list[Venue] = []
         super().__init__()
 
     def compose(self) -> ComposeResult:
-        yield DataTable(id="venues_table", zebra_stripes=True, cursor_type="row", classes="section")
+        yield SyncedDataTable(id="venues_table", zebra_stripes=True, cursor_type="row", classes="section")
 
     def on_mount(self) -> None:
         table = self.query_one("#venues_table", DataTable)
         table.border_title = "Venues"
-        self.load_venues()
+        # filled in by the app once the concerts are shown (see `ConcertDbApp.populate_panels()`)
+        table.loading = True
+
+    def populate(self, session: Session) -> None:
+        """
+        Query the venues on `session` in the app's populate worker, and show them on the event loop.
+        """
+        self.app.call_from_thread(self.show_populated, self.query_venues(session))
+
+    def show_populated(self, venues: list[Row]) -> None:
+        self.show_venues(venues)
+        self.query_one("#venues_table", SyncedDataTable).loading = False
 
     def load_venues(self) -> None:
-        table = self.query_one("#venues_table", DataTable)
-        table.clear(columns=True)
-        table.add_columns("Name", "Location", "Concerts")
-        self._venues = self.db_session.query(Venue).order_by(Venue.name).all()
-        table.add_rows([(venue.name, venue.location, len(venue.concerts)) for venue in self._venues])
+        self.show_venues(self.query_venues())
+
+    def query_venues(self, session: Session | None = None) -> list[Row]:
+        return (
+            (session or self.db_session)
+            .query(Venue.id, Venue.name, Venue.location, Venue.concert_count)
+            .order_by(Venue.name)
+            .all()
+        )
+
+    def show_venues(self, venues: list[Row]) -> None:
+        table = self.query_one("#venues_table", SyncedDataTable)
+        table.sync(
+            {"Name": "Name", "Location": "Location", "Concerts": "Concerts"},
+            [(venue.id, (venue.name, venue.location, venue.concert_count)) for venue in venues],
+        )
 
     def handle_modal_result(self, venue: Venue | None) -> None:
         if venue:
@@ -46,14 +70,17 @@ class VenueScreen(Vertical):
         self.app.push_screen(AddVenueScreen(), self.handle_modal_result)
 
     def action_edit_venue(self) -> None:
-        table = self.query_one("#venues_table", DataTable)
+        table = self.query_one("#venues_table", SyncedDataTable)
 
-        # Get the venue from our stored list using the cursor row index
-        row_index = table.cursor_row
-        if row_index >= len(self._venues):
+        # rows are keyed by id, so the venue comes straight from the session's identity map when it's loaded
+        key = table.cursor_key
+        if key is None:
             self.app.notify("Invalid row selection", severity="error")
             return
-        venue = self._venues[row_index]
+        venue = self.db_session.get(Venue, int(key))
+        if venue is None:
+            self.app.notify("Venue no longer exists", severity="error")
+            return
 
         self.app.push_screen(EditVenueScreen(venue), self.handle_modal_result)
 
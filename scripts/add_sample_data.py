@@ -1,4 +1,5 @@
 import os
+from datetime import date
 
 from concert_db.models import Artist, Concert, Venue
 from concert_db.settings import get_db_config
@@ -39,29 +40,29 @@ def add_sample_data():
         session.commit()
 
         concerts = [
-            Concert(artist_id=artists[0].id, venue_id=venues[0].id, date="2024-06-15"),
-            Concert(artist_id=artists[0].id, venue_id=venues[3].id, date="2024-10-12"),
-            Concert(artist_id=artists[0].id, venue_id=venues[3].id, date="2024-10-13"),
-            Concert(artist_id=artists[0].id, venue_id=venues[3].id, date="2024-10-14"),
-            Concert(artist_id=artists[0].id, venue_id=venues[3].id, date="2024-10-15"),
-            Concert(artist_id=artists[0].id, venue_id=venues[3].id, date="2024-10-16"),
-            Concert(artist_id=artists[1].id, venue_id=venues[1].id, date="2024-07-20"),
-            Concert(artist_id=artists[1].id, venue_id=venues[1].id, date="2024-07-21"),
-            Concert(artist_id=artists[1].id, venue_id=venues[1].id, date="2024-07-22"),
-            Concert(artist_id=artists[2].id, venue_id=venues[2].id, date="2024-08-10"),
-            Concert(artist_id=artists[2].id, venue_id=venues[2].id, date="2024-08-11"),
-            Concert(artist_id=artists[2].id, venue_id=venues[2].id, date="2024-08-12"),
-            Concert(artist_id=artists[2].id, venue_id=venues[2].id, date="2024-08-13"),
-            Concert(artist_id=artists[3].id, venue_id=venues[3].id, date="2024-09-05"),
-            Concert(artist_id=artists[3].id, venue_id=venues[3].id, date="2024-09-06"),
-            Concert(artist_id=artists[3].id, venue_id=venues[3].id, date="2024-09-07"),
-            Concert(artist_id=artists[4].id, venue_id=venues[3].id, date="2024-09-06"),
-            Concert(artist_id=artists[4].id, venue_id=venues[3].id, date="2024-09-07"),
-            Concert(artist_id=artists[4].id, venue_id=venues[3].id, date="2024-09-08"),
-            Concert(artist_id=artists[4].id, venue_id=venues[3].id, date="2024-09-09"),
+            Concert(artist_id=artists[0].id, venue_id=venues[0].id, date=date(2024, 6, 15)),
+            Concert(artist_id=artists[0].id, venue_id=venues[3].id, date=date(2024, 10, 12)),
+            Concert(artist_id=artists[0].id, venue_id=venues[3].id, date=date(2024, 10, 13)),
+            Concert(artist_id=artists[0].id, venue_id=venues[3].id, date=date(2024, 10, 14)),
+            Concert(artist_id=artists[0].id, venue_id=venues[3].id, date=date(2024, 10, 15)),
+            Concert(artist_id=artists[0].id, venue_id=venues[3].id, date=date(2024, 10, 16)),
+            Concert(artist_id=artists[1].id, venue_id=venues[1].id, date=date(2024, 7, 20)),
+            Concert(artist_id=artists[1].id, venue_id=venues[1].id, date=date(2024, 7, 21)),
+            Concert(artist_id=artists[1].id, venue_id=venues[1].id, date=date(2024, 7, 22)),
+            Concert(artist_id=artists[2].id, venue_id=venues[2].id, date=date(2024, 8, 10)),
+            Concert(artist_id=artists[2].id, venue_id=venues[2].id, date=date(2024, 8, 11)),
+            Concert(artist_id=artists[2].id, venue_id=venues[2].id, date=date(2024, 8, 12)),
+            Concert(artist_id=artists[2].id, venue_id=venues[2].id, date=date(2024, 8, 13)),
+            Concert(artist_id=artists[3].id, venue_id=venues[3].id, date=date(2024, 9, 5)),
+            Concert(artist_id=artists[3].id, venue_id=venues[3].id, date=date(2024, 9, 6)),
+            Concert(artist_id=artists[3].id, venue_id=venues[3].id, date=date(2024, 9, 7)),
+            Concert(artist_id=artists[4].id, venue_id=venues[3].id, date=date(2024, 9, 6)),
+            Concert(artist_id=artists[4].id, venue_id=venues[3].id, date=date(2024, 9, 7)),
+            Concert(artist_id=artists[4].id, venue_id=venues[3].id, date=date(2024, 9, 8)),
+            Concert(artist_id=artists[4].id, venue_id=venues[3].id, date=date(2024, 9, 9)),
         ]
 
-        extra = [Concert(artist_id=artists[5].id, venue_id=venues[0].id, date=f"2024-11-0{i}") for i in range(7)]
+        extra = [Concert(artist_id=artists[5].id, venue_id=venues[0].id, date=date(2024, 11, i)) for i in range(1, 8)]
 
         for concert in [*concerts, *extra]:
             session.add(concert)
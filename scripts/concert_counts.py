@@ -0,0 +1,38 @@
+import argparse
+import sys
+
+from concert_db.models import backfill_concert_counts, check_concert_counts
+from concert_db.settings import get_db_config
+
+
+def concert_counts() -> int:
+    """
+    Backfill (default) or verify (--check) the denormalized concert counts on artists and venues.
+    """
+    parser = argparse.ArgumentParser(description=concert_counts.__doc__)
+    parser.add_argument("--check", action="store_true", help="only report artists/venues with inconsistent counts")
+    args = parser.parse_args()
+
+    db_config = get_db_config()
+    # databases created before concert_count existed get the column & triggers from the migrations
+    db_config.create_tables()
+
+    session = db_config.get_session()
+    try:
+        if not args.check:
+            backfill_concert_counts(session)
+            print("Concert counts backfilled.")
+
+        mismatches = check_concert_counts(session)
+        for mismatch in mismatches:
+            print(
+                f"{mismatch.table} {mismatch.id} ({mismatch.name}): stored={mismatch.stored} actual={mismatch.actual}"
+            )
+        print(f"{len(mismatches)} inconsistent concert counts found.")
+        return 1 if mismatches else 0
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    sys.exit(concert_counts())
@@ -0,0 +1,177 @@
+import argparse
+import random
+import time
+from collections.abc import Iterator
+from datetime import date, timedelta
+from itertools import accumulate
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.sqlite import insert
+
+from concert_db.models import (
+    CONCERT_COUNT_TRIGGERS,
+    CONCERT_SEARCH_INSERT_TRIGGER,
+    Artist,
+    Base,
+    Concert,
+    Venue,
+    backfill_concert_counts,
+    has_search_index,
+    index_new_concerts,
+)
+from concert_db.settings import DatabaseConfig, get_db_config
+
+ADJECTIVES = ("Electric", "Velvet", "Midnight", "Golden", "Broken", "Silver", "Wandering", "Crimson", "Hollow", "Wild")
+NOUNS = ("Owls", "Rivers", "Engines", "Saints", "Ghosts", "Horses", "Lanterns", "Tigers", "Pilots", "Mountains")
+GENRES = ("Rock", "Jazz", "Pop", "Southern Rock", "Folk", "Jam Band", "Punk", "Bluegrass", "Funk", "Hip Hop")
+VENUE_KINDS = ("Theatre", "Ballroom", "Amphitheatre", "Music Hall", "Club", "Arena", "Opera House", "Tavern")
+CITIES = ("Atlanta, GA", "Athens, GA", "Richmond, VA", "Denver, CO", "New York, NY", "Austin, TX", "Chicago, IL")
+FIRST_DAY = date(1965, 1, 1)
+DAYS = (date(2025, 12, 31) - FIRST_DAY).days
+
+
+def scale(value: str) -> int:
+    """
+    A concert count such as 50000, 10k or 2.5M.
+    """
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(value[-1].lower(), 1)
+    return int(float(value[:-1] if multiplier > 1 else value) * multiplier)
+
+
+def band_name(index: int) -> str:
+    name = f"{ADJECTIVES[index % len(ADJECTIVES)]} {NOUNS[index // len(ADJECTIVES) % len(NOUNS)]}"
+    combinations = len(ADJECTIVES) * len(NOUNS)
+    return name if index < combinations else f"{name} {index // combinations + 1}"
+
+
+def venue_name(index: int) -> str:
+    return f"{NOUNS[index % len(NOUNS)].rstrip('s')} {VENUE_KINDS[index // len(NOUNS) % len(VENUE_KINDS)]} {index + 1}"
+
+
+def zipf_weights(count: int, exponent: float) -> list[float]:
+    """
+    Cumulative weights of `count` ranks with Zipf popularity: rank r is chosen in proportion to 1 / r ** exponent.
+    """
+    return list(accumulate(1 / rank**exponent for rank in range(1, count + 1)))
+
+
+def concert_runs(
+    rng: random.Random, concerts: int, artists: int, venues: int, null_dates: float, draws: int = 10_000
+) -> Iterator[dict[str, object]]:
+    """
+    Concert rows for `concerts` nights: runs of 1-4 consecutive nights by one artist at one venue.
+
+    A few headliners play most of the shows (Zipf, exponent 1.1) and a few big rooms host most of them (exponent 0.8).
+    Random choices are drawn `draws` at a time, which is several times faster than one by one.
+    """
+    artist_weights = zipf_weights(artists, 1.1)
+    venue_weights = zipf_weights(venues, 0.8)
+    nights = 0
+    while nights < concerts:
+        runs = zip(
+            rng.choices(range(1, artists + 1), cum_weights=artist_weights, k=draws),
+            rng.choices(range(1, venues + 1), cum_weights=venue_weights, k=draws),
+            rng.choices((1, 2, 3, 4), weights=(70, 15, 10, 5), k=draws),
+            strict=True,
+        )
+        for artist_id, venue_id, length in runs:
+            if nights == concerts:
+                return
+            if rng.random() < null_dates:
+                # the date of some old shows was never recorded; those are always single nights
+                yield {"artist_id": artist_id, "venue_id": venue_id, "date": None}
+                nights += 1
+                continue
+            first = FIRST_DAY + timedelta(days=rng.randrange(DAYS))
+            for night in range(min(length, concerts - nights)):
+                yield {"artist_id": artist_id, "venue_id": venue_id, "date": first + timedelta(days=night)}
+            nights += min(length, concerts - nights)
+
+
+def generate(
+    db_config: DatabaseConfig, concerts: int, seed: int = 0, null_dates: float = 0.02, batch_size: int = 50_000
+) -> int:
+    """
+    Add `concerts` generated concerts, with proportionally many artists & venues, to an empty database.
+
+    The same `seed` and sizes always generate the same data. Rows are written with Core bulk inserts, one transaction
+    per batch, with the per-row concert count and search index triggers and the secondary indexes suspended; they're
+    all rebuilt once at the end, which is far cheaper than maintaining them row by row. Returns the number of concerts
+    inserted (the odd random repeat of an artist, venue and date is skipped).
+    """
+    rng = random.Random(seed)
+    artists = max(concerts // 100, 10)
+    venues = max(concerts // 250, 10)
+    db_config.create_tables()
+    session = db_config.get_session()
+    search_index = has_search_index(session)
+
+    with db_config.engine.begin() as connection:
+        connection.execute(
+            insert(Artist), [{"name": band_name(idx), "genre": rng.choice(GENRES)} for idx in range(artists)]
+        )
+        connection.execute(
+            insert(Venue), [{"name": venue_name(idx), "location": rng.choice(CITIES)} for idx in range(venues)]
+        )
+        connection.exec_driver_sql("DROP TRIGGER IF EXISTS concerts_count_insert")
+        connection.exec_driver_sql("DROP TRIGGER IF EXISTS concerts_fts_insert")
+        # the unique constraint's index stays, to skip repeated concerts
+        for index in Base.metadata.tables[Concert.__tablename__].indexes:
+            index.drop(connection)
+
+    inserted = 0
+    try:
+        batch = []
+        for row in concert_runs(rng, concerts, artists, venues, null_dates):
+            batch.append(row)
+            if len(batch) == batch_size:
+                inserted += insert_batch(db_config, batch)
+                batch = []
+        if batch:
+            inserted += insert_batch(db_config, batch)
+    finally:
+        with db_config.engine.begin() as connection:
+            for index in Base.metadata.tables[Concert.__tablename__].indexes:
+                index.create(connection)
+            connection.exec_driver_sql(CONCERT_COUNT_TRIGGERS[0])
+            if search_index:
+                index_new_concerts(connection, 0)
+                connection.exec_driver_sql(CONCERT_SEARCH_INSERT_TRIGGER)
+            # statistics for the rebuilt indexes, so the planner knows how few artists & venues there are
+            connection.exec_driver_sql("ANALYZE")
+        backfill_concert_counts(session)
+        session.close()
+    return inserted
+
+
+def insert_batch(db_config: DatabaseConfig, batch: list[dict[str, object]]) -> int:
+    with db_config.engine.begin() as connection:
+        return connection.execute(insert(Concert).on_conflict_do_nothing(), batch).rowcount
+
+
+def generate_data() -> None:
+    """
+    Fill an empty database with realistic generated concerts for benchmarking.
+    """
+    parser = argparse.ArgumentParser(description=generate_data.__doc__)
+    parser.add_argument("--concerts", type=scale, default=10_000, help="e.g. 10k (the default), 500k, 10M")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--null-dates", type=float, default=0.02, help="fraction of concerts with no date")
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument("--database", help="SQLAlchemy URL; defaults to the $ENVIRONMENT database")
+    args = parser.parse_args()
+
+    db_config = DatabaseConfig(args.database) if args.database else get_db_config()
+    db_config.create_tables()
+    with db_config.engine.connect() as connection:
+        if connection.execute(select(func.count(Concert.id))).scalar():
+            parser.error(f"{db_config.database_url} already has concerts; generate into an empty database")
+
+    start = time.perf_counter()
+    inserted = generate(db_config, args.concerts, args.seed, args.null_dates, args.batch_size)
+    seconds = time.perf_counter() - start
+    print(f"Generated {inserted:,} concerts in {seconds:.1f}s ({inserted / seconds:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    generate_data()
@@ -29,15 +29,16 @@ def db_session() -> Generator[Session, None, None]:
 
 
 @pytest.fixture()
-def mock_app() -> Callable[["Widget"], Mock]:
+def mock_app(monkeypatch: pytest.MonkeyPatch) -> Callable[["Widget"], Mock]:
     """
     The Textual @property `self.app` can't be set with equals (e.g. screen.app = Mock()).
     Use this approach on widgets that need access to the `self.app` property.
+    The property is restored after the test so later tests can run a real app.
     """
 
     def _mock_app(test_widget: "Widget") -> Mock:
         mock_app = Mock()
-        type(test_widget).app = PropertyMock(return_value=mock_app)
+        monkeypatch.setattr(type(test_widget), "app", PropertyMock(return_value=mock_app))
         return mock_app
 
     return _mock_app
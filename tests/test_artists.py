@@ -1,38 +1,61 @@
+from datetime import date
 from unittest.mock import Mock
 
 import pytest
 from sqlalchemy.orm import Session
 
-from concert_db.models import Artist
+from concert_db.models import Artist, Concert, Venue
 from concert_db.ui.artist import AddArtistScreen, ArtistScreen, EditArtistScreen
 
-from .utils import save_objects
+from .utils import commit_each, count_queries
 
 
 def test_load_artists(db_session: Session) -> None:
     a1 = Artist(name="Taylor Swift", genre="Pop")
     a2 = Artist(name="Jim James", genre="Folk")
     a3 = Artist(name="Beyoncé", genre="Pop")
-    save_objects((a1, a2, a3), db_session)
+    commit_each((a1, a2, a3), db_session)
     artist_ui = ArtistScreen(db_session)
 
-    assert artist_ui._artists == []
-
     mock_table = Mock()
     artist_ui.query_one = lambda *_args, **_kwargs: mock_table
     artist_ui.load_artists()
 
-    mock_table.add_columns.assert_called_once_with("Name", "Genre", "Concerts")
-    mock_table.add_rows.assert_called_once_with(
+    mock_table.sync.assert_called_once_with(
+        {"Name": "Name", "Genre": "Genre", "Concerts": "Concerts"},
         [
             # sorted by artist name
-            ("Beyoncé", "Pop", 0),
-            ("Jim James", "Folk", 0),
-            ("Taylor Swift", "Pop", 0),
-        ]
+            (a3.id, ("Beyoncé", "Pop", 0)),
+            (a2.id, ("Jim James", "Folk", 0)),
+            (a1.id, ("Taylor Swift", "Pop", 0)),
+        ],
     )
-    # artist objects should be stored on the class instance
-    assert [a.id for a in artist_ui._artists] == [a3.id, a2.id, a1.id]
+
+
+def test_load_artists_concert_counts(db_session: Session) -> None:
+    venue = Venue(name="Fox Theatre", location="Atlanta, GA")
+    a1 = Artist(name="Widespread Panic", genre="Southern Rock")
+    a2 = Artist(name="Drive By Truckers", genre="Southern Rock")
+    a3 = Artist(name="Jim James", genre="Folk")
+    concerts = [Concert(artist=a1, venue=venue, date=date(1999, 12, day)) for day in range(29, 32)]
+    commit_each((venue, a1, a2, a3, *concerts, Concert(artist=a2, venue=venue, date=date(2004, 5, 1))), db_session)
+    a1_id, a2_id, a3_id = a1.id, a2.id, a3.id
+    db_session.expunge_all()
+    artist_ui = ArtistScreen(db_session)
+
+    mock_table = Mock()
+    artist_ui.query_one = lambda *_args, **_kwargs: mock_table
+    with count_queries(db_session) as statements:
+        artist_ui.load_artists()
+
+    # one statement; no concert collections loaded into the session
+    assert len(statements) == 1
+    assert db_session.identity_map.keys() == set()
+    assert mock_table.sync.call_args[0][1] == [
+        (a2_id, ("Drive By Truckers", "Southern Rock", 1)),
+        (a3_id, ("Jim James", "Folk", 0)),
+        (a1_id, ("Widespread Panic", "Southern Rock", 3)),
+    ]
 
 
 def mock_query_one(name: str, genre: str) -> Mock:
@@ -107,6 +130,30 @@ def test_add_artist_cancel() -> None:
     screen.dismiss.assert_called_once_with(None)
 
 
+def test_edit_artist_by_row_key(db_session: Session, mock_app: Mock) -> None:
+    # same name in two genres, so the row can only be told apart by its key
+    artists = [Artist(name="Jim James", genre="Folk"), Artist(name="Jim James", genre="Rock")]
+    commit_each(artists, db_session)
+    artist_ui = ArtistScreen(db_session)
+    _mock_app = mock_app(artist_ui)
+    mock_table = Mock()
+    mock_table.cursor_key = str(artists[1].id)
+    artist_ui.query_one = lambda *_args, **_kwargs: mock_table
+
+    with count_queries(db_session) as statements:
+        artist_ui.action_edit_artist()
+
+    # served from the identity map
+    assert statements == []
+    screen = _mock_app.push_screen.call_args[0][0]
+    assert isinstance(screen, EditArtistScreen)
+    assert screen.artist is artists[1]
+
+    mock_table.cursor_key = None
+    artist_ui.action_edit_artist()
+    _mock_app.notify.assert_called_once_with("Invalid row selection", severity="error")
+
+
 def test_edit_artist_with_valid_data() -> None:
     original_artist = Artist(name="Original Name", genre="Original Genre")
     screen = EditArtistScreen(original_artist)
@@ -0,0 +1,203 @@
+import hashlib
+import logging
+import os
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Any
+
+import httplib2  # type: ignore[import-untyped]
+import pytest
+from googleapiclient.errors import HttpError  # type: ignore[import-untyped]
+from googleapiclient.http import MediaFileUpload  # type: ignore[import-untyped]
+
+from concert_db.backup import DatabaseBackupConfig, compress, decompress, snapshot
+
+CHUNK = 256 * 1024
+
+
+class FakeUpload:
+    def __init__(self, drive: "FakeDrive", file_id: str, media: MediaFileUpload) -> None:
+        self.drive = drive
+        self.file_id = file_id
+        self.media = media
+        self.sent = 0
+
+    def next_chunk(self) -> tuple[Any, dict[str, str] | None]:
+        chunk = self.media.getbytes(self.sent, self.media.chunksize())
+        self.drive.chunks.append(len(chunk))
+        self.sent += len(chunk)
+        if self.sent < self.media.size():
+            return None, None
+        self.drive.files[self.file_id] = self.media.getbytes(0, self.sent)
+        return None, {"id": self.file_id}
+
+
+class FakeRequest:
+    def __init__(self, result: dict[str, str]) -> None:
+        self.result = result
+
+    def execute(self) -> dict[str, str]:
+        return self.result
+
+
+class FakeHttp:
+    def __init__(self, content: bytes) -> None:
+        self.content = content
+
+    def request(self, *_: str, headers: dict[str, str]) -> tuple[httplib2.Response, bytes]:
+        start, end = (int(pos) for pos in headers["range"].removeprefix("bytes=").split("-"))
+        content_range = f"bytes {start}-{end}/{len(self.content)}"
+        return httplib2.Response({"status": 206, "content-range": content_range}), self.content[start : end + 1]
+
+
+class FakeMediaRequest:
+    def __init__(self, content: bytes) -> None:
+        self.uri = "https://drive.example/media"
+        self.headers: dict[str, str] = {}
+        self.http = FakeHttp(content)
+
+
+class FakeDrive:
+    """
+    Just enough of the Drive v3 `files()` resource for `DatabaseBackupConfig`, storing files in memory.
+    """
+
+    def __init__(self) -> None:
+        self.files: dict[str, bytes] = {}
+        self.calls: list[str] = []
+        self.chunks: list[int] = []
+
+    def get(self, fileId: str, **_: str) -> FakeRequest:
+        self.calls.append("get")
+        if fileId not in self.files:
+            raise HttpError(httplib2.Response({"status": 404}), b"")
+        return FakeRequest({"id": fileId, "md5Checksum": hashlib.md5(self.files[fileId]).hexdigest()})
+
+    def get_media(self, fileId: str) -> FakeMediaRequest:
+        return FakeMediaRequest(self.files[fileId])
+
+    def create(self, media_body: MediaFileUpload, **_: Any) -> FakeUpload:
+        self.calls.append("create")
+        return FakeUpload(self, f"file-{len(self.files) + 1}", media_body)
+
+    def update(self, fileId: str, media_body: MediaFileUpload, **_: str) -> FakeUpload:
+        self.calls.append("update")
+        return FakeUpload(self, fileId, media_body)
+
+
+class FakeService:
+    def __init__(self) -> None:
+        self.drive = FakeDrive()
+
+    def files(self) -> FakeDrive:
+        return self.drive
+
+
+def rows(path: Path) -> list[tuple[int]]:
+    with closing(sqlite3.connect(path)) as connection:
+        return connection.execute("SELECT id FROM t ORDER BY id").fetchall()
+
+
+def insert(path: Path, ident: int) -> None:
+    with closing(sqlite3.connect(path)) as connection, connection:
+        connection.execute("INSERT INTO t VALUES (?, ?)", (ident, b""))
+
+
+@pytest.fixture()
+def database(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / "concerts.db"
+    with closing(sqlite3.connect(path)) as connection, connection:
+        connection.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, data BLOB)")
+        # random data doesn't compress, so the backup takes a few chunks to upload
+        connection.execute("INSERT INTO t VALUES (1, ?)", (os.urandom(CHUNK * 2),))
+    return path
+
+
+def test_backup_updates_same_file(database: Path) -> None:
+    service = FakeService()
+    backup = DatabaseBackupConfig(str(database), service=service, chunk_size=CHUNK)
+    file_id = backup.save_file()
+    assert service.drive.calls == ["create"]
+    *full, last = service.drive.chunks
+    assert len(full) >= 2
+    assert set(full) == {CHUNK}
+    assert 0 < last <= CHUNK
+
+    insert(database, 2)
+    # a new instance finds the id from the last run
+    assert DatabaseBackupConfig(str(database), service=service).save_file() == file_id
+    assert service.drive.calls == ["create", "get", "update"]
+    assert list(service.drive.files) == [file_id]
+
+
+def test_backup_skips_unchanged_file(database: Path, caplog: pytest.LogCaptureFixture) -> None:
+    service = FakeService()
+    backup = DatabaseBackupConfig(str(database), service=service, chunk_size=CHUNK)
+    file_id = backup.save_file()
+    service.drive.chunks.clear()
+    with caplog.at_level(logging.INFO, logger="concert_db.backup"):
+        assert backup.save_file() == file_id
+    assert service.drive.calls == ["create", "get"]
+    assert service.drive.chunks == []
+    assert caplog.messages == [f"{database} is unchanged since the last backup."]
+
+
+def test_backup_recreates_deleted_file(database: Path) -> None:
+    service = FakeService()
+    backup = DatabaseBackupConfig(str(database), service=service, chunk_size=CHUNK)
+    backup.save_file()
+    service.drive.files.clear()
+    backup.save_file()
+    assert service.drive.calls == ["create", "get", "create"]
+    assert backup.file_id in service.drive.files
+
+
+def test_backup_then_restore(database: Path) -> None:
+    backup = DatabaseBackupConfig(str(database), service=FakeService(), chunk_size=CHUNK)
+    file_id = backup.save_file()
+    insert(database, 2)
+    backup.get_file(file_id)
+    assert rows(database) == [(1,)]
+
+
+def test_backup_of_missing_database_fails(database: Path) -> None:
+    service = FakeService()
+    backup = DatabaseBackupConfig(str(database), service=service, chunk_size=CHUNK)
+    file_id = backup.save_file()
+    uploaded = service.drive.files[file_id]
+
+    # e.g. the database was moved; an empty database must not replace its backup
+    database.rename(database.with_name("moved.db"))
+    with pytest.raises(sqlite3.OperationalError, match="unable to open database file"):
+        backup.save_file()
+    assert not database.exists()
+    assert service.drive.files[file_id] == uploaded
+
+
+def test_snapshot_ignores_uncommitted_writes(database: Path, tmp_path: Path) -> None:
+    with closing(sqlite3.connect(database)) as writer:
+        writer.execute("BEGIN")
+        writer.execute("INSERT INTO t VALUES (2, NULL)")
+        snapshot(str(database), str(tmp_path / "copy.db"), pages=1)
+        writer.rollback()
+    assert rows(tmp_path / "copy.db") == [(1,)]
+
+
+def test_compress_is_repeatable(database: Path, tmp_path: Path) -> None:
+    compress(str(database), str(tmp_path / "first"))
+    compress(str(database), str(tmp_path / "second"))
+    assert (tmp_path / "first").read_bytes() == (tmp_path / "second").read_bytes()
+    decompress(str(tmp_path / "first"), str(tmp_path / "copy.db"))
+    assert (tmp_path / "copy.db").read_bytes() == database.read_bytes()
+
+
+def test_decompress_unknown_format(database: Path, tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="isn't a zstd or gzip backup"):
+        decompress(str(database), str(tmp_path / "copy.db"))
+
+
+def test_backup_chunk_size_must_be_multiple(database: Path) -> None:
+    with pytest.raises(ValueError, match="multiple of 256 KiB"):
+        DatabaseBackupConfig(str(database), service=FakeService(), chunk_size=CHUNK + 1)
@@ -1,38 +1,46 @@
+import asyncio
+import threading
+import time
+from datetime import date
 from unittest.mock import Mock
 
 import pytest
+from sqlalchemy import Row
 from sqlalchemy.orm import Session
-from textual.widgets import Select
+from textual.widgets import DataTable, Select
 
+from concert_db.app import ConcertDbApp
 from concert_db.models import Artist, Concert, Venue
+from concert_db.ui import ArtistScreen
 from concert_db.ui.concert import AddConcertScreen, Concerts, EditConcertScreen, Sorting
+from concert_db.ui.table import PagedTable
 
-from .utils import save_objects
+from .utils import commit_each, count_queries
 
 
 def test_load_concerts(db_session: Session) -> None:
     v = Venue(name="YMCA", location="Easley, SC")
     a = Artist(name="Perpetual Groove", genre="Jam Band")
-    c1 = Concert(artist=a, venue=v, date="2006-08-11")
-    c2 = Concert(artist=a, venue=v, date="2006-08-12")
-    c3 = Concert(artist=a, venue=v, date="2010-11-27")
+    c1 = Concert(artist=a, venue=v, date=date(2006, 8, 11))
+    c2 = Concert(artist=a, venue=v, date=date(2006, 8, 12))
+    c3 = Concert(artist=a, venue=v, date=date(2010, 11, 27))
     c4 = Concert(artist=a, venue=v, date=None)
-    save_objects((v, a, c1, c2, c3, c4), db_session)
+    commit_each((v, a, c1, c2, c3, c4), db_session)
     concert_ui = Concerts(db_session)
 
     mock_table = Mock()
     concert_ui.query_one = lambda *_args, **_kwargs: mock_table
     concert_ui.load_concerts(Sorting(2, "Date", True))
 
-    mock_table.add_columns.assert_called_once_with("Artist", "Venue", "Date")
-    mock_table.add_rows.assert_called_once_with(
+    mock_table.sync.assert_called_once_with(
+        {"Artist": "Artist", "Venue": "Venue", "Date": "Date"},
         [
-            # sorted by date with nulls last
-            ("Perpetual Groove", "YMCA", "2006-08-11"),
-            ("Perpetual Groove", "YMCA", "2006-08-12"),
-            ("Perpetual Groove", "YMCA", "2010-11-27"),
-            ("Perpetual Groove", "YMCA", "n/a"),
-        ]
+            # sorted by date with nulls last, keyed by concert id
+            (c1.id, ("Perpetual Groove", "YMCA", "2006-08-11")),
+            (c2.id, ("Perpetual Groove", "YMCA", "2006-08-12")),
+            (c3.id, ("Perpetual Groove", "YMCA", "2010-11-27")),
+            (c4.id, ("Perpetual Groove", "YMCA", "n/a")),
+        ],
     )
 
 
@@ -42,9 +50,9 @@ def test_load_concerts_filtering(db_session: Session) -> None:
     a1 = Artist(name="Heady Lamar", genre="Lounge")
     a2 = Artist(name="Radiohead", genre="alt rock")
     a3 = Artist(name="Radiohead", genre="alt rock")
-    c1 = Concert(artist=a1, venue=v1, date="2006-08-11")
+    c1 = Concert(artist=a1, venue=v1, date=date(2006, 8, 11))
     c2 = Concert(artist=a2, venue=v1, date=None)
-    save_objects((v1, v2, a1, a2, a3, c1, c2), db_session)
+    commit_each((v1, v2, a1, a2, a3, c1, c2), db_session)
     concert_ui = Concerts(db_session)
 
     mock_table = Mock()
@@ -60,46 +68,221 @@ def test_load_concerts_filtering(db_session: Session) -> None:
         "HEA",
     ]:
         concert_ui.load_concerts(Sorting(0, "Artist", True), filter_by)
-        mock_table.add_rows.assert_called_once_with(
-            [("Heady Lamar", "Red Rocks Amphitheater", "2006-08-11"), ("Radiohead", "Red Rocks Amphitheater", "n/a")]
-        )
-        mock_table.add_rows.reset_mock()
+        assert mock_table.sync.call_args[0][1] == [
+            (c1.id, ("Heady Lamar", "Red Rocks Amphitheater", "2006-08-11")),
+            (c2.id, ("Radiohead", "Red Rocks Amphitheater", "n/a")),
+        ]
+        mock_table.sync.reset_mock()
 
     # TODO: add tests that column sorting is preserved
     # TODO: add tests for filters matching zero results
 
     concert_ui.load_concerts(Sorting(0, "Artist", True), filter_by)
-    mock_table.add_rows.assert_called_once_with(
-        [("Heady Lamar", "Red Rocks Amphitheater", "2006-08-11"), ("Radiohead", "Red Rocks Amphitheater", "n/a")]
+    assert mock_table.sync.call_args[0][1] == [
+        (c1.id, ("Heady Lamar", "Red Rocks Amphitheater", "2006-08-11")),
+        (c2.id, ("Radiohead", "Red Rocks Amphitheater", "n/a")),
+    ]
+
+
+@pytest.mark.parametrize("concert_count", [1, 25])
+def test_load_concerts_query_count(db_session: Session, concert_count: int) -> None:
+    # distinct artists & venues per concert so lazy relationship loads would scale with row count
+    concerts = [
+        Concert(
+            artist=Artist(name=f"Artist {idx}", genre="Rock"),
+            venue=Venue(name=f"Venue {idx}", location="Atlanta, GA"),
+            date=date(1999, 12, idx),
+        )
+        for idx in range(1, concert_count + 1)
+    ]
+    commit_each(concerts, db_session)
+    # start from a clean identity map so relationship loads would show up as extra queries
+    db_session.expunge_all()
+    concert_ui = Concerts(db_session)
+
+    mock_table = Mock()
+    concert_ui.query_one = lambda *_args, **_kwargs: mock_table
+    with count_queries(db_session) as statements:
+        concert_ui.load_concerts(Sorting(2, "Date", True))
+
+    # a COUNT and a single fetch regardless of how many rows are displayed
+    assert len(statements) == 2
+    assert len(mock_table.sync.call_args[0][1]) == concert_count
+    assert db_session.identity_map.keys() == set()
+
+
+@pytest.mark.parametrize("search_index", [True, False])
+def test_load_concerts_filtering_search_index(db_session: Session, search_index: bool) -> None:
+    v1 = Venue(name="Fox Theatre", location="Atlanta, GA")
+    v2 = Venue(name="9:30 Club", location="Washington, DC")
+    a1 = Artist(name="Widespread Panic", genre="Southern Rock")
+    a2 = Artist(name="Fugazi", genre="Punk")
+    c1 = Concert(artist=a1, venue=v1, date=date(1999, 12, 31))
+    c2 = Concert(artist=a2, venue=v2, date=date(1990, 6, 2))
+    commit_each((v1, v2, a1, a2, c1, c2), db_session)
+    concert_ui = Concerts(db_session)
+    concert_ui.search_index = search_index
+
+    sorting = Sorting(0, "Artist", True)
+    # artist, venue & date matches behave the same with or without the index
+    assert [row.id for row in concert_ui.fetch_concerts(sorting, "PANIC")] == [c1.id]
+    assert [row.id for row in concert_ui.fetch_concerts(sorting, "club")] == [c2.id]
+    assert [row.id for row in concert_ui.fetch_concerts(sorting, "-06-")] == [c2.id]
+    assert concert_ui.fetch_concerts(sorting, "nothing matches") == []
+    # short terms can't use the trigram index, so they always use the ilike fallback
+    assert [row.id for row in concert_ui.fetch_concerts(sorting, "9:")] == [c2.id]
+    # genre & location are only searchable through the index
+    expected = [c2.id] if search_index else []
+    assert [row.id for row in concert_ui.fetch_concerts(sorting, "punk")] == expected
+
+
+@pytest.mark.parametrize(
+    "filter_by, expected",
+    [
+        ("1999", [2]),
+        ("1995..1999", [1, 2]),
+        ("..1990", [0]),
+        ("2000..", [3]),
+        ("1999-12-31..2000-01-01", [2, 3]),
+        ("1995-05-05", [1]),
+        ("1995-05-06", []),
+    ],
+)
+def test_load_concerts_date_filters(db_session: Session, filter_by: str, expected: list[int]) -> None:
+    venue = Venue(name="Fox Theatre", location="Atlanta, GA")
+    artist = Artist(name="Widespread Panic", genre="Southern Rock")
+    dates = (date(1990, 6, 2), date(1995, 5, 5), date(1999, 12, 31), date(2000, 1, 1))
+    concerts = [Concert(artist=artist, venue=venue, date=concert_date) for concert_date in dates]
+    concerts.append(Concert(artist=artist, venue=venue, date=None))
+    commit_each((venue, artist, *concerts), db_session)
+    concert_ui = Concerts(db_session)
+
+    with count_queries(db_session) as statements:
+        rows = concert_ui.fetch_concerts(Sorting(2, "Date", True), filter_by)
+    assert [row.id for row in rows] == [concerts[idx].id for idx in expected]
+    # a range on the date column rather than a text match
+    assert "concerts.date >=" in statements[0] or "concerts.date <=" in statements[0]
+    assert "LIKE" not in statements[0]
+    assert "concerts_fts" not in statements[0]
+
+
+def test_sort_concerts_in_memory(db_session: Session) -> None:
+    venues = [Venue(name="Roxy", location="Atlanta, GA"), Venue(name="Fox Theatre", location="Atlanta, GA")]
+    artists = [
+        Artist(name="Widespread Panic", genre="Southern Rock"),
+        Artist(name="Fugazi", genre="Punk"),
+        Artist(name="Fugazi", genre="Post-Hardcore"),
+    ]
+    # ties on every column, and undated concerts that sort last both ways
+    concerts = [
+        Concert(
+            artist=artists[idx % 2],
+            venue=venues[idx % 3 % 2],
+            date=None if idx % 4 == 0 else date(1999, 12, idx % 5 + 1),
+        )
+        for idx in range(12)
+    ]
+    commit_each((*venues, *artists, *concerts), db_session)
+    concert_ui = Concerts(db_session)
+    mock_table = Mock()
+    concert_ui.query_one = lambda *_args, **_kwargs: mock_table
+    concert_ui.load_concerts(Sorting(2, "Date", True))
+
+    sortings: list[Sorting | list[Sorting]] = [
+        Sorting(2, "Date", False),
+        Sorting(2, "Date", True),
+        Sorting(0, "Artist", True),
+        Sorting(0, "Artist", False),
+        Sorting(1, "Venue", False),
+        Sorting(2, "Date", False),
+        [Sorting(0, "Artist", True), Sorting(2, "Date", False)],
+        [Sorting(2, "Date", False), Sorting(0, "Artist", True)],
+        [Sorting(1, "Venue", True), Sorting(0, "Artist", False)],
+        [Sorting(1, "Venue", False), Sorting(0, "Artist", False)],
+    ]
+    for sorting in sortings:
+        with count_queries(db_session) as statements:
+            concert_ui.sort_concerts(sorting)
+        assert statements == []
+        # the same order the database would have returned
+        expected = [row.id for row in concert_ui.fetch_concerts(sorting)]
+        assert mock_table.reorder.call_args[0][0] == expected
+
+
+def test_sort_concerts_queries_for_new_filter(db_session: Session) -> None:
+    commit_each(
+        (Concert(artist=Artist(name="Fugazi", genre="Punk"), venue=Venue(name="Roxy", location="GA")),), db_session
     )
+    concert_ui = Concerts(db_session)
+    mock_table = Mock()
+    concert_ui.query_one = lambda *_args, **_kwargs: mock_table
+    concert_ui.load_concerts(Sorting(2, "Date", True))
+
+    # the loaded rows were for another filter (or paged, when nothing is loaded), so go back to the database
+    for loaded in (concert_ui.loaded, None):
+        concert_ui.loaded = loaded
+        with count_queries(db_session) as statements:
+            concert_ui.sort_concerts(Sorting(0, "Artist", True), "fug")
+        assert "ORDER BY artists.name ASC" in statements[-1]
+        mock_table.reorder.assert_not_called()
+
+
+def test_load_concerts_invalid_date_filter(db_session: Session) -> None:
+    concert_ui = Concerts(db_session)
+    with count_queries(db_session) as statements:
+        concert_ui.fetch_concerts(Sorting(2, "Date", True), "2019-02-30")
+    # not a real date, so it's searched as text instead
+    assert "concerts.date >=" not in statements[0]
 
 
-def test_fetch_data_empty(db_session: Session) -> None:
+def test_reference_data_empty(db_session: Session) -> None:
     add_screen = AddConcertScreen(db_session)
-    assert add_screen.artists == []
-    assert add_screen.venues == []
+    assert add_screen.artists.names == []
+    assert add_screen.venues.names == []
 
     edit_screen = EditConcertScreen(Concert(), db_session)
-    assert edit_screen.artists == []
-    assert edit_screen.venues == []
+    assert edit_screen.artists.names == []
+    assert edit_screen.venues.names == []
 
 
-def test_fetch_data(db_session: Session) -> None:
+def test_reference_data(db_session: Session) -> None:
     v1 = Venue(name="Brown's Island", location="Richmond, VA")
     v2 = Venue(name="Broadberry", location="Richmond, VA")
     a1 = Artist(name="Michael Jackson", genre="Pop")
     a2 = Artist(name="Madonna", genre="Pop")
-    save_objects((v1, v2, a1, a2), db_session)
+    commit_each((v1, v2, a1, a2), db_session)
 
     add_screen = AddConcertScreen(db_session)
     # verify ordering by name
-    assert add_screen.artists == [a2, a1]
-    assert add_screen.venues == [v2, v1]
+    assert add_screen.artists.names == ["Madonna", "Michael Jackson"]
+    assert add_screen.venues.names == ["Broadberry", "Brown's Island"]
+    assert add_screen.artists.ids == {"Madonna": a2.id, "Michael Jackson": a1.id}
 
-    edit_screen = EditConcertScreen(Concert(), db_session)
-    # verify ordering by name
-    assert edit_screen.artists == [a2, a1]
-    assert edit_screen.venues == [v2, v1]
+    with count_queries(db_session) as statements:
+        edit_screen = EditConcertScreen(Concert(), db_session)
+    # the choices are loaded once per session, not every time a screen opens
+    assert statements == []
+    assert edit_screen.artists.names == ["Madonna", "Michael Jackson"]
+    assert edit_screen.venues.names == ["Broadberry", "Brown's Island"]
+
+
+def test_reference_data_invalidated_on_save(db_session: Session) -> None:
+    madonna = Artist(name="Madonna", genre="Pop")
+    venue = Venue(name="Broadberry", location="Richmond, VA")
+    commit_each((madonna, venue), db_session)
+    assert AddConcertScreen(db_session).artists.names == ["Madonna"]
+
+    commit_each((Artist(name="Cher", genre="Pop"),), db_session)
+    madonna.name = "Madonna Ciccone"
+    commit_each((madonna,), db_session)
+
+    with count_queries(db_session) as statements:
+        screen = AddConcertScreen(db_session)
+    assert screen.artists.names == ["Cher", "Madonna Ciccone"]
+    assert screen.venues.names == ["Broadberry"]
+    # only the artists changed, so the venues are still cached
+    assert len(statements) == 1
+    assert "FROM artists" in statements[0]
 
 
 def test_handle_modal_result_empty(db_session: Session) -> None:
@@ -118,12 +301,14 @@ def test_handle_modal_result(db_session: Session, mock_app: Mock) -> None:
 
     artist = Artist(name="Foo Fighters", genre="Rock")
     venue = Venue(name="Asheville Civic Center", location="Asheville, NC")
-    component.handle_modal_result(Concert(artist=artist, venue=venue, date="2018-12-15"))
+    component.handle_modal_result(Concert(artist=artist, venue=venue, date=date(2018, 12, 15)))
 
     _mock_app.notify.assert_called_once_with("Saved successfully!", severity="information")
-    mock_table.add_columns.assert_called_once_with("Artist", "Venue", "Date")
-    mock_table.add_rows.assert_called_once_with([("Foo Fighters", "Asheville Civic Center", "2018-12-15")])
-    assert db_session.query(Concert).count() == 1
+    concert = db_session.query(Concert).one()
+    mock_table.sync.assert_called_once_with(
+        {"Artist": "Artist", "Venue": "Venue", "Date": "Date"},
+        [(concert.id, ("Foo Fighters", "Asheville Civic Center", "2018-12-15"))],
+    )
 
 
 def mock_query_one(artist: Mock, venue: Mock, date: Mock) -> Mock:
@@ -139,7 +324,7 @@ def mock_query_one(artist: Mock, venue: Mock, date: Mock) -> Mock:
 def test_create_concert_with_valid_data(db_session: Session, mock_app: Mock) -> None:
     artist = Artist(name="Nirvana", genre="Rock")
     venue = Venue(name="MTV Unplugged", location="New York, NY")
-    save_objects((artist, venue), db_session)
+    commit_each((artist, venue), db_session)
     screen = AddConcertScreen(db_session)
 
     artist_input = Mock()
@@ -165,7 +350,7 @@ def test_create_concert_with_valid_data(db_session: Session, mock_app: Mock) ->
     assert isinstance(concert, Concert)
     assert concert.artist.name == "Nirvana"
     assert concert.venue.name == "MTV Unplugged"
-    assert concert.date == "1993-11-18"
+    assert concert.date == date(1993, 11, 18)
 
 
 @pytest.mark.parametrize(
@@ -181,12 +366,13 @@ def test_create_concert_with_valid_data(db_session: Session, mock_app: Mock) ->
         ("20240704"),
         ("2024.07.04"),
         ("2024_07_04"),
+        ("2024-02-30"),
     ],
 )
 def test_create_concert_date_format_validation(db_session: Session, date_value: str, mock_app: Mock) -> None:
     artist = Artist(name="Rihanna", genre="Pop")
     venue = Venue(name="The Roxy", location="Los Angeles, CA")
-    save_objects((artist, venue), db_session)
+    commit_each((artist, venue), db_session)
     screen = AddConcertScreen(db_session)
 
     artist_input = Mock()
@@ -283,11 +469,83 @@ def test_create_concert_cancel(db_session: Session, mock_app: Mock) -> None:
     assert db_session.query(Venue).count() == 0
 
 
+def test_edit_concert_by_row_key(db_session: Session, monkeypatch: pytest.MonkeyPatch) -> None:
+    # two concerts that display identically: same artist name (in different genres), venue and date
+    venue = Venue(name="Fox Theatre", location="Atlanta, GA")
+    folk = Artist(name="Jim James", genre="Folk")
+    rock = Artist(name="Jim James", genre="Rock")
+    concerts = [
+        Concert(artist=folk, venue=venue, date=date(2019, 5, 4)),
+        Concert(artist=rock, venue=venue, date=date(2019, 5, 4)),
+    ]
+    commit_each((venue, folk, rock, *concerts), db_session)
+
+    async def edit(paged: bool) -> None:
+        monkeypatch.setattr(Concerts, "paging_threshold", 1 if paged else 5000)
+        app = ConcertDbApp(db_session)
+        async with app.run_test() as pilot:
+            await app.workers.wait_for_complete()
+            concerts_ui = app.query_one(Concerts)
+            table = concerts_ui.active_table
+            assert isinstance(table, PagedTable) is paged
+            table.focus()
+            # rows tied on date are in descending id order, so the rock concert comes first
+            await pilot.press("down")
+            await pilot.press("e")
+            await pilot.pause()
+            assert isinstance(app.screen, EditConcertScreen)
+            assert app.screen.concert is concerts[0]
+
+    asyncio.run(edit(paged=False))
+    asyncio.run(edit(paged=True))
+
+
+def test_panels_populated_after_first_paint(db_session: Session, monkeypatch: pytest.MonkeyPatch) -> None:
+    venue = Venue(name="Fox Theatre", location="Atlanta, GA")
+    artist = Artist(name="Widespread Panic", genre="Southern Rock")
+    commit_each((venue, artist, Concert(artist=artist, venue=venue, date=date(1999, 12, 31))), db_session)
+    query_artists = ArtistScreen.query_artists
+    show_artists = ArtistScreen.show_populated
+    threads: list[bool] = []
+    seen: list[tuple[bool, int]] = []
+
+    def _query_artists(self: ArtistScreen, session: Session | None = None) -> list[Row]:
+        threads.append(threading.current_thread() is threading.main_thread())
+        return query_artists(self, session)
+
+    def _show_artists(self: ArtistScreen, artists: list[Row]) -> None:
+        # concerts come first; the artists are still loading when their turn comes
+        threads.append(threading.current_thread() is threading.main_thread())
+        seen.append(
+            (self.query_one("#artists_table").loading, self.app.query_one("#concerts_table", DataTable).row_count)
+        )
+        show_artists(self, artists)
+
+    monkeypatch.setattr(ArtistScreen, "query_artists", _query_artists)
+    monkeypatch.setattr(ArtistScreen, "show_populated", _show_artists)
+
+    async def start() -> dict[str, float]:
+        app = ConcertDbApp(db_session)
+        async with app.run_test():
+            await app.workers.wait_for_complete()
+            for table in ("#concerts_table", "#artists_table", "#venues_table"):
+                assert not app.query_one(table).loading
+                assert app.query_one(table, DataTable).row_count == 1
+        return app.timings
+
+    timings = asyncio.run(start())
+    assert seen == [(True, 1)]
+    # queried in the populate worker, shown on the event loop
+    assert threads == [False, True]
+    assert list(timings) == ["start", "first paint", "Concerts", "ArtistScreen", "VenueScreen"]
+    assert sorted(timings.values()) == list(timings.values())
+
+
 def test_edit_concert_with_valid_data(db_session: Session, mock_app: Mock) -> None:
     artist = Artist(name="Radiohead", genre="Rock")
     venue = Venue(name="Red Rocks", location="Morrison, CO")
-    concert = Concert(artist=artist, venue=venue, date="2023-09-15")
-    save_objects((artist, venue, concert), db_session)
+    concert = Concert(artist=artist, venue=venue, date=date(2023, 9, 15))
+    commit_each((artist, venue, concert), db_session)
 
     screen = EditConcertScreen(concert, db_session)
 
@@ -315,13 +573,13 @@ def test_edit_concert_with_valid_data(db_session: Session, mock_app: Mock) -> No
     assert updated_concert.id == concert.id
     assert updated_concert.artist.name == "Radiohead"
     assert updated_concert.venue.name == "Red Rocks"
-    assert updated_concert.date == "2023-10-20"
+    assert updated_concert.date == date(2023, 10, 20)
 
 
 def test_edit_concert_cancel(db_session: Session, mock_app: Mock) -> None:
     artist = Artist(name="Radiohead", genre="Rock")
     venue = Venue(name="Red Rocks", location="Morrison, CO")
-    concert = Concert(artist=artist, venue=venue, date="2023-09-15")
+    concert = Concert(artist=artist, venue=venue, date=date(2023, 9, 15))
     screen = EditConcertScreen(concert, db_session)
     _mock_app = mock_app(screen)
 
@@ -346,3 +604,69 @@ def test_edit_concert_cancel(db_session: Session, mock_app: Mock) -> None:
     assert db_session.query(Concert).count() == 0
     assert db_session.query(Artist).count() == 0
     assert db_session.query(Venue).count() == 0
+
+
+def test_filter_keystroke_latency(db_session: Session, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Type a filter at full speed and measure how long after the last keystroke the filtered rows are rendered.
+    """
+    venue = Venue(name="Fox Theatre", location="Atlanta, GA")
+    panic = Artist(name="Widespread Panic", genre="Southern Rock")
+    others = [Artist(name=f"Artist {idx}", genre="Rock") for idx in range(50)]
+    concerts = [Concert(artist=panic, venue=venue, date=date(1999, 12, day)) for day in range(1, 32)]
+    concerts += [Concert(artist=artist, venue=venue, date=date(2001, 1, 1)) for artist in others]
+    commit_each((venue, panic, *others, *concerts), db_session)
+
+    debounce = 0.25
+    monkeypatch.setattr(Concerts, "filter_debounce", debounce)
+    fetched: list[str | None] = []
+    fetch_threads: list[threading.Thread] = []
+    rendered: list[tuple[float, int]] = []
+    fetch_concerts = Concerts.fetch_concerts
+    show_concerts = Concerts.show_concerts
+
+    def _fetch(
+        self: Concerts,
+        sorting: Sorting,
+        filter_by: str | None = None,
+        limit: int | None = None,
+        session: Session | None = None,
+    ) -> list:
+        fetched.append(filter_by)
+        fetch_threads.append(threading.current_thread())
+        return fetch_concerts(self, sorting, filter_by, limit, session)
+
+    def _show(self: Concerts, rows: list) -> None:
+        show_concerts(self, rows)
+        rendered.append((time.perf_counter(), len(rows)))
+
+    monkeypatch.setattr(Concerts, "fetch_concerts", _fetch)
+    monkeypatch.setattr(Concerts, "show_concerts", _show)
+
+    async def type_filter() -> float:
+        app = ConcertDbApp(db_session)
+        async with app.run_test() as pilot:
+            await app.workers.wait_for_complete()
+            await pilot.press("f")
+            fetched.clear()
+            fetch_threads.clear()
+            rendered.clear()
+            await pilot.press(*"widespread")
+            last_keystroke = time.perf_counter()
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            table = app.query_one("#concerts_table", DataTable)
+            assert table.row_count == 31
+        return last_keystroke
+
+    last_keystroke = asyncio.run(type_filter())
+
+    # stale keystrokes were cancelled while debouncing; only the final text was queried and rendered
+    assert fetched == ["widespread"]
+    # queried off the event loop, which stays free to handle keystrokes
+    assert fetch_threads[0] is not threading.main_thread()
+    assert len(rendered) == 1
+    render_time, row_count = rendered[0]
+    assert row_count == 31
+    latency = render_time - last_keystroke
+    assert latency < debounce + 0.5, f"keystroke-to-render latency {latency * 1000:.0f}ms"
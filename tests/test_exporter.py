@@ -0,0 +1,148 @@
+import csv
+import gzip
+import json
+import lzma
+import sqlite3
+import sys
+import tracemalloc
+from contextlib import closing
+from datetime import date
+from pathlib import Path
+
+import pytest
+from sqlalchemy import Engine, insert
+from sqlalchemy.orm import Session
+
+from concert_db.exporter import main, open_output, stream_concerts, write_concerts
+from concert_db.importer import ConcertImporter, read_records
+from concert_db.models import Artist, Concert, Venue
+
+from .utils import commit_each
+
+
+@pytest.fixture()
+def concerts(db_session: Session) -> Session:
+    panic = Artist(name="Widespread Panic", genre="Southern Rock")
+    fugazi = Artist(name="Fugazi", genre="Punk")
+    fox = Venue(name="Fox Theatre", location="Atlanta, GA")
+    club = Venue(name="9:30 Club", location="Washington, DC")
+    commit_each(
+        (
+            Concert(artist=panic, venue=fox, date=date(1999, 12, 31)),
+            Concert(artist=fugazi, venue=club, date=None),
+        ),
+        db_session,
+    )
+    return db_session
+
+
+def engine(db_session: Session) -> Engine:
+    bind = db_session.get_bind()
+    assert isinstance(bind, Engine)
+    return bind
+
+
+def export(db_session: Session, path: Path, batch_size: int = 1) -> int:
+    file, fmt = open_output(path)
+    with file, engine(db_session).connect() as connection:
+        return write_concerts(stream_concerts(connection, batch_size), file, fmt)
+
+
+def test_export_csv(concerts: Session, tmp_path: Path) -> None:
+    path = tmp_path / "concerts.csv"
+    assert export(concerts, path) == 2
+    with path.open(newline="") as file:
+        assert list(csv.reader(file)) == [
+            ["artist", "genre", "venue", "location", "date"],
+            ["Widespread Panic", "Southern Rock", "Fox Theatre", "Atlanta, GA", "1999-12-31"],
+            ["Fugazi", "Punk", "9:30 Club", "Washington, DC", ""],
+        ]
+
+
+@pytest.mark.parametrize("compressed", [False, True])
+def test_export_jsonl(concerts: Session, tmp_path: Path, compressed: bool) -> None:
+    path = tmp_path / ("concerts.jsonl.gz" if compressed else "concerts.jsonl")
+    export(concerts, path)
+    content = gzip.decompress(path.read_bytes()) if compressed else path.read_bytes()
+    assert [json.loads(line) for line in content.splitlines()] == [
+        {
+            "artist": "Widespread Panic",
+            "genre": "Southern Rock",
+            "venue": "Fox Theatre",
+            "location": "Atlanta, GA",
+            "date": "1999-12-31",
+        },
+        {"artist": "Fugazi", "genre": "Punk", "venue": "9:30 Club", "location": "Washington, DC", "date": None},
+    ]
+
+
+def test_export_compressed_csv(concerts: Session, tmp_path: Path) -> None:
+    path = tmp_path / "concerts.csv.xz"
+    export(concerts, path)
+    with lzma.open(path, "rt") as file:
+        assert file.readline().strip() == "artist,genre,venue,location,date"
+
+
+def test_export_then_import(concerts: Session, tmp_path: Path) -> None:
+    path = tmp_path / "concerts.csv"
+    export(concerts, path)
+    result = ConcertImporter(engine(concerts)).run(read_records(path))
+    # a round trip adds nothing: both concerts, dated and undated, are already there
+    assert (result.inserted, result.duplicates, result.rejects) == (0, 2, [])
+
+
+def test_export_unknown_format(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="Can't tell the format"):
+        open_output(tmp_path / "concerts.txt.gz")
+
+
+def test_export_memory_is_constant(db_session: Session, tmp_path: Path) -> None:
+    artist = Artist(name="Phish", genre="Jam Band")
+    venue = Venue(name="Madison Square Garden", location="New York, NY")
+    commit_each((artist, venue), db_session)
+
+    def peak_memory(concerts: int) -> int:
+        first = db_session.query(Concert).count()
+        db_session.execute(
+            insert(Concert),
+            [
+                {"artist_id": artist.id, "venue_id": venue.id, "date": date.fromordinal(700_000 + idx)}
+                for idx in range(first, concerts)
+            ],
+        )
+        db_session.commit()
+        tracemalloc.start()
+        export(db_session, tmp_path / "concerts.csv", batch_size=500)
+        _current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak
+
+    small = peak_memory(2_000)
+    # ten times the rows shouldn't need anything like ten times the memory
+    assert peak_memory(20_000) < small * 2
+
+
+def test_main_migrates_first(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("ENVIRONMENT", raising=False)
+    output = tmp_path / "concerts.csv"
+    monkeypatch.setattr(sys, "argv", ["exporter", str(output)])
+    with pytest.raises(SystemExit) as exc:
+        main()
+    assert exc.value.code == 2
+
+    # a database from before the date migration, with a date in the old free-form style
+    url = f"sqlite:///{tmp_path / 'concerts.sqlite'}"
+    with closing(sqlite3.connect(tmp_path / "concerts.sqlite")) as connection, connection:
+        connection.executescript(
+            "CREATE TABLE artists (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, genre VARCHAR NOT NULL);"
+            "CREATE TABLE venues (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, location VARCHAR NOT NULL);"
+            "CREATE TABLE concerts (id INTEGER PRIMARY KEY, artist_id INTEGER NOT NULL, venue_id INTEGER NOT NULL, "
+            "date VARCHAR);"
+            "INSERT INTO artists VALUES (1, 'Phish', 'Jam Band');"
+            "INSERT INTO venues VALUES (1, 'Fox Theatre', 'Atlanta, GA');"
+            "INSERT INTO concerts VALUES (1, 1, 1, '1996/10/31');"
+        )
+    monkeypatch.setattr(sys, "argv", ["exporter", str(output), "--database", url])
+    main()
+    with output.open(newline="") as file:
+        assert list(csv.reader(file))[1:] == [["Phish", "Jam Band", "Fox Theatre", "Atlanta, GA", "1996-10-31"]]
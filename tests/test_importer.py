@@ -0,0 +1,172 @@
+import json
+import sys
+from collections.abc import Iterator
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+import pytest
+from sqlalchemy import Engine, func, select, text
+from sqlalchemy.orm import Session
+
+from concert_db.importer import ConcertImporter, Reject, main, read_records
+from concert_db.models import Artist, Concert, Venue, check_concert_counts
+from concert_db.settings import DatabaseConfig
+
+from .utils import commit_each, count_queries
+
+CSV = """artist,genre,venue,location,date
+Widespread Panic,Southern Rock,Fox Theatre,"Atlanta, GA",1999-12-31
+Widespread Panic,Southern Rock,Fox Theatre,"Atlanta, GA",2000-01-01
+Fugazi,Punk,9:30 Club,"Washington, DC",1990-06-02
+Fugazi,Punk,,"Washington, DC",1990-06-03
+Phish,Jam Band,Fox Theatre,"Atlanta, GA",1996-02-30
+Phish,Jam Band,Fox Theatre,"Atlanta, GA",
+"""
+
+
+def engine(db_session: Session) -> Engine:
+    bind = db_session.get_bind()
+    assert isinstance(bind, Engine)
+    return bind
+
+
+def test_import_csv(db_session: Session, tmp_path: Path) -> None:
+    # an existing artist is reused rather than duplicated
+    commit_each((Artist(name="Fugazi", genre="Punk"),), db_session)
+    path = tmp_path / "concerts.csv"
+    path.write_text(CSV)
+
+    result = ConcertImporter(engine(db_session), batch_size=2).run(read_records(path))
+
+    assert result.rows == 6
+    assert result.inserted == 4
+    assert result.duplicates == 0
+    assert [(reject.line, reject.reason) for reject in result.rejects] == [
+        (5, "missing venue"),
+        (6, "invalid date '1996-02-30'"),
+    ]
+    concerts = db_session.execute(
+        select(Artist.name, Venue.name, Concert.date).join(Concert.artist).join(Concert.venue).order_by(Concert.id)
+    ).all()
+    assert concerts == [
+        ("Widespread Panic", "Fox Theatre", date(1999, 12, 31)),
+        ("Widespread Panic", "Fox Theatre", date(2000, 1, 1)),
+        ("Fugazi", "9:30 Club", date(1990, 6, 2)),
+        ("Phish", "Fox Theatre", None),
+    ]
+    assert db_session.query(Artist).count() == 3
+    assert db_session.query(Venue).count() == 2
+    # the derived data the triggers maintain is in step, including the batch-indexed search index
+    assert check_concert_counts(db_session) == []
+    search = text("SELECT count(*) FROM concerts_fts WHERE concerts_fts MATCH 'fox theatre'")
+    assert db_session.execute(search).scalar() == 3
+    trigger = text("SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name = 'concerts_fts_insert'")
+    assert db_session.execute(trigger).scalar() == 1
+
+
+def test_reimport_skips_existing(db_session: Session, tmp_path: Path) -> None:
+    path = tmp_path / "concerts.csv"
+    path.write_text(CSV)
+    ConcertImporter(engine(db_session)).run(read_records(path))
+
+    result = ConcertImporter(engine(db_session)).run(read_records(path))
+    # including the undated concert, which the unique constraint doesn't cover
+    assert (result.inserted, result.duplicates) == (0, 4)
+    assert db_session.query(Artist).count() == 3
+    assert db_session.query(Concert).count() == 4
+    assert check_concert_counts(db_session) == []
+
+
+def test_undated_repeats_skipped(db_session: Session, tmp_path: Path) -> None:
+    path = tmp_path / "concerts.csv"
+    undated = 'Phish,Jam Band,Fox Theatre,"Atlanta, GA",'
+    path.write_text(
+        "\n".join(["artist,genre,venue,location,date", undated, undated, 'Phish,Jam Band,Roxy,"Atlanta, GA",'])
+    )
+
+    result = ConcertImporter(engine(db_session), batch_size=2).run(read_records(path))
+
+    # the repeat within the file is skipped too; the same artist undated at another venue is a different concert
+    assert (result.inserted, result.duplicates) == (2, 1)
+    assert db_session.scalars(select(Artist.concert_count)).one() == 2
+
+
+def test_failed_import_rolled_back(db_session: Session, tmp_path: Path) -> None:
+    path = tmp_path / "concerts.csv"
+    path.write_text(CSV)
+
+    def failing() -> Iterator[dict[str, Any] | Reject]:
+        yield from read_records(path)
+        raise OSError("disk went away")
+
+    importer = ConcertImporter(engine(db_session), batch_size=2)
+    with pytest.raises(OSError, match="disk went away"):
+        importer.run(failing())
+
+    # nothing from the earlier batches was kept, and the search index trigger is still there
+    assert db_session.query(Concert).count() == 0
+    assert db_session.query(Artist).count() == 0
+    trigger = text("SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name = 'concerts_fts_insert'")
+    assert db_session.execute(trigger).scalar() == 1
+
+    # the importer forgot the rolled-back artists & venues, so it can go again
+    result = importer.run(read_records(path))
+    assert result.inserted == 4
+
+
+def test_import_jsonl(db_session: Session, tmp_path: Path) -> None:
+    path = tmp_path / "concerts.jsonl"
+    records = [
+        {"artist": "Fugazi", "genre": "Punk", "venue": "9:30 Club", "location": "Washington, DC", "date": "1990-06-02"},
+        {"artist": "Fugazi", "genre": "Punk", "venue": "9:30 Club", "location": "Washington, DC"},
+    ]
+    lines = [json.dumps(record) for record in records]
+    path.write_text("\n".join([lines[0], "{not json", "", "[1, 2]", lines[1]]) + "\n")
+
+    result = ConcertImporter(engine(db_session)).run(read_records(path))
+
+    assert result.inserted == 2
+    assert [reject.line for reject in result.rejects] == [2, 4]
+    assert result.rejects[1].reason == "not a JSON object"
+
+
+def test_import_batches_statements(db_session: Session, tmp_path: Path) -> None:
+    path = tmp_path / "concerts.csv"
+    lines = [f'Artist {idx % 7},Rock,Venue {idx % 5},"Atlanta, GA",2000-01-{idx % 28 + 1:02}' for idx in range(200)]
+    path.write_text("artist,genre,venue,location,date\n" + "\n".join(lines))
+
+    importer = ConcertImporter(engine(db_session), batch_size=100)
+    with count_queries(db_session) as statements:
+        result = importer.run(read_records(path))
+
+    assert result.inserted == 140
+    # a fixed number of statements per batch, not per row
+    assert len(statements) < 20
+
+
+def test_unsupported_file(tmp_path: Path) -> None:
+    path = tmp_path / "concerts.xml"
+    path.write_text("<concerts/>")
+    with pytest.raises(ValueError, match=r"Unsupported file type '\.xml'"):
+        list(read_records(path))
+
+
+def test_main_needs_a_database(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / "concerts.csv"
+    path.write_text(CSV)
+    monkeypatch.delenv("ENVIRONMENT", raising=False)
+    # without ENVIRONMENT the concerts would go into an in-memory database and be lost
+    monkeypatch.setattr(sys, "argv", ["importer", str(path)])
+    with pytest.raises(SystemExit) as exc:
+        main()
+    assert exc.value.code == 2
+
+    url = f"sqlite:///{tmp_path / 'concerts.sqlite'}"
+    monkeypatch.setattr(sys, "argv", ["importer", str(path), "--database", url])
+    # two lines are rejected
+    assert main() == 1
+    db_config = DatabaseConfig(url)
+    with db_config.engine.connect() as connection:
+        assert connection.execute(select(func.count(Concert.id))).scalar() == 4
+    db_config.engine.dispose()
@@ -0,0 +1,105 @@
+import asyncio
+import logging
+from collections.abc import Generator
+from datetime import date
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy import Engine
+from sqlalchemy.orm import Session
+from textual.widgets import DataTable
+
+from concert_db.app import ConcertDbApp
+from concert_db.instrumentation import OTHER, SqlStats, logger, sql_stats, statement_shape
+from concert_db.models import Artist, Concert, Venue
+from concert_db.ui import ArtistScreen
+from concert_db.ui.sql_stats import SqlStatsPanel
+
+from .utils import commit_each
+
+
+@pytest.fixture()
+def stats(db_session: Session, tmp_path: Path, caplog: pytest.LogCaptureFixture) -> Generator[SqlStats, None, None]:
+    engine = db_session.get_bind()
+    assert isinstance(engine, Engine)
+    # as the app does with SQL_STATS=true
+    caplog.set_level(logging.DEBUG, logger=logger.name)
+    stats = SqlStats(str(tmp_path / "sql_stats.log"), repeat_threshold=3).install(engine)
+    try:
+        yield stats
+    finally:
+        stats.remove(engine)
+
+
+def test_statement_shape() -> None:
+    assert statement_shape("SELECT *\n  FROM concerts WHERE id IN (?, ?, ?) LIMIT 10") == (
+        "SELECT * FROM concerts WHERE id IN (?, ...) LIMIT ?"
+    )
+
+
+def test_statements_grouped_by_action(db_session: Session, stats: SqlStats) -> None:
+    commit_each((Artist(name="Phish", genre="Jam Band"),), db_session)
+    artist_ui = ArtistScreen(db_session)
+    artist_ui.query_one = lambda *_args, **_kwargs: Mock()
+    artist_ui.load_artists()
+    artist_ui.load_artists()
+
+    assert sql_stats(db_session) is stats
+    load_artists = stats.actions["ArtistScreen.load_artists"]
+    assert (load_artists.calls, load_artists.statements, load_artists.suspects) == (2, 2, {})
+    assert load_artists.seconds > 0
+    # save_object is the outermost concert_db function of the test's saves
+    assert stats.actions["save_object"].statements > 0
+
+
+def test_repeated_statements_flagged(db_session: Session, stats: SqlStats, tmp_path: Path) -> None:
+    venue = Venue(name="Fox Theatre", location="Atlanta, GA")
+    artists = [Artist(name=f"Artist {idx}", genre="Rock") for idx in range(4)]
+    commit_each(
+        (venue, *artists, *(Concert(artist=a, venue=venue, date=date(2000, 1, 1)) for a in artists)), db_session
+    )
+    db_session.expire_all()
+
+    # lazy-loading each concert's artist is one SELECT per concert
+    assert len({concert.artist.name for concert in db_session.query(Concert)}) == 4
+    (shape, count), *_ = stats.actions[OTHER].suspects.items()
+    assert shape.startswith("SELECT artists.id")
+    assert count == 4
+    stats.log_report()
+    log = (tmp_path / "sql_stats.log").read_text()
+    assert "possible N+1 in (other)" in log
+    assert "N+1? x4: SELECT artists.id" in log
+
+
+def test_log_file_handler_not_stacked(db_session: Session, tmp_path: Path) -> None:
+    engine = db_session.get_bind()
+    assert isinstance(engine, Engine)
+    handlers, level = list(logger.handlers), logger.level
+    first = SqlStats(str(tmp_path / "sql_stats.log")).install(engine)
+    second = SqlStats(str(tmp_path / "sql_stats.log"))
+    assert len(logger.handlers) == len(handlers) + 1
+    # the level is the application's to set
+    assert logger.level == level
+
+    first.remove(engine)
+    second.close_log()
+    assert logger.handlers == handlers
+
+
+@pytest.mark.usefixtures("stats")
+def test_sql_stats_panel(db_session: Session) -> None:
+    async def toggle() -> None:
+        app = ConcertDbApp(db_session)
+        async with app.run_test() as pilot:
+            await app.workers.wait_for_complete()
+            assert not app.query_one(SqlStatsPanel).display
+            await pilot.press("f2")
+            assert app.query_one(SqlStatsPanel).display
+            table = app.query_one("#sql_stats_table", DataTable)
+            actions = {table.get_row_at(idx)[0] for idx in range(table.row_count)}
+            assert {"Concerts.populate", "ArtistScreen.populate", "VenueScreen.populate"} <= actions
+            await pilot.press("f2")
+            assert not app.query_one(SqlStatsPanel).display
+
+    asyncio.run(toggle())
@@ -1,10 +1,26 @@
+from datetime import date
 from unittest.mock import Mock
 
+import pytest
+from sqlalchemy import select, text, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from concert_db.models import Artist, Concert, Venue, save_object
+from concert_db.models import (
+    Artist,
+    Concert,
+    Venue,
+    backfill_concert_counts,
+    check_concert_counts,
+    has_search_index,
+    rebuild_search_index,
+    save_object,
+    save_objects,
+    search_concerts,
+    unit_of_work,
+)
 
-from .utils import save_objects
+from .utils import commit_each, count_queries
 
 
 def test_database_isolation_between_tests(db_session: Session) -> None:
@@ -70,11 +86,11 @@ def test_artist_unique_constraint(db_session: Session) -> None:
 def test_concert_unique_constraint(db_session: Session) -> None:
     venue = Venue(name="Red Rocks Amphitheatre", location="Morrison, CO")
     artist = Artist(name="Phish", genre="Rock")
-    concert = Concert(artist=artist, venue=venue, date="2024-07-04")
-    save_objects((venue, artist, concert), db_session)
-    assert db_session.query(Concert).filter_by(artist=artist, venue=venue, date="2024-07-04").count() == 1
+    concert = Concert(artist=artist, venue=venue, date=date(2024, 7, 4))
+    commit_each((venue, artist, concert), db_session)
+    assert db_session.query(Concert).filter_by(artist=artist, venue=venue, date=date(2024, 7, 4)).count() == 1
 
-    duplicate_concert = Concert(artist=artist, venue=venue, date="2024-07-04")
+    duplicate_concert = Concert(artist=artist, venue=venue, date=date(2024, 7, 4))
     mock_notify_failure = Mock()
     save_object(duplicate_concert, db_session, notify_callback=mock_notify_failure)
 
@@ -83,21 +99,21 @@ def test_concert_unique_constraint(db_session: Session) -> None:
         "UNIQUE constraint failed: concerts.artist_id, concerts.venue_id, concerts.date"
         in mock_notify_failure.call_args[0][0]
     )
-    assert db_session.query(Concert).filter_by(artist=artist, venue=venue, date="2024-07-04").count() == 1
+    assert db_session.query(Concert).filter_by(artist=artist, venue=venue, date=date(2024, 7, 4)).count() == 1
 
 
 def test_create_concert_with_relationships(db_session: Session) -> None:
     artist = Artist(name="Led Zeppelin", genre="Rock")
     venue = Venue(name="Wembley Stadium", location="London, UK")
 
-    save_objects((artist, venue), db_session)
+    commit_each((artist, venue), db_session)
 
-    concert = Concert(artist=artist, venue=venue, date="1975-05-24")
+    concert = Concert(artist=artist, venue=venue, date=date(1975, 5, 24))
     save_object(concert, db_session)
 
     retrieved_concert = db_session.query(Concert).first()
     assert retrieved_concert is not None
-    assert retrieved_concert.date == "1975-05-24"
+    assert retrieved_concert.date == date(1975, 5, 24)
     assert retrieved_concert.artist.name == "Led Zeppelin"
     assert retrieved_concert.venue is not None
     assert retrieved_concert.venue.name == "Wembley Stadium"
@@ -106,9 +122,9 @@ def test_create_concert_with_relationships(db_session: Session) -> None:
 def test_concerts_relationship(db_session: Session) -> None:
     artist = Artist(name="Pink Floyd", genre="Progressive Rock")
     venue = Venue(name="Pompeii Amphitheatre", location="Pompeii, Italy")
-    concert1 = Concert(artist=artist, venue=venue, date="1973-03-01")
-    concert2 = Concert(artist=artist, venue=venue, date="1975-09-15")
-    save_objects((venue, artist, concert1, concert2), db_session)
+    concert1 = Concert(artist=artist, venue=venue, date=date(1973, 3, 1))
+    concert2 = Concert(artist=artist, venue=venue, date=date(1975, 9, 15))
+    commit_each((venue, artist, concert1, concert2), db_session)
 
     retrieved_artist = db_session.query(Artist).filter_by(name="Pink Floyd").first()
     assert retrieved_artist is not None
@@ -117,17 +133,17 @@ def test_concerts_relationship(db_session: Session) -> None:
     date_two = retrieved_artist.concerts[1].date
     assert date_one is not None
     assert date_two is not None
-    assert sorted([date_one, date_two]) == ["1973-03-01", "1975-09-15"]
+    assert sorted([date_one, date_two]) == [date(1973, 3, 1), date(1975, 9, 15)]
 
 
 def test_venues_relationship(db_session: Session) -> None:
     venue1 = Venue(name="Benaroya Hall", location="Seattle, WA")
     venue2 = Venue(name="Key Arena", location="Seattle, WA")
     artist = Artist(name="Pearl Jam", genre="Rock")
-    concert1 = Concert(artist=artist, venue=venue1, date="2003-10-22")
-    concert2 = Concert(artist=artist, venue=venue2, date="2000-11-06")
-    concert3 = Concert(artist=artist, venue=venue2, date="2000-11-05")
-    save_objects((concert1, concert2, concert3, venue2, venue1, artist), db_session)
+    concert1 = Concert(artist=artist, venue=venue1, date=date(2003, 10, 22))
+    concert2 = Concert(artist=artist, venue=venue2, date=date(2000, 11, 6))
+    concert3 = Concert(artist=artist, venue=venue2, date=date(2000, 11, 5))
+    commit_each((concert1, concert2, concert3, venue2, venue1, artist), db_session)
 
     assert db_session.query(Venue).filter_by(name="The Roxy").all() == []
     assert db_session.query(Venue).filter_by(name="Benaroya Hall").count() == 1
@@ -138,4 +154,178 @@ def test_venues_relationship(db_session: Session) -> None:
     d2 = retrieved_concerts[1].date
     assert d1 is not None
     assert d2 is not None
-    assert sorted([d1, d2]) == ["2000-11-05", "2000-11-06"]
+    assert sorted([d1, d2]) == [date(2000, 11, 5), date(2000, 11, 6)]
+
+
+def test_concert_counts_maintained(db_session: Session) -> None:
+    artist1 = Artist(name="Widespread Panic", genre="Southern Rock")
+    artist2 = Artist(name="Drive By Truckers", genre="Southern Rock")
+    venue1 = Venue(name="Fox Theatre", location="Atlanta, GA")
+    venue2 = Venue(name="Georgia Theatre", location="Athens, GA")
+    concert1 = Concert(artist=artist1, venue=venue1, date=date(1999, 12, 31))
+    concert2 = Concert(artist=artist1, venue=venue2, date=date(2000, 1, 1))
+    commit_each((artist1, artist2, venue1, venue2, concert1, concert2), db_session)
+    assert (artist1.concert_count, artist2.concert_count) == (2, 0)
+    assert (venue1.concert_count, venue2.concert_count) == (1, 1)
+
+    # reassign through the ORM, as the edit screen does
+    concert2.artist = artist2
+    concert2.venue = venue1
+    save_object(concert2, db_session)
+    assert (artist1.concert_count, artist2.concert_count) == (1, 1)
+    assert (venue1.concert_count, venue2.concert_count) == (2, 0)
+
+    db_session.delete(concert1)
+    db_session.commit()
+    assert (artist1.concert_count, artist2.concert_count) == (0, 1)
+    assert (venue1.concert_count, venue2.concert_count) == (1, 0)
+    assert check_concert_counts(db_session) == []
+
+
+def test_check_and_backfill_concert_counts(db_session: Session) -> None:
+    artist = Artist(name="Phish", genre="Rock")
+    venue = Venue(name="Madison Square Garden", location="New York, NY")
+    commit_each((artist, venue, Concert(artist=artist, venue=venue, date=date(2024, 12, 31))), db_session)
+
+    db_session.execute(update(Artist).values(concert_count=7))
+    db_session.commit()
+    mismatches = check_concert_counts(db_session)
+    assert [(m.table, m.id, m.name, m.stored, m.actual) for m in mismatches] == [("artists", artist.id, "Phish", 7, 1)]
+
+    backfill_concert_counts(db_session)
+    assert check_concert_counts(db_session) == []
+    assert artist.concert_count == 1
+    assert venue.concert_count == 1
+
+
+def search(db_session: Session, term: str) -> list[int]:
+    return sorted(db_session.scalars(select(Concert.id).where(search_concerts(term))))
+
+
+def test_search_index_maintained(db_session: Session) -> None:
+    assert has_search_index(db_session)
+    artist = Artist(name="Widespread Panic", genre="Southern Rock")
+    venue1 = Venue(name="Fox Theatre", location="Atlanta, GA")
+    venue2 = Venue(name="Red Rocks", location="Morrison, CO")
+    concert1 = Concert(artist=artist, venue=venue1, date=date(1999, 12, 31))
+    concert2 = Concert(artist=artist, venue=venue2, date=date(2001, 6, 23))
+    commit_each((artist, venue1, venue2, concert1, concert2), db_session)
+
+    # substring, case-insensitive matches on every indexed column
+    assert search(db_session, "SPREAD") == [concert1.id, concert2.id]
+    assert search(db_session, "southern") == [concert1.id, concert2.id]
+    assert search(db_session, "fox") == [concert1.id]
+    assert search(db_session, "morrison") == [concert2.id]
+    assert search(db_session, "1999-12") == [concert1.id]
+    assert search(db_session, 'quote"s') == []
+
+    # renames propagate to the index
+    artist.name = "Panic In The Streets"
+    venue2.location = "Denver, CO"
+    commit_each((artist, venue2), db_session)
+    assert search(db_session, "spread") == []
+    assert search(db_session, "streets") == [concert1.id, concert2.id]
+    assert search(db_session, "morrison") == []
+    assert search(db_session, "denver") == [concert2.id]
+
+    concert1.venue = venue2
+    save_object(concert1, db_session)
+    assert search(db_session, "fox") == []
+    db_session.delete(concert2)
+    db_session.commit()
+    assert search(db_session, "denver") == [concert1.id]
+
+
+def test_rebuild_search_index(db_session: Session) -> None:
+    artist = Artist(name="Phish", genre="Rock")
+    venue = Venue(name="Madison Square Garden", location="New York, NY")
+    concert = Concert(artist=artist, venue=venue, date=date(2024, 12, 31))
+    commit_each((artist, venue, concert), db_session)
+
+    db_session.execute(text("DELETE FROM concerts_fts"))
+    db_session.commit()
+    assert search(db_session, "phish") == []
+
+    rebuild_search_index(db_session)
+    assert search(db_session, "phish") == [concert.id]
+
+
+def test_save_objects_commits_once(db_session: Session) -> None:
+    artist = Artist(name="Phish", genre="Jam Band")
+    venues = [Venue(name=f"Venue {idx}", location="Burlington, VT") for idx in range(5)]
+    concerts = [Concert(artist=artist, venue=venue, date=date(1999, 7, idx + 1)) for idx, venue in enumerate(venues)]
+    notify = Mock()
+
+    assert save_objects([artist, *venues, *concerts], db_session, notify_callback=notify) == []
+
+    notify.assert_called_once_with("Saved 11 successfully!", severity="information")
+    assert db_session.query(Concert).count() == 5
+
+
+def test_save_objects_all_or_nothing(db_session: Session) -> None:
+    save_object(Artist(name="Fugazi", genre="Punk"), db_session)
+    objs = [Artist(name="Phish", genre="Jam Band"), Artist(name="Fugazi", genre="Punk")]
+    notify = Mock()
+
+    assert save_objects(objs, db_session, notify_callback=notify) == objs
+
+    notify.assert_called_once()
+    assert notify.call_args.kwargs == {"severity": "error"}
+    assert "UNIQUE constraint failed: artists.name, artists.genre" in notify.call_args[0][0]
+    assert db_session.query(Artist).count() == 1
+
+
+def test_save_objects_with_savepoints(db_session: Session) -> None:
+    save_object(Venue(name="9:30 Club", location="Washington, DC"), db_session)
+    duplicate = Venue(name="9:30 Club", location="Washington, DC")
+    objs = [Venue(name="Fox Theatre", location="Atlanta, GA"), duplicate, Venue(name="Ryman", location="Nashville, TN")]
+    notify = Mock()
+
+    with count_queries(db_session) as statements:
+        assert save_objects(objs, db_session, notify_callback=notify, savepoints=True) == [duplicate]
+
+    # only the duplicate is reported, and the others are still saved
+    notify.assert_called_once()
+    assert notify.call_args[0][0].startswith("Error saving venue: ")
+    assert db_session.query(Venue).count() == 3
+    # each object got its own savepoint, all inside one transaction
+    assert sum(statement.startswith("SAVEPOINT") for statement in statements) == 3
+    assert statements.count("BEGIN") == 1
+
+
+def test_unit_of_work(db_session: Session) -> None:
+    artist = Artist(name="Phish", genre="Jam Band")
+    save_object(artist, db_session)
+    notify = Mock()
+
+    with unit_of_work(db_session, notify_callback=notify) as session:
+        artist.genre = "Rock"
+        session.add(Venue(name="Ryman", location="Nashville, TN"))
+    notify.assert_called_once_with("Saved successfully!", severity="information")
+    assert db_session.query(Venue).count() == 1
+    assert db_session.get(Artist, artist.id).genre == "Rock"  # type: ignore[union-attr]
+
+    notify.reset_mock()
+    with pytest.raises(IntegrityError), unit_of_work(db_session, notify_callback=notify) as session:
+        artist.genre = "Jam Band"
+        session.add(Venue(name="Ryman", location="Nashville, TN"))
+    assert notify.call_args.kwargs == {"severity": "error"}
+    # the update made alongside the failed insert is rolled back with it
+    db_session.expire_all()
+    assert db_session.get(Artist, artist.id).genre == "Rock"  # type: ignore[union-attr]
+
+
+def test_unit_of_work_raises(db_session: Session) -> None:
+    notify = Mock()
+    # a bug inside the block isn't mistaken for a failed save and swallowed
+    with pytest.raises(ValueError), unit_of_work(db_session, notify_callback=notify) as session:
+        session.add(Artist(name="Phish", genre="Jam Band"))
+        int("not a number")
+    assert notify.call_args.kwargs == {"severity": "error"}
+    assert db_session.query(Artist).count() == 0
+
+
+def test_save_object_result(db_session: Session) -> None:
+    assert save_object(Artist(name="Phish", genre="Jam Band"), db_session)
+    assert not save_object(Artist(name="Phish", genre="Jam Band"), db_session)
+    assert db_session.query(Artist).count() == 1
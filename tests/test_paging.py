@@ -0,0 +1,149 @@
+import asyncio
+from datetime import date
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy.orm import Session
+from textual.widgets import DataTable
+
+from concert_db.app import ConcertDbApp
+from concert_db.models import Artist, Concert, Venue
+from concert_db.ui.concert import Concerts
+from concert_db.ui.sorting import Sorting
+from concert_db.ui.table import PagedTable
+
+from .utils import commit_each, count_queries
+
+
+@pytest.fixture()
+def concerts_ui(db_session: Session) -> Concerts:
+    artists = [Artist(name=name, genre="Rock") for name in ("Phish", "Fugazi", "Widespread Panic", "Fugazi ")]
+    venues = [Venue(name=name, location="Atlanta, GA") for name in ("Fox Theatre", "Roxy", "9:30 Club")]
+    concerts = [
+        Concert(
+            artist=artists[idx % len(artists)],
+            venue=venues[idx % len(venues)],
+            # plenty of duplicate sort values and nulls to exercise the tie-break on id
+            date=None if idx % 7 == 0 else date(2000, 1, idx % 5 + 1),
+        )
+        for idx in range(57)
+    ]
+    commit_each(concerts, db_session)
+    return Concerts(db_session)
+
+
+@pytest.mark.parametrize("name", ["Artist", "Venue", "Date"])
+@pytest.mark.parametrize("ascending", [True, False])
+@pytest.mark.parametrize("filter_by", [None, "fugazi"])
+def test_pages_match_full_query(concerts_ui: Concerts, name: str, ascending: bool, filter_by: str | None) -> None:
+    sorting = Sorting(0, name, ascending)
+    expected = concerts_ui.fetch_concerts(sorting, filter_by)
+
+    # walking forwards page by page uses keyset pagination from the previous page
+    forwards = concerts_ui.page_concerts(sorting, filter_by)
+    forwards.page_size = 5
+    assert forwards.total == len(expected)
+    assert [forwards.row(idx) for idx in range(forwards.total)] == expected
+    assert forwards.row(forwards.total) is None
+
+    # jumping to the end then walking backwards uses keyset pagination from the following page
+    backwards = concerts_ui.page_concerts(sorting, filter_by)
+    backwards.page_size = 5
+    assert [backwards.row(idx) for idx in reversed(range(backwards.total))] == expected[::-1]
+
+
+@pytest.mark.parametrize(
+    "keys",
+    [
+        [("Artist", True), ("Date", False)],
+        [("Venue", False), ("Date", True)],
+        [("Date", False), ("Artist", True)],
+        [("Date", True), ("Venue", False)],
+        [("Artist", False), ("Venue", True)],
+    ],
+)
+def test_multi_key_pages_match_full_query(concerts_ui: Concerts, keys: list[tuple[str, bool]]) -> None:
+    sorting = [Sorting(0, name, ascending) for name, ascending in keys]
+    expected = concerts_ui.fetch_concerts(sorting)
+    forwards = concerts_ui.page_concerts(sorting)
+    forwards.page_size = 5
+    assert [forwards.row(idx) for idx in range(forwards.total)] == expected
+
+    backwards = concerts_ui.page_concerts(sorting)
+    backwards.page_size = 5
+    assert [backwards.row(idx) for idx in reversed(range(backwards.total))] == expected[::-1]
+
+
+def test_neighbouring_pages_use_keyset(concerts_ui: Concerts, db_session: Session) -> None:
+    pager = concerts_ui.page_concerts(Sorting(2, "Date", True))
+    pager.page_size = 10
+    with count_queries(db_session) as statements:
+        pager.page(3)
+        pager.page(4)
+        pager.page(2)
+        pager.page(3)
+    # first page is an OFFSET jump, its neighbours are keyset lookups, and the repeat is served from the cache
+    # (SQLite always renders an OFFSET alongside LIMIT, so look for the keyset bound instead)
+    assert len(statements) == 3
+    assert "WHERE" not in statements[0]
+    assert "concerts.date > ?" in statements[1]
+    assert "concerts.date < ?" in statements[2]
+
+
+@pytest.mark.parametrize("filter_by", [None, "fugazi"])
+def test_paged_load_fetches_no_rows(
+    concerts_ui: Concerts, db_session: Session, monkeypatch: pytest.MonkeyPatch, filter_by: str | None
+) -> None:
+    monkeypatch.setattr(Concerts, "paging_threshold", 10)
+    pages = Mock()
+    concerts_ui.query_one = lambda *_args, **_kwargs: pages
+    concerts_ui.search_index = True
+    with count_queries(db_session) as statements:
+        concerts_ui.load_concerts(Sorting(2, "Date", True), filter_by)
+    # just the COUNT; the rows are left to the pager, a page at a time
+    assert len(statements) == 1
+    assert "count(" in statements[0]
+    assert concerts_ui.loaded is None
+    assert pages.show.call_args[0][1].total == (57 if filter_by is None else 28)
+
+
+def test_page_cache_is_bounded(concerts_ui: Concerts) -> None:
+    pager = concerts_ui.page_concerts(Sorting(0, "Artist", True))
+    pager.page_size = 2
+    pager.max_pages = 3
+    for idx in range(pager.total):
+        pager.row(idx)
+    assert pager.cached_pages == [26, 27, 28]
+    pager.row(0)
+    assert pager.cached_pages == [27, 28, 0]
+
+
+def test_large_result_uses_paged_table(db_session: Session, monkeypatch: pytest.MonkeyPatch) -> None:
+    venue = Venue(name="Fox Theatre", location="Atlanta, GA")
+    artist = Artist(name="Widespread Panic", genre="Southern Rock")
+    concerts = [Concert(artist=artist, venue=venue, date=date(1999, 12, day)) for day in range(1, 32)]
+    commit_each((venue, artist, *concerts), db_session)
+    monkeypatch.setattr(Concerts, "paging_threshold", 10)
+
+    async def browse() -> None:
+        app = ConcertDbApp(db_session)
+        async with app.run_test() as pilot:
+            await app.workers.wait_for_complete()
+            pages = app.query_one("#concerts_pages", PagedTable)
+            assert pages.display
+            assert not app.query_one("#concerts_table", DataTable).display
+            assert pages.row_count == 31
+            # newest first until a header is clicked
+            assert pages.cursor_cells == ("Widespread Panic", "Fox Theatre", "1999-12-31")
+
+            pages.focus()
+            await pilot.press("end")
+            assert pages.cursor_cells == ("Widespread Panic", "Fox Theatre", "1999-12-01")
+
+            # clicking the Date header re-sorts the pages in SQL
+            await pilot.click(pages, offset=(sum(pages.column_widths[:2]) + 1, 0))
+            await pilot.pause()
+            pages.move_cursor(0)
+            assert pages.cursor_cells == ("Widespread Panic", "Fox Theatre", "1999-12-01")
+
+    asyncio.run(browse())
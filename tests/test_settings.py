@@ -0,0 +1,336 @@
+import logging
+import os
+import subprocess
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+from sqlalchemy import insert, inspect, select, text
+from sqlalchemy.exc import IntegrityError
+
+from concert_db.models import Artist, Concert, Venue
+from concert_db.settings import (
+    MIGRATIONS,
+    SQLITE_PROFILES,
+    DatabaseConfig,
+    concert_date_rejects,
+    get_schema_version,
+    migrate,
+)
+from concert_db.ui.concert import Concerts, sort_terms
+from concert_db.ui.sorting import Sorting
+from scripts.generate_data import generate
+
+# the schema as it was before versioning: no indexes beyond the unique constraints, no concert counts or search index
+LEGACY_SCHEMA = (
+    "CREATE TABLE artists (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, genre VARCHAR NOT NULL, "
+    "CONSTRAINT unique_name_genre UNIQUE (name, genre))",
+    "CREATE TABLE venues (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, location VARCHAR NOT NULL, "
+    "CONSTRAINT unique_name_location UNIQUE (name, location))",
+    "CREATE TABLE concerts (id INTEGER PRIMARY KEY, artist_id INTEGER NOT NULL REFERENCES artists (id), "
+    "venue_id INTEGER NOT NULL REFERENCES venues (id), date VARCHAR, "
+    "CONSTRAINT unique_concert UNIQUE (artist_id, venue_id, date))",
+    "INSERT INTO artists (id, name, genre) VALUES (1, 'Phish', 'Jam Band')",
+    "INSERT INTO venues (id, name, location) VALUES (1, 'Fox Theatre', 'Atlanta, GA')",
+    "INSERT INTO concerts (artist_id, venue_id, date) VALUES (1, 1, '1996-10-31'), (1, 1, '1997-12-31')",
+)
+
+INDEXES = {
+    "ix_concerts_date",
+    "ix_concerts_artist_id_date",
+    "ix_concerts_venue_id_date",
+    "ix_artists_name",
+    "ix_venues_name",
+}
+
+
+@pytest.fixture()
+def db_config(tmp_path: Path) -> DatabaseConfig:
+    return DatabaseConfig(f"sqlite:///{tmp_path / 'concert_db.sqlite'}")
+
+
+def index_names(db_config: DatabaseConfig) -> set[str | None]:
+    inspector = inspect(db_config.engine)
+    return {index["name"] for table in ("artists", "venues", "concerts") for index in inspector.get_indexes(table)}
+
+
+def test_fresh_database_is_stamped(db_config: DatabaseConfig) -> None:
+    with db_config.engine.begin() as connection:
+        assert migrate(connection) == []
+        assert get_schema_version(connection) == MIGRATIONS[-1].version
+    assert index_names(db_config) >= INDEXES
+
+
+def test_legacy_database_is_upgraded(db_config: DatabaseConfig) -> None:
+    with db_config.engine.begin() as connection:
+        for statement in LEGACY_SCHEMA:
+            connection.exec_driver_sql(statement)
+        assert get_schema_version(connection) is None
+
+    with db_config.engine.begin() as connection:
+        applied = migrate(connection)
+        assert [migration.version for migration in applied] == [migration.version for migration in MIGRATIONS]
+        assert get_schema_version(connection) == MIGRATIONS[-1].version
+    assert index_names(db_config) >= INDEXES
+
+    session = db_config.get_session()
+    try:
+        # existing rows were backfilled and indexed, and the new triggers keep them up to date
+        assert session.scalars(select(Artist.concert_count)).one() == 2
+        assert session.scalars(select(Venue.concert_count)).one() == 2
+        assert session.execute(text("SELECT count(*) FROM concerts_fts WHERE concerts_fts MATCH 'phish'")).scalar() == 2
+    finally:
+        session.close()
+
+    # already up to date
+    with db_config.engine.begin() as connection:
+        assert migrate(connection) == []
+
+
+def test_partially_migrated_database(db_config: DatabaseConfig) -> None:
+    db_config.create_tables()
+    with db_config.engine.begin() as connection:
+        connection.exec_driver_sql("DROP INDEX ix_venues_name")
+        connection.exec_driver_sql("DELETE FROM schema_version WHERE version >= 4")
+
+    db_config.create_tables()
+    with db_config.engine.connect() as connection:
+        assert get_schema_version(connection) == MIGRATIONS[-1].version
+    assert index_names(db_config) >= INDEXES
+
+
+@pytest.mark.parametrize(
+    ("order_by", "index"),
+    [("concerts.date", "ix_concerts_date"), ("artists.name", "ix_artists_name"), ("venues.name", "ix_venues_name")],
+)
+def test_sorting_uses_index(db_config: DatabaseConfig, order_by: str, index: str) -> None:
+    db_config.create_tables()
+    table = order_by.split(".")[0]
+    with db_config.engine.connect() as connection:
+        plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN SELECT * FROM {table} ORDER BY {order_by}").all()
+    assert any(index in row[-1] for row in plan)
+
+
+@pytest.mark.parametrize(
+    ("keys", "index"),
+    [
+        ([Sorting(0, "Artist", True), Sorting(2, "Date", False)], "ix_concerts_artist_id_date"),
+        ([Sorting(1, "Venue", False), Sorting(2, "Date", True)], "ix_concerts_venue_id_date"),
+    ],
+)
+def test_multi_column_sorting_uses_index(db_config: DatabaseConfig, keys: list[Sorting], index: str) -> None:
+    with db_config.engine.begin() as connection:
+        for statement in LEGACY_SCHEMA:
+            connection.exec_driver_sql(statement)
+        connection.exec_driver_sql(
+            "INSERT INTO artists (name, genre) "
+            "WITH RECURSIVE n(i) AS (SELECT 2 UNION ALL SELECT i + 1 FROM n WHERE i < 100) "
+            "SELECT 'Artist ' || i, 'Rock' FROM n"
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO venues (name, location) "
+            "WITH RECURSIVE n(i) AS (SELECT 2 UNION ALL SELECT i + 1 FROM n WHERE i < 50) "
+            "SELECT 'Venue ' || i, 'GA' FROM n"
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO concerts (artist_id, venue_id, date) "
+            "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 5000) "
+            "SELECT i % 100 + 1, i % 50 + 1, date('2000-01-01', '+' || i || ' days') FROM n"
+        )
+    db_config.create_tables()
+
+    plan = sort_plan(db_config, keys)
+    assert any(index in step for step in plan)
+    assert not any("TEMP B-TREE" in step for step in plan)
+
+
+@pytest.mark.parametrize(
+    ("keys", "index"),
+    [
+        ([Sorting(0, "Artist", True), Sorting(2, "Date", False)], "ix_concerts_artist_id_date"),
+        ([Sorting(1, "Venue", False), Sorting(2, "Date", True)], "ix_concerts_venue_id_date"),
+    ],
+)
+def test_multi_column_sorting_uses_index_when_fresh(db_config: DatabaseConfig, keys: list[Sorting], index: str) -> None:
+    # filled after it was created, so the database has no statistics about these rows
+    db_config.create_tables()
+    with db_config.engine.begin() as connection:
+        connection.execute(insert(Artist), [{"name": f"Artist {idx}", "genre": "Rock"} for idx in range(100)])
+        connection.execute(insert(Venue), [{"name": f"Venue {idx}", "location": "GA"} for idx in range(50)])
+        connection.execute(
+            insert(Concert),
+            [
+                {"artist_id": idx % 100 + 1, "venue_id": idx % 50 + 1, "date": date.fromordinal(730_000 + idx)}
+                for idx in range(5000)
+            ],
+        )
+
+    plan = sort_plan(db_config, keys)
+    assert any(index in step for step in plan)
+    assert not any("TEMP B-TREE" in step for step in plan)
+
+
+@pytest.mark.parametrize(
+    ("keys", "index"),
+    [
+        ([Sorting(0, "Artist", True), Sorting(2, "Date", False)], "ix_concerts_artist_id_date"),
+        ([Sorting(1, "Venue", False), Sorting(2, "Date", True)], "ix_concerts_venue_id_date"),
+    ],
+)
+def test_multi_column_sorting_uses_index_when_generated(
+    db_config: DatabaseConfig, keys: list[Sorting], index: str
+) -> None:
+    # a few artists & venues with most of the concerts
+    generate(db_config, 5000)
+
+    plan = sort_plan(db_config, keys)
+    assert any(index in step for step in plan)
+    assert not any("TEMP B-TREE" in step for step in plan)
+
+
+def sort_plan(db_config: DatabaseConfig, keys: list[Sorting]) -> list[str]:
+    session = db_config.get_session()
+    try:
+        query = Concerts(session).concerts_query(sorting=keys).order_by(*(term.order_by() for term in sort_terms(keys)))
+        sql = query.statement.compile(db_config.engine, compile_kwargs={"literal_binds": True})
+        return [row[-1] for row in session.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+    finally:
+        session.close()
+
+
+def test_concert_dates_converted(db_config: DatabaseConfig, caplog: pytest.LogCaptureFixture) -> None:
+    with db_config.engine.begin() as connection:
+        for statement in LEGACY_SCHEMA:
+            connection.exec_driver_sql(statement)
+        connection.exec_driver_sql(
+            "INSERT INTO concerts (id, artist_id, venue_id, date) VALUES "
+            "(10, 1, 1, '2019/6/1'), (11, 1, 1, '2019-06-01 20:00'), (12, 1, 1, 'last summer'), "
+            "(13, 1, 1, '2019-02-30'), (14, 1, 1, '2001-9-11'), (15, 1, 1, '')"
+        )
+
+    with caplog.at_level(logging.INFO, logger="concert_db.settings"):
+        db_config.create_tables()
+    # logged rather than printed, which would garble the app's screen
+    assert "4 concert dates couldn't be converted" in caplog.text
+    assert "Applied migration 7: concert dates as ISO-8601 dates" in caplog.text
+    with db_config.engine.connect() as connection:
+        rows = connection.exec_driver_sql("SELECT id, date FROM concerts WHERE id >= 10").all()
+        dates = {row.id: row.date for row in rows}
+        rejects = {row.concert_id: row for row in connection.execute(select(concert_date_rejects)).all()}
+    assert dates == {10: "2019-06-01", 11: None, 12: None, 13: None, 14: "2001-09-11", 15: None}
+    assert {concert_id: row.value for concert_id, row in rejects.items()} == {
+        11: "2019-06-01 20:00",
+        12: "last summer",
+        13: "2019-02-30",
+        15: "",
+    }
+    assert rejects[11].reason == "duplicate of 2019-06-01"
+
+    # every remaining value reads back through the Date type
+    session = db_config.get_session()
+    try:
+        assert session.scalars(select(Concert.date).where(Concert.id == 14)).one() == date(2001, 9, 11)
+        assert len(session.scalars(select(Concert.date)).all()) == 8
+    finally:
+        session.close()
+
+
+@pytest.mark.parametrize("value", ["31/12/1999", "1999-02-30", "1999-12-31 20:00", "", "19991231"])
+def test_invalid_concert_dates_rejected(db_config: DatabaseConfig, value: str) -> None:
+    db_config.create_tables()
+    with db_config.engine.begin() as connection:
+        for statement in LEGACY_SCHEMA[3:5]:
+            connection.exec_driver_sql(statement)
+        connection.exec_driver_sql(
+            "INSERT INTO concerts (id, artist_id, venue_id, date) VALUES (1, 1, 1, '1999-12-31')"
+        )
+
+    # as from a shell or script, bypassing the Date type
+    for statement in (
+        f"INSERT INTO concerts (artist_id, venue_id, date) VALUES (1, 1, '{value}')",
+        f"UPDATE concerts SET date = '{value}' WHERE id = 1",
+    ):
+        with pytest.raises(IntegrityError, match="must be a valid YYYY-MM-DD date"), db_config.engine.begin() as conn:
+            conn.exec_driver_sql(statement)
+    with db_config.engine.connect() as connection:
+        assert connection.exec_driver_sql("SELECT date FROM concerts").all() == [("1999-12-31",)]
+
+
+def test_invalid_concert_dates_cleared_by_migration(db_config: DatabaseConfig) -> None:
+    db_config.create_tables()
+    with db_config.engine.begin() as connection:
+        for statement in LEGACY_SCHEMA[3:5]:
+            connection.exec_driver_sql(statement)
+        # written before the dates were checked
+        for trigger in ("concerts_date_insert", "concerts_date_update"):
+            connection.exec_driver_sql(f"DROP TRIGGER {trigger}")
+        connection.exec_driver_sql("DELETE FROM schema_version WHERE version >= 9")
+        connection.exec_driver_sql(
+            "INSERT INTO concerts (id, artist_id, venue_id, date) VALUES (1, 1, 1, '31/12/1999'), (2, 1, 1, '2000/1/1')"
+        )
+
+    db_config.create_tables()
+    with db_config.engine.connect() as connection:
+        assert connection.exec_driver_sql("SELECT id, date FROM concerts").all() == [(1, None), (2, "2000-01-01")]
+        assert connection.execute(select(concert_date_rejects.c.value)).scalars().all() == ["31/12/1999"]
+        with pytest.raises(IntegrityError):
+            connection.exec_driver_sql("UPDATE concerts SET date = '31/12/1999' WHERE id = 1")
+
+
+@pytest.mark.parametrize("profile", list(SQLITE_PROFILES))
+def test_sqlite_profile_applied(tmp_path: Path, profile: str) -> None:
+    db_config = DatabaseConfig(f"sqlite:///{tmp_path / 'concert_db.sqlite'}", profile=profile)
+    expected = SQLITE_PROFILES[profile]
+    settings = db_config.pragma_settings()
+    assert settings["journal_mode"] == expected.journal_mode.lower()
+    assert settings["synchronous"] == {"NORMAL": 1, "FULL": 2}[expected.synchronous]
+    assert settings["cache_size"] == expected.cache_size
+    assert settings["mmap_size"] == expected.mmap_size
+    assert settings["temp_store"] == {"DEFAULT": 0, "MEMORY": 2}[expected.temp_store]
+    assert settings["busy_timeout"] == expected.busy_timeout
+
+    # every pooled connection gets them, not just the first
+    with db_config.engine.connect() as first, db_config.engine.connect() as second:
+        for connection in (first, second):
+            assert connection.exec_driver_sql("PRAGMA busy_timeout").scalar() == expected.busy_timeout
+
+
+def test_sqlite_profile_from_environment(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("SQLITE_PROFILE", "durable")
+    assert DatabaseConfig().profile_name == "durable"
+    assert DatabaseConfig(profile="baseline").profile_name == "baseline"
+
+    monkeypatch.setenv("SQLITE_PROFILE", "ludicrous")
+    with pytest.raises(ValueError, match="Unknown SQLite profile 'ludicrous'"):
+        DatabaseConfig()
+
+
+# cumulative microseconds to import concert_db.app; about 0.5s here, and 1s when it still loaded the Google clients
+STARTUP_BUDGET_US = int(os.getenv("STARTUP_BUDGET_MS", "900")) * 1000
+
+
+def import_times(module: str) -> dict[str, int]:
+    """
+    Cumulative import time in microseconds of every module loaded by importing `module` in a fresh interpreter.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines()[1:]:
+        _self, cumulative, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_app_startup_within_budget() -> None:
+    runs = [import_times("concert_db.app") for _ in range(3)]
+    assert not [name for name in runs[0] if name.split(".")[0] in ("google", "googleapiclient", "google_auth_oauthlib")]
+    assert min(run["concert_db.app"] for run in runs) < STARTUP_BUDGET_US
+
+
+def test_backup_config_imported_on_demand() -> None:
+    from concert_db import backup, settings
+
+    assert settings.DatabaseBackupConfig is backup.DatabaseBackupConfig
@@ -39,3 +39,25 @@ def test_columns_titles_sorting() -> None:
     assert cols.titles() == ["A", "B", "C ↑"]
     cols[2].ascending = False
     assert cols.titles() == ["A", "B", "C ↓"]
+
+
+def test_sort_by_keeps_previous_key() -> None:
+    cols = SortableColumns(["Artist", "Venue", "Date"])
+
+    assert [(key.name, key.ascending) for key in cols.sort_by(2)] == [("Date", True)]
+    assert cols.titles() == ["Artist", "Venue", "Date ↑"]
+
+    # a new column becomes the primary key, ascending, with the previous one as its tie-break
+    assert [(key.name, key.ascending) for key in cols.sort_by(0)] == [("Artist", True), ("Date", True)]
+    assert cols.titles() == ["Artist ↑¹", "Venue", "Date ↑²"]
+
+    # clicking the primary again flips it, leaving the tie-break alone
+    cols.sort_by(0)
+    assert cols.titles() == ["Artist ↓¹", "Venue", "Date ↑²"]
+
+    # only two keys are kept
+    assert [(key.name, key.ascending) for key in cols.sort_by(1)] == [("Venue", True), ("Artist", False)]
+    assert cols.titles() == ["Artist ↓²", "Venue ↑¹", "Date"]
+
+    # a secondary column clicked again starts ascending as the new primary
+    assert [(key.name, key.ascending) for key in cols.sort_by(0)] == [("Artist", True), ("Venue", True)]
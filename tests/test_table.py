@@ -0,0 +1,163 @@
+import asyncio
+from collections.abc import Callable, Coroutine
+from typing import Any
+
+import pytest
+from textual.app import App, ComposeResult
+from textual.widgets.data_table import ColumnKey
+
+from concert_db.ui.table import SyncedDataTable
+
+COLUMNS = {"Artist": "Artist", "Venue": "Venue", "Date": "Date"}
+ROWS: list[tuple[int, tuple[str, str, str]]] = [
+    (1, ("Phish", "MSG", "2024-12-31")),
+    (2, ("Phish", "MSG", "2024-12-30")),
+    (3, ("Widespread Panic", "Fox Theatre", "1999-12-31")),
+    (4, ("Fugazi", "9:30 Club", "1990-06-02")),
+]
+
+
+class TableApp(App):
+    def compose(self) -> ComposeResult:
+        yield SyncedDataTable(id="table")
+
+
+def run_with_table(test: Callable[[SyncedDataTable], Coroutine[Any, Any, None]]) -> None:
+    async def _run() -> None:
+        app = TableApp()
+        async with app.run_test() as pilot:
+            await test(app.query_one(SyncedDataTable))
+            await pilot.pause()
+
+    asyncio.run(_run())
+
+
+def displayed(table: SyncedDataTable) -> list[tuple[str | None, list]]:
+    return [(row.key.value, table.get_row(row.key)) for row in table.ordered_rows]
+
+
+def test_sync_initial_fill() -> None:
+    async def _test(table: SyncedDataTable) -> None:
+        diff = table.sync(COLUMNS, ROWS)
+        assert diff.refilled
+        assert [column.label.plain for column in table.ordered_columns] == ["Artist", "Venue", "Date"]
+        assert displayed(table) == [(str(key), list(cells)) for key, cells in ROWS]
+
+    run_with_table(_test)
+
+
+def test_sync_single_changes() -> None:
+    async def _test(table: SyncedDataTable) -> None:
+        table.sync(COLUMNS, ROWS)
+        table.move_cursor(row=2)
+
+        # insert in the middle of the order
+        rows = [*ROWS[:1], (5, ("Phish", "MSG", "2024-12-29")), *ROWS[1:]]
+        diff = table.sync(COLUMNS, rows)
+        assert (diff.inserted, diff.removed, diff.updated, diff.refilled) == (["5"], [], [], False)
+        assert diff.moved == ["5", "2", "3", "4"]
+        assert displayed(table) == [(str(key), list(cells)) for key, cells in rows]
+        # the cursor stays on the row it was on
+        assert table.cursor_row == 3
+        assert table.coordinate_to_cell_key(table.cursor_coordinate).row_key.value == "3"
+
+        # update one cell in place
+        rows[3] = (3, ("Widespread Panic", "Fox Theatre", "2000-01-01"))
+        diff = table.sync(COLUMNS, rows)
+        assert (diff.inserted, diff.removed, diff.updated, diff.moved) == ([], [], ["3"], [])
+        assert table.get_row("3") == ["Widespread Panic", "Fox Theatre", "2000-01-01"]
+
+        # remove one row
+        del rows[0]
+        diff = table.sync(COLUMNS, rows)
+        assert (diff.inserted, diff.removed, diff.updated, diff.moved) == ([], ["1"], [], [])
+        assert displayed(table) == [(str(key), list(cells)) for key, cells in rows]
+
+        # nothing changed
+        diff = table.sync(COLUMNS, rows)
+        assert (diff.inserted, diff.removed, diff.updated, diff.moved, diff.refilled) == ([], [], [], [], False)
+
+    run_with_table(_test)
+
+
+def test_sync_reorder_and_relabel() -> None:
+    async def _test(table: SyncedDataTable) -> None:
+        table.sync(COLUMNS, ROWS)
+        table.move_cursor(row=0)
+
+        diff = table.sync({**COLUMNS, "Date": "Date ↓"}, list(reversed(ROWS)))
+        assert (diff.inserted, diff.removed, diff.updated, diff.refilled) == ([], [], [], False)
+        assert diff.moved == ["4", "3", "2", "1"]
+        assert [column.label.plain for column in table.ordered_columns] == ["Artist", "Venue", "Date ↓"]
+        assert displayed(table) == [(str(key), list(cells)) for key, cells in reversed(ROWS)]
+        assert table.cursor_row == 3
+
+    run_with_table(_test)
+
+
+def test_sync_relabel_widens_column() -> None:
+    async def _run() -> None:
+        app = TableApp()
+        async with app.run_test() as pilot:
+            table = app.query_one(SyncedDataTable)
+            table.sync(COLUMNS, ROWS)
+            await pilot.pause()
+            assert table.columns[ColumnKey("Date")].content_width == len("2024-12-31")
+
+            # column widths are measured when the table is next idle
+            table.sync({**COLUMNS, "Date": "Date, most recent first ↓"}, ROWS)
+            await pilot.pause()
+            assert table.columns[ColumnKey("Date")].content_width == len("Date, most recent first ↓")
+            assert table.get_row("1") == list(ROWS[0][1])
+
+    asyncio.run(_run())
+
+
+def test_sync_mostly_changed_refills() -> None:
+    async def _test(table: SyncedDataTable) -> None:
+        table.sync(COLUMNS, ROWS)
+        rows = [(key + 10, cells) for key, cells in ROWS]
+        diff = table.sync(COLUMNS, rows)
+        assert diff.refilled
+        assert displayed(table) == [(str(key), list(cells)) for key, cells in rows]
+
+        # new column keys rebuild the columns
+        table.sync({"Name": "Name"}, [(1, ("Phish",))])
+        assert [column.key.value for column in table.ordered_columns] == ["Name"]
+        assert displayed(table) == [("1", ["Phish"])]
+
+    run_with_table(_test)
+
+
+def test_reorder() -> None:
+    async def _test(table: SyncedDataTable) -> None:
+        table.sync(COLUMNS, ROWS)
+        table.move_cursor(row=0)
+
+        table.reorder([4, 3, 2, 1])
+        assert displayed(table) == [(str(key), list(cells)) for key, cells in reversed(ROWS)]
+        # the cursor follows its row
+        assert table.cursor_key == "1"
+        assert table.cursor_row == 3
+
+        with pytest.raises(ValueError, match="Expected 4 row keys, got 2"):
+            table.reorder([1, 2])
+
+    run_with_table(_test)
+
+
+def test_reorder_rows_added_out_of_order() -> None:
+    async def _test(table: SyncedDataTable) -> None:
+        # rows 5 & 6 are added after the others but displayed first, and have the same cells as rows 1 & 2
+        rows = [(5, ROWS[0][1]), (6, ROWS[1][1]), *ROWS]
+        table.sync(COLUMNS, ROWS)
+        table.sync(COLUMNS, rows)
+        assert [row.key.value for row in table.ordered_rows] == ["5", "6", "1", "2", "3", "4"]
+
+        # only the row keys tell the duplicates apart, so this fails if `sort()` stops visiting rows in `rows` order
+        table.reorder([2, 5, 4, 1, 6, 3])
+        assert [row.key.value for row in table.ordered_rows] == ["2", "5", "4", "1", "6", "3"]
+        table.reorder([6, 1, 2, 3, 4, 5])
+        assert [row.key.value for row in table.ordered_rows] == ["6", "1", "2", "3", "4", "5"]
+
+    run_with_table(_test)
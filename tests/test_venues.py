@@ -1,39 +1,62 @@
 from contextlib import nullcontext as does_not_raise
+from datetime import date
 from unittest.mock import Mock
 
 import pytest
 from sqlalchemy.orm import Session
 
-from concert_db.models import Venue
+from concert_db.models import Artist, Concert, Venue
 from concert_db.ui.venue import AddVenueScreen, EditVenueScreen, VenueScreen, format_input
 
-from .utils import save_objects
+from .utils import commit_each, count_queries
 
 
 def test_load_venues(db_session: Session) -> None:
     v1 = Venue(name="Roxy", location="Atlanta, GA")
     v2 = Venue(name="Madison Square Garden", location="New York, NY")
     v3 = Venue(name="Broadberry", location="Richmond, VA")
-    save_objects((v1, v2, v3), db_session)
+    commit_each((v1, v2, v3), db_session)
     venue_ui = VenueScreen(db_session)
 
-    assert venue_ui._venues == []
-
     mock_table = Mock()
     venue_ui.query_one = lambda *_args, **_kwargs: mock_table
     venue_ui.load_venues()
 
-    mock_table.add_columns.assert_called_once_with("Name", "Location", "Concerts")
-    mock_table.add_rows.assert_called_once_with(
+    mock_table.sync.assert_called_once_with(
+        {"Name": "Name", "Location": "Location", "Concerts": "Concerts"},
         [
             # sorted by venue name
-            ("Broadberry", "Richmond, VA", 0),
-            ("Madison Square Garden", "New York, NY", 0),
-            ("Roxy", "Atlanta, GA", 0),
-        ]
+            (v3.id, ("Broadberry", "Richmond, VA", 0)),
+            (v2.id, ("Madison Square Garden", "New York, NY", 0)),
+            (v1.id, ("Roxy", "Atlanta, GA", 0)),
+        ],
     )
-    # venue objects should be stored on the class instance
-    assert [v.id for v in venue_ui._venues] == [v3.id, v2.id, v1.id]
+
+
+def test_load_venues_concert_counts(db_session: Session) -> None:
+    artist = Artist(name="Widespread Panic", genre="Southern Rock")
+    v1 = Venue(name="Fox Theatre", location="Atlanta, GA")
+    v2 = Venue(name="Red Rocks", location="Morrison, CO")
+    v3 = Venue(name="Roxy", location="Atlanta, GA")
+    concerts = [Concert(artist=artist, venue=v2, date=date(2001, 6, day)) for day in range(20, 24)]
+    commit_each((artist, v1, v2, v3, *concerts, Concert(artist=artist, venue=v1, date=date(1999, 12, 31))), db_session)
+    v1_id, v2_id, v3_id = v1.id, v2.id, v3.id
+    db_session.expunge_all()
+    venue_ui = VenueScreen(db_session)
+
+    mock_table = Mock()
+    venue_ui.query_one = lambda *_args, **_kwargs: mock_table
+    with count_queries(db_session) as statements:
+        venue_ui.load_venues()
+
+    # one statement; no concert collections loaded into the session
+    assert len(statements) == 1
+    assert db_session.identity_map.keys() == set()
+    assert mock_table.sync.call_args[0][1] == [
+        (v1_id, ("Fox Theatre", "Atlanta, GA", 1)),
+        (v2_id, ("Red Rocks", "Morrison, CO", 4)),
+        (v3_id, ("Roxy", "Atlanta, GA", 0)),
+    ]
 
 
 def mock_query_one(name: str, location: str) -> Mock:
@@ -108,6 +131,30 @@ def test_add_venue_cancel() -> None:
     screen.dismiss.assert_called_once_with(None)
 
 
+def test_edit_venue_by_row_key(db_session: Session, mock_app: Mock) -> None:
+    # same name in two places, so the row can only be told apart by its key
+    venues = [Venue(name="Roxy", location="Atlanta, GA"), Venue(name="Roxy", location="Los Angeles, CA")]
+    commit_each(venues, db_session)
+    venue_ui = VenueScreen(db_session)
+    _mock_app = mock_app(venue_ui)
+    mock_table = Mock()
+    mock_table.cursor_key = str(venues[1].id)
+    venue_ui.query_one = lambda *_args, **_kwargs: mock_table
+
+    with count_queries(db_session) as statements:
+        venue_ui.action_edit_venue()
+
+    # served from the identity map
+    assert statements == []
+    screen = _mock_app.push_screen.call_args[0][0]
+    assert isinstance(screen, EditVenueScreen)
+    assert screen.venue is venues[1]
+
+    mock_table.cursor_key = None
+    venue_ui.action_edit_venue()
+    _mock_app.notify.assert_called_once_with("Invalid row selection", severity="error")
+
+
 def test_edit_venue_with_valid_data() -> None:
     original_venue = Venue(name="Original Name", location="Original Location, OL")
     screen = EditVenueScreen(original_venue)
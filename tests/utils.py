@@ -1,10 +1,35 @@
-from typing import Iterable
+from collections.abc import Generator
+from contextlib import contextmanager
+from typing import Any, Iterable
 
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 
 from concert_db.models import save_object
 
 
-def save_objects(objs: Iterable, db_session: Session) -> None:
+def commit_each(objs: Iterable, db_session: Session) -> None:
+    """
+    Save each object in its own commit with `save_object()`; unlike `concert_db.models.save_objects()`, one at a time.
+    """
     for obj in objs:
         save_object(obj, db_session)
+
+
+@contextmanager
+def count_queries(db_session: Session) -> Generator[list[str], None, None]:
+    """
+    Record every SQL statement executed on the session's engine while the context is active.
+    """
+    statements: list[str] = []
+
+    def _record(*args: Any) -> None:
+        # before_cursor_execute(conn, cursor, statement, parameters, context, executemany)
+        statements.append(args[2])
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)